@@ -0,0 +1,84 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+EXTRACT_CACHE_FILE = 'extracts.sqlite3'
+
+
+def blob_sha(data: bytes) -> str:
+    # The id git gives the same bytes, so working-copy files and tree entries share keys.
+    digest = hashlib.sha1(b'blob %d\0' % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def cache_key(kind: str, object_sha: str, rel_path: str) -> str:
+    # Extracts embed module-qualified ids derived from the path, so a blob is
+    # reused wherever it appears at the same path: other commits, refs and forks.
+    return f'{kind}:{object_sha}:{rel_path}'
+
+
+class ExtractCache:
+    # Per-file extraction results shared by every repository under one cache root.
+    # Values are (extract or None, warnings) pickles; unreadable rows count as misses.
+    def __init__(self, path: str) -> None:
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS extracts ('
+            'key TEXT PRIMARY KEY, payload BLOB NOT NULL, created_at REAL NOT NULL)'
+        )
+        self.pending: Dict[str, bytes] = {}
+        self.hits = 0
+
+    def get(self, key: str) -> Optional[object]:
+        row = self.connection.execute('SELECT payload FROM extracts WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            value = pickle.loads(row[0])
+        except Exception:
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: object) -> None:
+        self.pending[key] = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO extracts (key, payload, created_at) VALUES (?, ?, ?)',
+                [(key, payload, now) for key, payload in self.pending.items()],
+            )
+        self.pending.clear()
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+@contextmanager
+def open_extract_cache(cache_root: str) -> Iterator[Optional[ExtractCache]]:
+    # The cache only saves work; if it cannot be opened indexing proceeds without it.
+    try:
+        os.makedirs(cache_root, exist_ok=True)
+        cache = ExtractCache(os.path.join(cache_root, EXTRACT_CACHE_FILE))
+    except (OSError, sqlite3.Error):
+        yield None
+        return
+    try:
+        yield cache
+        try:
+            cache.flush()
+        except sqlite3.Error:
+            pass
+    finally:
+        cache.close()
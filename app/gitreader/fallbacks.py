@@ -0,0 +1,259 @@
+import hashlib
+from typing import Dict, List
+
+from .models import RepoIndex, SymbolNode
+from .signals import primary_route, signal_summary
+
+
+MAX_CONTEXT_EDGES = 8
+# Bump when fallback narrations or signals change so precomputed tables are rebuilt.
+FALLBACKS_VERSION = 2
+
+
+def snippet_hash(snippet_text: str) -> str:
+    return hashlib.sha1(snippet_text.encode('utf-8', errors='replace')).hexdigest()
+
+
+def default_section(node: SymbolNode) -> str:
+    if node.kind in ('function', 'method', 'class'):
+        return 'body'
+    return 'full'
+
+
+def edge_context(index: RepoIndex, node: SymbolNode) -> Dict[str, List[str]]:
+    incoming: List[str] = []
+    outgoing: List[str] = []
+    max_edges = MAX_CONTEXT_EDGES
+    for edge in index.edges.outgoing(node.id)[:max_edges]:
+        target = index.nodes.get(edge.target)
+        target_name = target.name if target else edge.target
+        target_kind = target.kind if target else 'unknown'
+        outgoing.append(f'{edge.kind} -> {target_name} ({target_kind})')
+    for edge in index.edges.incoming(node.id):
+        if edge.source == node.id:
+            continue
+        source = index.nodes.get(edge.source)
+        source_name = source.name if source else edge.source
+        source_kind = source.kind if source else 'unknown'
+        incoming.append(f'{edge.kind} <- {source_name} ({source_kind})')
+        if len(incoming) >= max_edges:
+            break
+    return {
+        'incoming': incoming[:max_edges],
+        'outgoing': outgoing[:max_edges],
+    }
+
+
+def edge_contexts(index: RepoIndex) -> Dict[str, Dict[str, List[str]]]:
+    # edge_context for every node in one pass over the edges: the first
+    # MAX_CONTEXT_EDGES edges each way, in edge order, a self-edge counting as outgoing.
+    contexts: Dict[str, Dict[str, List[str]]] = {}
+
+    def _context(node_id: str) -> Dict[str, List[str]]:
+        context = contexts.get(node_id)
+        if context is None:
+            context = {'incoming': [], 'outgoing': []}
+            contexts[node_id] = context
+        return context
+
+    for source_id, target_id, kind, _confidence in index.edges.rows():
+        outgoing = _context(source_id)['outgoing']
+        if len(outgoing) < MAX_CONTEXT_EDGES:
+            target = index.nodes.get(target_id)
+            target_name = target.name if target else target_id
+            target_kind = target.kind if target else 'unknown'
+            outgoing.append(f'{kind} -> {target_name} ({target_kind})')
+        if target_id == source_id:
+            continue
+        incoming = _context(target_id)['incoming']
+        if len(incoming) < MAX_CONTEXT_EDGES:
+            source = index.nodes.get(source_id)
+            source_name = source.name if source else source_id
+            source_kind = source.kind if source else 'unknown'
+            incoming.append(f'{kind} <- {source_name} ({source_kind})')
+    return contexts
+
+
+def fallback_narration(
+    node: SymbolNode,
+    snippet: Dict[str, object],
+    context: Dict[str, List[str]],
+    signals: Dict[str, List[str]],
+) -> Dict[str, object]:
+    name = node.name
+    kind_label = _kind_label(node.kind)
+    location_label = _format_location(node, snippet)
+    signature = node.signature or ''
+    doc_line = node.summary or ''
+    route_label = primary_route(signals)
+    hook = _build_hook(name, kind_label, location_label, signature, doc_line, route_label, signals)
+    summary = _build_summary(node, location_label, signature, doc_line, context, route_label, signals)
+    key_lines = []
+    for highlight in snippet.get('highlights', []) or []:
+        if not isinstance(highlight, dict):
+            continue
+        line = highlight.get('start_line')
+        label = highlight.get('label', 'key line')
+        if isinstance(line, int) and line > 0:
+            key_lines.append({'line': line, 'text': str(label).replace('_', ' ').title()})
+    if not key_lines and isinstance(snippet.get('start_line'), int):
+        key_lines.append({'line': int(snippet.get('start_line')), 'text': 'Snippet start'})
+    connections = context.get('outgoing') or context.get('incoming') or [
+        'Connections are still being mapped.',
+    ]
+    next_thread = _build_next_thread(context)
+    return {
+        'hook': hook,
+        'summary': summary,
+        'key_lines': key_lines[:4],
+        'connections': connections[:4],
+        'next_thread': next_thread,
+    }
+
+
+def _kind_label(kind: str) -> str:
+    labels = {
+        'file': 'File',
+        'class': 'Class',
+        'function': 'Function',
+        'method': 'Method',
+        'blueprint': 'Blueprint',
+        'external': 'External symbol',
+    }
+    return labels.get(kind, 'Symbol')
+
+
+def _format_location(node: SymbolNode, snippet: Dict[str, object]) -> str:
+    path = node.location.path if node.location and node.location.path else ''
+    start_line = snippet.get('start_line') if isinstance(snippet.get('start_line'), int) else None
+    end_line = snippet.get('end_line') if isinstance(snippet.get('end_line'), int) else None
+    if start_line is None and node.location:
+        start_line = node.location.start_line or None
+    if end_line is None and node.location:
+        end_line = node.location.end_line or None
+    if path and start_line:
+        if end_line and end_line != start_line:
+            return f'{path}:{start_line}-{end_line}'
+        return f'{path}:{start_line}'
+    return path or ''
+
+
+def _build_hook(
+    name: str,
+    kind_label: str,
+    location_label: str,
+    signature: str,
+    doc_line: str,
+    route_label: str,
+    signals: Dict[str, List[str]],
+) -> str:
+    if route_label:
+        return f'{name} handles {route_label}.'
+    templates = signals.get('templates') or []
+    if templates:
+        return f'{name} renders {templates[0]}.'
+    if doc_line:
+        return f'{name}: {doc_line}'
+    if signature and location_label:
+        return f'{signature} in {location_label}.'
+    if location_label:
+        return f'{kind_label} {name} in {location_label}.'
+    if signature:
+        return signature
+    return f'{kind_label} {name} anchors this part of the flow.'
+
+
+def _build_summary(
+    node: SymbolNode,
+    location_label: str,
+    signature: str,
+    doc_line: str,
+    context: Dict[str, List[str]],
+    route_label: str,
+    signals: Dict[str, List[str]],
+) -> List[str]:
+    summary: List[str] = []
+    kind_label = _kind_label(node.kind)
+    if location_label and route_label:
+        summary.append(f'{kind_label} {node.name} in {location_label}. Route: {route_label}.')
+    elif location_label:
+        summary.append(f'{kind_label} {node.name} in {location_label}.')
+    elif route_label:
+        summary.append(f'Route: {route_label}.')
+    else:
+        summary.append(f'{kind_label} {node.name}.')
+    if signature:
+        summary.append(f'Signature: {signature}')
+    if doc_line:
+        summary.append(f'Docstring: {doc_line}')
+    summary.extend(signal_summary(signals))
+
+    outgoing = _edge_items(context.get('outgoing', []))
+    incoming = _edge_items(context.get('incoming', []))
+    if node.kind == 'file':
+        contains = _edge_summary(outgoing, 'contains', 'Contains')
+        if contains:
+            summary.append(contains)
+        imported = _edge_summary(incoming, 'imports', 'Imported by')
+        if imported:
+            summary.append(imported)
+    elif node.kind == 'class':
+        contains = _edge_summary(outgoing, 'contains', 'Contains')
+        if contains:
+            summary.append(contains)
+        calls = _edge_summary(outgoing, 'calls', 'Calls')
+        if calls:
+            summary.append(calls)
+    else:
+        calls = _edge_summary(outgoing, 'calls', 'Calls')
+        if calls:
+            summary.append(calls)
+        used_by = _edge_summary(incoming, 'calls', 'Used by')
+        if used_by:
+            summary.append(used_by)
+    return summary[:4]
+
+
+def _edge_items(entries: List[str]) -> List[tuple[str, str]]:
+    items: List[tuple[str, str]] = []
+    for entry in entries:
+        if '->' in entry:
+            left, right = entry.split('->', 1)
+        elif '<-' in entry:
+            left, right = entry.split('<-', 1)
+        else:
+            continue
+        kind = left.strip()
+        name = right.strip()
+        if '(' in name:
+            name = name.split('(', 1)[0].strip()
+        if kind and name:
+            items.append((kind, name))
+    return items
+
+
+def _edge_summary(items: List[tuple[str, str]], kind: str, label: str, limit: int = 3) -> str:
+    names = [name for edge_kind, name in items if edge_kind == kind]
+    if not names:
+        return ''
+    deduped: List[str] = []
+    seen = set()
+    for name in names:
+        if name in seen:
+            continue
+        seen.add(name)
+        deduped.append(name)
+        if len(deduped) >= limit:
+            break
+    suffix = '...' if len(names) > len(deduped) else ''
+    return f'{label}: {", ".join(deduped)}{suffix}'
+
+
+def _build_next_thread(context: Dict[str, List[str]]) -> str:
+    outgoing = _edge_items(context.get('outgoing', []))
+    incoming = _edge_items(context.get('incoming', []))
+    if outgoing:
+        return f'Follow {outgoing[0][1]} to continue the thread.'
+    if incoming:
+        return f'Backtrack to {incoming[0][1]} to see the caller.'
+    return 'Follow the nearest referenced symbol to continue the thread.'
@@ -0,0 +1,236 @@
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .models import ParseWarning
+from .source import SourceBuffer, source_from_bytes
+
+
+MAX_IDLE_READERS = 4
+MAX_TREES = 32
+
+
+@dataclass
+class TreeEntry:
+    path: str
+    object_sha: str
+    size: int
+
+
+class CatFileBatch:
+    # One long-lived `git cat-file --batch` process. Requests and replies are
+    # strictly sequential on its pipes, so an instance serves one caller at a time.
+    def __init__(self, git_dir: str) -> None:
+        self.process = subprocess.Popen(
+            ['git', '--git-dir', git_dir, 'cat-file', '--batch'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def read(self, object_name: str) -> Optional[bytes]:
+        stdin = self.process.stdin
+        stdout = self.process.stdout
+        stdin.write(object_name.encode('utf-8', errors='replace') + b'\n')
+        stdin.flush()
+        header = stdout.readline()
+        if not header:
+            raise OSError('git cat-file exited unexpectedly')
+        parts = header.split()
+        if len(parts) != 3:
+            # `<name> missing` or `<name> ambiguous`
+            return None
+        size = int(parts[2])
+        data = stdout.read(size)
+        stdout.read(1)
+        if parts[1] != b'blob':
+            return None
+        return data
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def close(self) -> None:
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class _BatchPool:
+    def __init__(self, git_dir: str) -> None:
+        self.git_dir = git_dir
+        self.idle: List[CatFileBatch] = []
+        self.lock = threading.Lock()
+
+    def acquire(self) -> CatFileBatch:
+        with self.lock:
+            while self.idle:
+                batch = self.idle.pop()
+                if batch.alive():
+                    return batch
+                batch.close()
+        return CatFileBatch(self.git_dir)
+
+    def release(self, batch: CatFileBatch) -> None:
+        with self.lock:
+            if batch.alive() and len(self.idle) < MAX_IDLE_READERS:
+                self.idle.append(batch)
+                return
+        batch.close()
+
+    def close(self) -> None:
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for batch in idle:
+            batch.close()
+
+
+# Keyed by (pid, git_dir): a reader's pipes belong to the process that started
+# it, and a forked child must never share them with its parent or siblings.
+_POOLS: Dict[Tuple[int, str], _BatchPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def close_pools() -> None:
+    # Stops every idle reader this process started. Called before forking
+    # workers from a preloaded master, so none of them inherits the pipes.
+    pid = os.getpid()
+    with _POOLS_LOCK:
+        pools = [pool for (owner, _), pool in _POOLS.items() if owner == pid]
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
+def _forget_pools_after_fork() -> None:
+    # The child's copies of its parent's readers are dropped, not closed: the
+    # processes are not its children, and the parent may still be using them.
+    global _POOLS_LOCK
+    _POOLS.clear()
+    _POOLS_LOCK = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pools_after_fork)
+
+
+@contextmanager
+def open_batch(git_dir: str) -> Iterator[CatFileBatch]:
+    # Readers are pooled per repository and handed out one per caller, so requests
+    # for different refs of the same repository read in parallel.
+    key = (os.getpid(), git_dir)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _BatchPool(git_dir)
+            _POOLS[key] = pool
+    batch = pool.acquire()
+    try:
+        yield batch
+    except BaseException:
+        batch.close()
+        raise
+    pool.release(batch)
+
+
+def list_tree(git_dir: str, commit_sha: str, prefix: str = '') -> List[TreeEntry]:
+    args = ['git', '--git-dir', git_dir, 'ls-tree', '-r', '-l', '-z', '--full-tree', commit_sha]
+    if prefix:
+        args += ['--', prefix]
+    output = subprocess.check_output(args)
+    strip = f'{prefix}/' if prefix else ''
+    entries: List[TreeEntry] = []
+    for record in output.split(b'\0'):
+        if not record:
+            continue
+        meta, _, raw_path = record.partition(b'\t')
+        parts = meta.split()
+        # Submodules and symlinks have no source to read.
+        if len(parts) != 4 or parts[1] != b'blob' or parts[0] == b'120000':
+            continue
+        path = raw_path.decode('utf-8', errors='replace')
+        if strip:
+            if not path.startswith(strip):
+                continue
+            path = path[len(strip):]
+        entries.append(TreeEntry(
+            path=path,
+            object_sha=parts[2].decode('ascii'),
+            size=int(parts[3]),
+        ))
+    return entries
+
+
+class GitTree:
+    # A commit's tree (or a subdirectory of it) read straight from the object
+    # database: paths are relative to `prefix`, contents come from cat-file.
+    def __init__(self, git_dir: str, commit_sha: str, prefix: str = '') -> None:
+        self.git_dir = git_dir
+        self.commit_sha = commit_sha
+        self.prefix = prefix
+        self._entries: Optional[List[TreeEntry]] = None
+        self._shas: Dict[str, str] = {}
+
+    def entries(self) -> List[TreeEntry]:
+        if self._entries is None:
+            self._entries = list_tree(self.git_dir, self.commit_sha, self.prefix)
+            self._shas = {entry.path: entry.object_sha for entry in self._entries}
+        return self._entries
+
+    def blob_sha(self, rel_path: str) -> Optional[str]:
+        self.entries()
+        return self._shas.get(rel_path)
+
+    def read_bytes(self, rel_path: str) -> Optional[bytes]:
+        object_name = self._shas.get(rel_path)
+        if object_name is None:
+            path = f'{self.prefix}/{rel_path}' if self.prefix else rel_path
+            object_name = f'{self.commit_sha}:{path}'
+        with open_batch(self.git_dir) as batch:
+            return batch.read(object_name)
+
+    def read(self, rel_path: str, warnings: List[ParseWarning]) -> Optional[SourceBuffer]:
+        try:
+            data = self.read_bytes(rel_path)
+        except OSError as exc:
+            data = None
+            message = str(exc)
+        else:
+            message = 'Object not found in repository'
+        if data is None:
+            warnings.append(ParseWarning(
+                code='read_failed',
+                message=message,
+                path=rel_path,
+            ))
+            return None
+        return source_from_bytes(data, rel_path, warnings)
+
+
+_TREES: OrderedDict[Tuple[str, str, str], GitTree] = OrderedDict()
+_TREES_LOCK = threading.Lock()
+
+
+def git_tree(git_dir: str, commit_sha: str, prefix: str = '') -> GitTree:
+    # A commit's tree never changes, so its listing is shared by every request for
+    # it instead of running ls-tree over the whole commit each time.
+    key = (git_dir, commit_sha, prefix)
+    with _TREES_LOCK:
+        tree = _TREES.get(key)
+        if tree is None:
+            tree = GitTree(git_dir, commit_sha, prefix)
+            _TREES[key] = tree
+            while len(_TREES) > MAX_TREES:
+                _TREES.popitem(last=False)
+        else:
+            _TREES.move_to_end(key)
+        return tree
@@ -1,12 +1,17 @@
 import ast
 import os
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
 from .models import GraphEdge, SourceLocation, SymbolNode, blueprint_id, external_id, file_id, symbol_id
 from .parse_python import ParsedFile, doc_summary, signature_from_node
 
 
+ROUTE_DECORATORS = {'route', 'get', 'post', 'put', 'patch', 'delete'}
+METHOD_DECORATORS = {'get', 'post', 'put', 'patch', 'delete'}
+
+
 @dataclass
 class GraphResult:
     nodes: Dict[str, SymbolNode]
@@ -14,7 +19,50 @@ class GraphResult:
     toc: List[Dict[str, str]]
 
 
-def build_graph(parsed_files: List[ParsedFile]) -> GraphResult:
+@dataclass
+class RouteInfo:
+    handler_id: str
+    handler_name: str
+    module: str
+    file_path: str
+    line: int
+    path: str
+    methods: List[str]
+
+
+# A call site reduced to what resolution needs: ('name', None, func_name, None) for
+# bare calls, ('attr', base_name_or_None, attr, first_arg_name_or_None) for attributes.
+CallRef = Tuple[str, Optional[str], str, Optional[str]]
+
+
+# Bump whenever extraction output changes; cached extracts are keyed by it.
+EXTRACTOR_VERSION = 2
+# Python extracts also depend on the running interpreter's grammar.
+EXTRACT_KIND = f'python:{EXTRACTOR_VERSION}:py{sys.version_info[0]}{sys.version_info[1]}'
+
+
+@dataclass
+class FileExtract:
+    path: str
+    module: str
+    blueprints: List[Tuple[str, SymbolNode]] = field(default_factory=list)
+    definitions: List[Tuple[SymbolNode, List[SymbolNode]]] = field(default_factory=list)
+    import_modules: List[str] = field(default_factory=list)
+    import_aliases: List[Tuple[str, str]] = field(default_factory=list)
+    # Each class's bases carry the number of calls entries recorded before it, so
+    # inheritance edges are emitted in document order between the call edges.
+    bases: List[Tuple[str, List[str], int]] = field(default_factory=list)
+    calls: List[Tuple[Optional[str], str, List[CallRef]]] = field(default_factory=list)
+    routes: List[RouteInfo] = field(default_factory=list)
+
+
+def extract_file(parsed: ParsedFile) -> FileExtract:
+    extractor = _FileExtractor(parsed)
+    extractor.visit(parsed.tree)
+    return extractor.extract
+
+
+def build_graph(extracts: List[FileExtract]) -> GraphResult:
     nodes: Dict[str, SymbolNode] = {}
     edges: List[GraphEdge] = []
 
@@ -24,34 +72,34 @@ def build_graph(parsed_files: List[ParsedFile]) -> GraphResult:
     methods_by_class: Dict[Tuple[str, str], Dict[str, str]] = {}
     blueprint_vars: Dict[str, Dict[str, str]] = {}
 
-    for parsed in parsed_files:
+    for extract in extracts:
         file_node = SymbolNode(
-            id=file_id(parsed.path),
-            name=parsed.path,
+            id=file_id(extract.path),
+            name=extract.path,
             kind='file',
             summary='',
-            module=parsed.module,
-            location=SourceLocation(path=parsed.path),
+            module=extract.module,
+            location=SourceLocation(path=extract.path),
         )
         nodes[file_node.id] = file_node
-        module_map[parsed.module] = file_node.id
-        symbols_by_module.setdefault(parsed.module, {})
-        methods_by_class.setdefault((parsed.module, ''), {})
+        module_map[extract.module] = file_node.id
+        symbols_by_module.setdefault(extract.module, {})
+        methods_by_class.setdefault((extract.module, ''), {})
 
-    for parsed in parsed_files:
-        blueprint_vars[parsed.module] = _extract_blueprints(parsed, nodes, edges)
-        _extract_symbols(parsed, nodes, edges, symbols_by_module, symbols_by_qualname, methods_by_class)
+    for extract in extracts:
+        blueprint_vars[extract.module] = _register_blueprints(extract, nodes, edges)
+        _register_symbols(extract, nodes, edges, symbols_by_module, symbols_by_qualname, methods_by_class)
 
     imports_by_module: Dict[str, Dict[str, str]] = {}
     import_symbols_by_module: Dict[str, Dict[str, str]] = {}
-    for parsed in parsed_files:
-        alias_map, alias_symbols = _extract_imports(parsed, module_map, nodes, edges, symbols_by_qualname)
-        imports_by_module[parsed.module] = alias_map
-        import_symbols_by_module[parsed.module] = alias_symbols
-
-    for parsed in parsed_files:
-        _extract_calls(
-            parsed,
+    for extract in extracts:
+        alias_map, alias_symbols = _resolve_imports(extract, module_map, nodes, edges, symbols_by_qualname)
+        imports_by_module[extract.module] = alias_map
+        import_symbols_by_module[extract.module] = alias_symbols
+
+    for extract in extracts:
+        _resolve_calls(
+            extract,
             nodes,
             edges,
             symbols_by_module,
@@ -63,88 +111,255 @@ def build_graph(parsed_files: List[ParsedFile]) -> GraphResult:
             blueprint_vars,
         )
 
-    toc = build_toc([parsed.path for parsed in parsed_files])
+    toc = build_toc([extract.path for extract in extracts])
     return GraphResult(nodes=nodes, edges=edges, toc=toc)
 
 
-def _extract_symbols(
-    parsed: ParsedFile,
+class _FileExtractor(ast.NodeVisitor):
+    # One traversal per file: module-level statements and class bodies yield symbols,
+    # blueprints, imports and routes, and the same descent continues into each
+    # function for the call references attributed to it.
+    def __init__(self, parsed: ParsedFile) -> None:
+        self.parsed = parsed
+        self.line_offsets = parsed.source.line_offsets()
+        self.extract = FileExtract(path=parsed.path, module=parsed.module)
+        self.class_name: Optional[str] = None
+        self.methods: List[SymbolNode] = []
+
+    def visit_Module(self, node: ast.Module) -> None:
+        for child in node.body:
+            self.visit(child)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        class_node = self._symbol(node, node.name, 'class')
+        bases: List[str] = []
+        for base in node.bases:
+            if isinstance(base, ast.Name):
+                bases.append(base.id)
+            elif isinstance(base, ast.Attribute):
+                bases.append(base.attr)
+        self.extract.bases.append((node.name, bases, len(self.extract.calls)))
+        self.class_name = node.name
+        self.methods = []
+        for item in node.body:
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.visit(item)
+        self.extract.definitions.append((class_node, self.methods))
+        self.class_name = None
+        self.methods = []
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_function(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self._visit_function(node)
+
+    def _visit_function(self, node: ast.AST) -> None:
+        if self.class_name is not None:
+            self.methods.append(self._symbol(node, f'{self.class_name}.{node.name}', 'method'))
+        else:
+            function_node = self._symbol(node, node.name, 'function')
+            self.extract.definitions.append((function_node, []))
+            for decorator in node.decorator_list:
+                route_spec = _route_from_decorator(decorator)
+                if not route_spec:
+                    continue
+                path, methods = route_spec
+                self.extract.routes.append(RouteInfo(
+                    handler_id=function_node.id,
+                    handler_name=node.name,
+                    module=self.parsed.module,
+                    file_path=self.parsed.path,
+                    line=getattr(node, 'lineno', 0) or 0,
+                    path=path,
+                    methods=methods,
+                ))
+        found: List[Tuple[int, CallRef]] = []
+        self._visit_calls(node, 1, found)
+        # Refs are met depth-first; a stable sort by depth restores the breadth-first
+        # order calls have always been resolved (and their edges emitted) in.
+        found.sort(key=lambda item: item[0])
+        self.extract.calls.append((self.class_name, node.name, [ref for _, ref in found]))
+
+    def _visit_calls(self, node: ast.AST, depth: int, found: List[Tuple[int, CallRef]]) -> None:
+        # The descent below a function: only call sites matter, nested definitions included.
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.Call):
+                ref = _call_ref(child)
+                if ref:
+                    found.append((depth, ref))
+            elif isinstance(child, ast.expr_context):
+                continue
+            self._visit_calls(child, depth + 1, found)
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        if not isinstance(node.value, ast.Call):
+            return
+        if not isinstance(node.value.func, ast.Name) or node.value.func.id != 'Blueprint':
+            return
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self.extract.blueprints.append((target.id, SymbolNode(
+                    id=blueprint_id(target.id),
+                    name=target.id,
+                    kind='blueprint',
+                    summary='',
+                    location=_location_from_node(self.parsed.path, node),
+                    module=self.parsed.module,
+                )))
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            module_name = alias.name
+            alias_name = alias.asname or module_name.split('.')[-1]
+            self.extract.import_aliases.append((alias_name, module_name))
+            self.extract.import_modules.append(module_name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        module_name = _resolve_import_module(self.parsed.module, node.module, node.level)
+        if module_name:
+            self.extract.import_modules.append(module_name)
+        for alias in node.names:
+            if alias.name == '*':
+                continue
+            alias_name = alias.asname or alias.name
+            if module_name:
+                self.extract.import_aliases.append((alias_name, f'{module_name}.{alias.name}'))
+            else:
+                self.extract.import_aliases.append((alias_name, alias.name))
+
+    def generic_visit(self, node: ast.AST) -> None:
+        # Other module-level statements (conditionals, expressions, ...) carry nothing
+        # the graph uses, so their subtrees are never descended into.
+        return
+
+    def _symbol(self, node: ast.AST, qualname: str, kind: str) -> SymbolNode:
+        docstring = ast.get_docstring(node)
+        return SymbolNode(
+            id=symbol_id(f'{self.parsed.module}.{qualname}'),
+            name=node.name,
+            kind=kind,
+            summary=doc_summary(docstring),
+            signature=signature_from_node(node, self.parsed.source, self.line_offsets),
+            docstring=docstring,
+            location=_location_from_node(self.parsed.path, node),
+            module=self.parsed.module,
+        )
+
+
+def _call_ref(node: ast.Call) -> Optional[CallRef]:
+    if isinstance(node.func, ast.Name):
+        return ('name', None, node.func.id, None)
+    if isinstance(node.func, ast.Attribute):
+        attr = node.func.attr
+        if isinstance(node.func.value, ast.Name):
+            first_arg = None
+            if attr == 'register_blueprint' and node.args and isinstance(node.args[0], ast.Name):
+                first_arg = node.args[0].id
+            return ('attr', node.func.value.id, attr, first_arg)
+        return ('attr', None, attr, None)
+    return None
+
+
+def _route_from_decorator(decorator: ast.AST) -> Optional[tuple[str, List[str]]]:
+    if not isinstance(decorator, ast.Call):
+        return None
+    if not isinstance(decorator.func, ast.Attribute):
+        return None
+    attr = decorator.func.attr
+    if attr not in ROUTE_DECORATORS:
+        return None
+    path = _extract_route_path(decorator)
+    methods = _extract_route_methods(decorator, attr)
+    return path, methods
+
+
+def _extract_route_path(call: ast.Call) -> str:
+    if call.args:
+        value = _string_value(call.args[0])
+        if value:
+            return value
+    for keyword in call.keywords:
+        if keyword.arg in {'rule', 'path'}:
+            value = _string_value(keyword.value)
+            if value:
+                return value
+    return ''
+
+
+def _extract_route_methods(call: ast.Call, attr: str) -> List[str]:
+    methods: List[str] = []
+    if attr in METHOD_DECORATORS:
+        methods.append(attr.upper())
+    for keyword in call.keywords:
+        if keyword.arg != 'methods':
+            continue
+        methods.extend(_extract_string_list(keyword.value))
+    seen = set()
+    ordered: List[str] = []
+    for method in methods:
+        method = method.upper()
+        if method and method not in seen:
+            seen.add(method)
+            ordered.append(method)
+    return ordered
+
+
+def _extract_string_list(node: ast.AST) -> List[str]:
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        values: List[str] = []
+        for item in node.elts:
+            value = _string_value(item)
+            if value:
+                values.append(value)
+        return values
+    value = _string_value(node)
+    return [value] if value else []
+
+
+def _string_value(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Str):
+        return node.s
+    return None
+
+
+def _register_symbols(
+    extract: FileExtract,
     nodes: Dict[str, SymbolNode],
     edges: List[GraphEdge],
     symbols_by_module: Dict[str, Dict[str, str]],
     symbols_by_qualname: Dict[str, str],
     methods_by_class: Dict[Tuple[str, str], Dict[str, str]],
 ) -> None:
-    for node in parsed.tree.body:
-        if isinstance(node, ast.ClassDef):
-            class_id = symbol_id(f'{parsed.module}.{node.name}')
-            class_node = SymbolNode(
-                id=class_id,
-                name=node.name,
-                kind='class',
-                summary=doc_summary(ast.get_docstring(node)),
-                signature=signature_from_node(node, parsed.source),
-                docstring=ast.get_docstring(node),
-                location=_location_from_node(parsed.path, node),
-                module=parsed.module,
-            )
-            nodes[class_id] = class_node
-            symbols_by_module[parsed.module][node.name] = class_id
-            symbols_by_qualname[f'{parsed.module}.{node.name}'] = class_id
-            edges.append(GraphEdge(
-                source=file_id(parsed.path),
-                target=class_id,
-                kind='contains',
-                confidence='high',
-            ))
-            methods_by_class[(parsed.module, node.name)] = {}
-            for item in node.body:
-                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    method_id = symbol_id(f'{parsed.module}.{node.name}.{item.name}')
-                    method_node = SymbolNode(
-                        id=method_id,
-                        name=item.name,
-                        kind='method',
-                        summary=doc_summary(ast.get_docstring(item)),
-                        signature=signature_from_node(item, parsed.source),
-                        docstring=ast.get_docstring(item),
-                        location=_location_from_node(parsed.path, item),
-                        module=parsed.module,
-                    )
-                    nodes[method_id] = method_node
-                    methods_by_class[(parsed.module, node.name)][item.name] = method_id
-                    symbols_by_qualname[f'{parsed.module}.{node.name}.{item.name}'] = method_id
-                    edges.append(GraphEdge(
-                        source=class_id,
-                        target=method_id,
-                        kind='contains',
-                        confidence='high',
-                    ))
-        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            func_id = symbol_id(f'{parsed.module}.{node.name}')
-            func_node = SymbolNode(
-                id=func_id,
-                name=node.name,
-                kind='function',
-                summary=doc_summary(ast.get_docstring(node)),
-                signature=signature_from_node(node, parsed.source),
-                docstring=ast.get_docstring(node),
-                location=_location_from_node(parsed.path, node),
-                module=parsed.module,
-            )
-            nodes[func_id] = func_node
-            symbols_by_module[parsed.module][node.name] = func_id
-            symbols_by_qualname[f'{parsed.module}.{node.name}'] = func_id
+    for symbol, methods in extract.definitions:
+        nodes[symbol.id] = symbol
+        symbols_by_module[extract.module][symbol.name] = symbol.id
+        symbols_by_qualname[f'{extract.module}.{symbol.name}'] = symbol.id
+        edges.append(GraphEdge(
+            source=file_id(extract.path),
+            target=symbol.id,
+            kind='contains',
+            confidence='high',
+        ))
+        if symbol.kind != 'class':
+            continue
+        methods_by_class[(extract.module, symbol.name)] = {}
+        for method in methods:
+            nodes[method.id] = method
+            methods_by_class[(extract.module, symbol.name)][method.name] = method.id
+            symbols_by_qualname[f'{extract.module}.{symbol.name}.{method.name}'] = method.id
             edges.append(GraphEdge(
-                source=file_id(parsed.path),
-                target=func_id,
+                source=symbol.id,
+                target=method.id,
                 kind='contains',
                 confidence='high',
             ))
 
 
-def _extract_imports(
-    parsed: ParsedFile,
+def _resolve_imports(
+    extract: FileExtract,
     module_map: Dict[str, str],
     nodes: Dict[str, SymbolNode],
     edges: List[GraphEdge],
@@ -152,32 +367,12 @@ def _extract_imports(
 ) -> tuple[Dict[str, str], Dict[str, str]]:
     alias_map: Dict[str, str] = {}
     alias_symbols: Dict[str, str] = {}
-    for node in parsed.tree.body:
-        if isinstance(node, ast.Import):
-            for alias in node.names:
-                module_name = alias.name
-                alias_name = alias.asname or module_name.split('.')[-1]
-                alias_map[alias_name] = module_name
-                if module_name in symbols_by_qualname:
-                    alias_symbols[alias_name] = symbols_by_qualname[module_name]
-                _add_import_edge(parsed.path, module_name, module_map, nodes, edges)
-        elif isinstance(node, ast.ImportFrom):
-            module_name = _resolve_import_module(parsed.module, node.module, node.level)
-            if module_name:
-                _add_import_edge(parsed.path, module_name, module_map, nodes, edges)
-            for alias in node.names:
-                if alias.name == '*':
-                    continue
-                alias_name = alias.asname or alias.name
-                if module_name:
-                    qualname = f'{module_name}.{alias.name}'
-                    alias_map[alias_name] = qualname
-                    if qualname in symbols_by_qualname:
-                        alias_symbols[alias_name] = symbols_by_qualname[qualname]
-                else:
-                    alias_map[alias_name] = alias.name
-                    if alias.name in symbols_by_qualname:
-                        alias_symbols[alias_name] = symbols_by_qualname[alias.name]
+    for alias_name, qualname in extract.import_aliases:
+        alias_map[alias_name] = qualname
+        if qualname in symbols_by_qualname:
+            alias_symbols[alias_name] = symbols_by_qualname[qualname]
+    for module_name in extract.import_modules:
+        _add_import_edge(extract.path, module_name, module_map, nodes, edges)
     return alias_map, alias_symbols
 
 
@@ -203,8 +398,8 @@ def _add_import_edge(
     ))
 
 
-def _extract_calls(
-    parsed: ParsedFile,
+def _resolve_calls(
+    extract: FileExtract,
     nodes: Dict[str, SymbolNode],
     edges: List[GraphEdge],
     symbols_by_module: Dict[str, Dict[str, str]],
@@ -215,57 +410,48 @@ def _extract_calls(
     module_map: Dict[str, str],
     blueprint_vars: Dict[str, Dict[str, str]],
 ) -> None:
-    module_symbols = symbols_by_module.get(parsed.module, {})
-    alias_map = imports_by_module.get(parsed.module, {})
-    alias_symbols = import_symbols_by_module.get(parsed.module, {})
-    blueprint_map = blueprint_vars.get(parsed.module, {})
-
-    for node in parsed.tree.body:
-        if isinstance(node, ast.ClassDef):
-            class_id = module_symbols.get(node.name)
+    module_symbols = symbols_by_module.get(extract.module, {})
+    alias_map = imports_by_module.get(extract.module, {})
+    alias_symbols = import_symbols_by_module.get(extract.module, {})
+    blueprint_map = blueprint_vars.get(extract.module, {})
+
+    # The trailing empty entry flushes bases of classes declared after the last function.
+    pending_bases = iter(extract.bases)
+    next_bases = next(pending_bases, None)
+    for position, (class_name, func_name, refs) in enumerate(extract.calls + [(None, '', [])]):
+        while next_bases is not None and next_bases[2] <= position:
+            class_id = module_symbols.get(next_bases[0])
             if class_id:
-                _extract_inheritance(node, class_id, nodes, edges, module_map)
-            for item in node.body:
-                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    method_id = methods_by_class.get((parsed.module, node.name), {}).get(item.name)
-                    if method_id:
-                        _walk_calls(
-                            item,
-                            method_id,
-                            node.name,
-                            nodes,
-                    edges,
-                    module_symbols,
-                    symbols_by_qualname,
-                    methods_by_class,
-                    alias_map,
-                    alias_symbols,
-                    module_map,
-                    blueprint_map,
-                )
-        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            func_id = module_symbols.get(node.name)
-            if func_id:
-                _walk_calls(
-                    node,
-                    func_id,
-                    None,
-                    nodes,
-                    edges,
-                    module_symbols,
-                    symbols_by_qualname,
-                    methods_by_class,
-                    alias_map,
-                    alias_symbols,
-                    module_map,
-                    blueprint_map,
-                )
-
-
-def _walk_calls(
-    func_node: ast.AST,
+                _add_inheritance(next_bases[1], class_id, nodes, edges)
+            next_bases = next(pending_bases, None)
+        if class_name:
+            source_id = methods_by_class.get((extract.module, class_name), {}).get(func_name)
+        else:
+            source_id = module_symbols.get(func_name)
+        if not source_id:
+            continue
+        _resolve_call_refs(
+            refs,
+            source_id,
+            class_name,
+            extract.module,
+            nodes,
+            edges,
+            module_symbols,
+            symbols_by_qualname,
+            methods_by_class,
+            alias_map,
+            alias_symbols,
+            module_map,
+            blueprint_map,
+        )
+
+
+def _resolve_call_refs(
+    refs: List[CallRef],
     source_id: str,
     current_class: Optional[str],
+    current_module: str,
     nodes: Dict[str, SymbolNode],
     edges: List[GraphEdge],
     module_symbols: Dict[str, str],
@@ -276,11 +462,9 @@ def _walk_calls(
     module_map: Dict[str, str],
     blueprint_map: Dict[str, str],
 ) -> None:
-    for node in ast.walk(func_node):
-        if not isinstance(node, ast.Call):
-            continue
-        if isinstance(node.func, ast.Name):
-            target_name = node.func.id
+    for ref_kind, base, attr, first_arg in refs:
+        if ref_kind == 'name':
+            target_name = attr
             target_id = module_symbols.get(target_name)
             confidence = 'high'
             if not target_id and target_name in alias_symbols:
@@ -298,12 +482,22 @@ def _walk_calls(
                 kind='calls',
                 confidence=confidence,
             ))
-        elif isinstance(node.func, ast.Attribute):
-            attr = node.func.attr
-            if isinstance(node.func.value, ast.Name):
-                base = node.func.value.id
-                if base in ('self', 'cls') and current_class:
-                    method_id = methods_by_class.get((nodes[source_id].module or '', current_class), {}).get(attr)
+        elif base is not None:
+            if base in ('self', 'cls') and current_class:
+                method_id = methods_by_class.get((current_module, current_class), {}).get(attr)
+                if method_id:
+                    edges.append(GraphEdge(
+                        source=source_id,
+                        target=method_id,
+                        kind='calls',
+                        confidence='medium',
+                    ))
+                    continue
+            if base in module_symbols:
+                class_id = module_symbols.get(base)
+                class_node = nodes.get(class_id) if class_id else None
+                if class_node and class_node.kind == 'class':
+                    method_id = methods_by_class.get((class_node.module or '', class_node.name), {}).get(attr)
                     if method_id:
                         edges.append(GraphEdge(
                             source=source_id,
@@ -312,89 +506,68 @@ def _walk_calls(
                             confidence='medium',
                         ))
                         continue
-                if base in module_symbols:
-                    class_id = module_symbols.get(base)
-                    class_node = nodes.get(class_id) if class_id else None
-                    if class_node and class_node.kind == 'class':
-                        method_id = methods_by_class.get((class_node.module or '', class_node.name), {}).get(attr)
-                        if method_id:
-                            edges.append(GraphEdge(
-                                source=source_id,
-                                target=method_id,
-                                kind='calls',
-                                confidence='medium',
-                            ))
-                            continue
-                if base in alias_symbols:
-                    symbol_id_value = alias_symbols[base]
-                    symbol_node = nodes.get(symbol_id_value)
-                    if symbol_node and symbol_node.kind == 'class':
-                        method_id = methods_by_class.get((symbol_node.module or '', symbol_node.name), {}).get(attr)
-                        if method_id:
-                            edges.append(GraphEdge(
-                                source=source_id,
-                                target=method_id,
-                                kind='calls',
-                                confidence='medium',
-                            ))
-                            continue
-                if base in alias_map:
-                    module_name = alias_map[base]
-                    qualified = f'{module_name}.{attr}'
-                    if qualified in symbols_by_qualname:
-                        target_id = symbols_by_qualname[qualified]
-                    else:
-                        target_id = _resolve_module_target(module_name, module_map, symbols_by_qualname, nodes)
-                    edges.append(GraphEdge(
-                        source=source_id,
-                        target=target_id,
-                        kind='calls',
-                        confidence='medium',
-                    ))
-                    continue
-                if attr == 'register_blueprint' and node.args:
-                    first_arg = node.args[0]
-                    if isinstance(first_arg, ast.Name):
-                        blueprint_id_value = blueprint_map.get(first_arg.id)
-                        if blueprint_id_value:
-                            edges.append(GraphEdge(
-                                source=source_id,
-                                target=blueprint_id_value,
-                                kind='blueprint',
-                                confidence='medium',
-                            ))
-                            continue
-                target_id = _ensure_external(nodes, f'{base}.{attr}')
-                edges.append(GraphEdge(
-                    source=source_id,
-                    target=target_id,
-                    kind='calls',
-                    confidence='low',
-                ))
-            else:
-                target_id = _ensure_external(nodes, attr)
+            if base in alias_symbols:
+                symbol_id_value = alias_symbols[base]
+                symbol_node = nodes.get(symbol_id_value)
+                if symbol_node and symbol_node.kind == 'class':
+                    method_id = methods_by_class.get((symbol_node.module or '', symbol_node.name), {}).get(attr)
+                    if method_id:
+                        edges.append(GraphEdge(
+                            source=source_id,
+                            target=method_id,
+                            kind='calls',
+                            confidence='medium',
+                        ))
+                        continue
+            if base in alias_map:
+                module_name = alias_map[base]
+                qualified = f'{module_name}.{attr}'
+                if qualified in symbols_by_qualname:
+                    target_id = symbols_by_qualname[qualified]
+                else:
+                    target_id = _resolve_module_target(module_name, module_map, symbols_by_qualname, nodes)
                 edges.append(GraphEdge(
                     source=source_id,
                     target=target_id,
                     kind='calls',
-                    confidence='low',
+                    confidence='medium',
                 ))
+                continue
+            if first_arg:
+                blueprint_id_value = blueprint_map.get(first_arg)
+                if blueprint_id_value:
+                    edges.append(GraphEdge(
+                        source=source_id,
+                        target=blueprint_id_value,
+                        kind='blueprint',
+                        confidence='medium',
+                    ))
+                    continue
+            target_id = _ensure_external(nodes, f'{base}.{attr}')
+            edges.append(GraphEdge(
+                source=source_id,
+                target=target_id,
+                kind='calls',
+                confidence='low',
+            ))
+        else:
+            target_id = _ensure_external(nodes, attr)
+            edges.append(GraphEdge(
+                source=source_id,
+                target=target_id,
+                kind='calls',
+                confidence='low',
+            ))
 
 
-def _extract_inheritance(
-    node: ast.ClassDef,
+def _add_inheritance(
+    bases: List[str],
     class_id: str,
     nodes: Dict[str, SymbolNode],
     edges: List[GraphEdge],
-    module_map: Dict[str, str],
 ) -> None:
-    for base in node.bases:
-        if isinstance(base, ast.Name):
-            target_id = _ensure_external(nodes, base.id)
-        elif isinstance(base, ast.Attribute):
-            target_id = _ensure_external(nodes, base.attr)
-        else:
-            continue
+    for base_name in bases:
+        target_id = _ensure_external(nodes, base_name)
         edges.append(GraphEdge(
             source=class_id,
             target=target_id,
@@ -403,34 +576,22 @@ def _extract_inheritance(
         ))
 
 
-def _extract_blueprints(
-    parsed: ParsedFile,
+def _register_blueprints(
+    extract: FileExtract,
     nodes: Dict[str, SymbolNode],
     edges: List[GraphEdge],
 ) -> Dict[str, str]:
     blueprint_vars: Dict[str, str] = {}
-    for node in parsed.tree.body:
-        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
-            if isinstance(node.value.func, ast.Name) and node.value.func.id == 'Blueprint':
-                for target in node.targets:
-                    if isinstance(target, ast.Name):
-                        blueprint_node_id = blueprint_id(target.id)
-                        if blueprint_node_id not in nodes:
-                            nodes[blueprint_node_id] = SymbolNode(
-                                id=blueprint_node_id,
-                                name=target.id,
-                                kind='blueprint',
-                                summary='',
-                                location=_location_from_node(parsed.path, node),
-                                module=parsed.module,
-                            )
-                            edges.append(GraphEdge(
-                                source=file_id(parsed.path),
-                                target=blueprint_node_id,
-                                kind='contains',
-                                confidence='medium',
-                            ))
-                        blueprint_vars[target.id] = blueprint_node_id
+    for var_name, blueprint_node in extract.blueprints:
+        if blueprint_node.id not in nodes:
+            nodes[blueprint_node.id] = blueprint_node
+            edges.append(GraphEdge(
+                source=file_id(extract.path),
+                target=blueprint_node.id,
+                kind='contains',
+                confidence='medium',
+            ))
+        blueprint_vars[var_name] = blueprint_node.id
     return blueprint_vars
 
 
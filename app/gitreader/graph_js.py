@@ -1,9 +1,11 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Set, Tuple
 
 from .models import GraphEdge, SourceLocation, SymbolNode, external_id, file_id, symbol_id
 from .parse_js import ParsedJsFile
+from .source import SourceBuffer
+from .ts_query import compile_query, query_matches
 
 
 @dataclass
@@ -21,36 +23,86 @@ TS_TYPE_NODES = {
     'internal_module',
 }
 
+# Call sites and require()/import() arguments are matched by tree-sitter itself;
+# patterns a grammar does not support are skipped when the query is compiled.
+# Each pattern captures its whole call as @call so matches can be put back in the
+# order the old stack walk visited them (see _walk_order).
+CALL_QUERY_PATTERNS = (
+    '(call_expression function: (identifier) @callee) @call',
+    '(call_expression function: (member_expression object: (_) @object property: (_) @property)) @call',
+)
+IMPORT_CALL_QUERY_PATTERNS = (
+    '(call_expression function: (identifier) @require (#eq? @require "require") arguments: (arguments . (_) @argument)) @call',
+    '(import_call . (_) @argument) @call',
+    '(import_expression . (_) @argument) @call',
+)
 
-def build_graph_js(parsed_files: List[ParsedJsFile]) -> GraphResult:
+
+# A call site reduced to what resolution needs: ('call', None, name) for bare calls,
+# ('this', None, prop) for this/super members, ('member', obj, prop) for identifier
+# receivers and ('expr', None, prop) for any other receiver.
+CallRef = Tuple[str, Optional[str], str]
+
+
+# Bump whenever extraction output changes; cached extracts are keyed by it.
+EXTRACTOR_VERSION = 2
+EXTRACT_KIND = f'js:{EXTRACTOR_VERSION}'
+
+
+@dataclass
+class FileExtract:
+    path: str
+    module: str
+    definitions: List[Tuple[str, SymbolNode, List[SymbolNode]]] = field(default_factory=list)
+    imports: List[str] = field(default_factory=list)
+    heritage: List[Tuple[str, List[str]]] = field(default_factory=list)
+    calls: List[Tuple[Optional[str], str, List[CallRef]]] = field(default_factory=list)
+
+
+def extract_js_file(parsed: ParsedJsFile) -> FileExtract:
+    extract = FileExtract(path=parsed.path, module=parsed.module)
+    if not parsed.tree:
+        return extract
+    source = parsed.source
+    root = parsed.tree.root_node
+    call_query = compile_query(parsed.language, parsed.tree, CALL_QUERY_PATTERNS)
+    import_query = compile_query(parsed.language, parsed.tree, IMPORT_CALL_QUERY_PATTERNS)
+    extract.definitions = _extract_definitions(parsed, root, source)
+    extract.imports = _extract_imports(root, import_query, source)
+    extract.heritage = _extract_inheritance(root, source)
+    extract.calls = _extract_calls(root, call_query, source)
+    return extract
+
+
+def build_graph_js(extracts: List[FileExtract]) -> GraphResult:
     nodes: Dict[str, SymbolNode] = {}
     edges: List[GraphEdge] = []
     files: List[str] = []
 
-    file_paths = {parsed.path for parsed in parsed_files}
+    file_paths = {extract.path for extract in extracts}
     symbols_by_module: Dict[str, Dict[str, str]] = {}
     classes_by_module: Dict[str, Dict[str, str]] = {}
     methods_by_class: Dict[Tuple[str, str], Dict[str, str]] = {}
     symbols_by_name: Dict[str, Set[str]] = {}
     classes_by_name: Dict[str, Set[str]] = {}
 
-    for parsed in parsed_files:
+    for extract in extracts:
         file_node = SymbolNode(
-            id=file_id(parsed.path),
-            name=parsed.path,
+            id=file_id(extract.path),
+            name=extract.path,
             kind='file',
             summary='',
-            module=parsed.module,
-            location=SourceLocation(path=parsed.path),
+            module=extract.module,
+            location=SourceLocation(path=extract.path),
         )
         nodes[file_node.id] = file_node
-        files.append(parsed.path)
-        symbols_by_module.setdefault(parsed.module, {})
-        classes_by_module.setdefault(parsed.module, {})
+        files.append(extract.path)
+        symbols_by_module.setdefault(extract.module, {})
+        classes_by_module.setdefault(extract.module, {})
 
-    for parsed in parsed_files:
-        _extract_definitions(
-            parsed,
+    for extract in extracts:
+        _register_definitions(
+            extract,
             nodes,
             edges,
             symbols_by_module,
@@ -60,11 +112,11 @@ def build_graph_js(parsed_files: List[ParsedJsFile]) -> GraphResult:
             classes_by_name,
         )
 
-    for parsed in parsed_files:
-        _extract_imports(parsed, nodes, edges, file_paths)
-        _extract_inheritance(parsed, nodes, edges, classes_by_module, classes_by_name)
-        _extract_calls(
-            parsed,
+    for extract in extracts:
+        _resolve_imports(extract, edges, file_paths)
+        _resolve_inheritance(extract, edges, classes_by_module, classes_by_name)
+        _resolve_calls(
+            extract,
             nodes,
             edges,
             symbols_by_module,
@@ -79,139 +131,141 @@ def build_graph_js(parsed_files: List[ParsedJsFile]) -> GraphResult:
 
 def _extract_definitions(
     parsed: ParsedJsFile,
-    nodes: Dict[str, SymbolNode],
-    edges: List[GraphEdge],
-    symbols_by_module: Dict[str, Dict[str, str]],
-    classes_by_module: Dict[str, Dict[str, str]],
-    methods_by_class: Dict[Tuple[str, str], Dict[str, str]],
-    symbols_by_name: Dict[str, Set[str]],
-    classes_by_name: Dict[str, Set[str]],
-) -> None:
-    if not parsed.tree:
-        return
-    root = parsed.tree.root_node
-    source_bytes = parsed.source.encode('utf-8')
-    module_symbols = symbols_by_module.get(parsed.module, {})
-    module_classes = classes_by_module.get(parsed.module, {})
+    root: object,
+    source: SourceBuffer,
+) -> List[Tuple[str, SymbolNode, List[SymbolNode]]]:
+    definitions: List[Tuple[str, SymbolNode, List[SymbolNode]]] = []
     for child in _iter_root_declarations(root):
         if child.type == 'class_declaration':
-            class_name = _node_name(child, source_bytes)
+            class_name = _node_name(child, source)
             if class_name:
-                _register_class(
-                    parsed,
-                    child,
-                    class_name,
-                    nodes,
-                    edges,
-                    module_symbols,
-                    module_classes,
-                    methods_by_class,
-                    symbols_by_name,
-                    classes_by_name,
-                    source_bytes,
-                )
+                definitions.append(_class_definition(parsed, child, class_name, source))
         elif child.type in TS_TYPE_NODES:
-            type_name = _node_name(child, source_bytes)
+            type_name = _node_name(child, source)
             if not type_name:
                 continue
-            _register_type_like(
-                parsed,
-                child,
-                type_name,
-                nodes,
-                edges,
-                module_symbols,
-                module_classes,
-                symbols_by_name,
-                classes_by_name,
-                source_bytes,
-            )
+            kind = 'type_alias' if child.type == 'type_alias_declaration' else 'type'
+            definitions.append((kind, SymbolNode(
+                id=symbol_id(f'{parsed.module}.{type_name}'),
+                name=type_name,
+                kind='class',
+                summary=_ts_decl_label(child.type),
+                signature=_signature_from_node(child, source),
+                location=_location_from_node(parsed.path, child),
+                module=parsed.module,
+            ), []))
         elif child.type == 'function_declaration':
-            func_name = _node_name(child, source_bytes)
+            func_name = _node_name(child, source)
             if not func_name:
                 continue
-            func_id = symbol_id(f'{parsed.module}.{func_name}')
-            nodes[func_id] = SymbolNode(
-                id=func_id,
+            definitions.append(('function', SymbolNode(
+                id=symbol_id(f'{parsed.module}.{func_name}'),
                 name=func_name,
                 kind='function',
                 summary='',
-                signature=_signature_from_node(child, source_bytes),
+                signature=_signature_from_node(child, source),
                 location=_location_from_node(parsed.path, child),
                 module=parsed.module,
-            )
-            module_symbols[func_name] = func_id
-            symbols_by_name.setdefault(func_name, set()).add(func_id)
-            edges.append(GraphEdge(
-                source=file_id(parsed.path),
-                target=func_id,
-                kind='contains',
-                confidence='high',
-            ))
+            ), []))
         elif child.type in {'lexical_declaration', 'variable_declaration'}:
             for declarator in child.children:
                 if declarator.type != 'variable_declarator':
                     continue
                 value = declarator.child_by_field_name('value')
                 name_node = declarator.child_by_field_name('name')
-                symbol_name = _node_text(name_node, source_bytes) if name_node else ''
+                symbol_name = _node_text(name_node, source) if name_node else ''
                 if not symbol_name:
                     continue
                 if value and value.type in {'arrow_function', 'function'}:
-                    func_id = symbol_id(f'{parsed.module}.{symbol_name}')
-                    nodes[func_id] = SymbolNode(
-                        id=func_id,
+                    definitions.append(('function', SymbolNode(
+                        id=symbol_id(f'{parsed.module}.{symbol_name}'),
                         name=symbol_name,
                         kind='function',
                         summary='',
-                        signature=_signature_from_node(declarator, source_bytes),
+                        signature=_signature_from_node(declarator, source),
                         location=_location_from_node(parsed.path, declarator),
                         module=parsed.module,
-                    )
-                    module_symbols[symbol_name] = func_id
-                    symbols_by_name.setdefault(symbol_name, set()).add(func_id)
-                    edges.append(GraphEdge(
-                        source=file_id(parsed.path),
-                        target=func_id,
-                        kind='contains',
-                        confidence='high',
-                    ))
+                    ), []))
                 elif value and value.type in {'class', 'class_declaration', 'class_expression'}:
-                    _register_class(
-                        parsed,
-                        value,
-                        symbol_name,
-                        nodes,
-                        edges,
-                        module_symbols,
-                        module_classes,
-                        methods_by_class,
-                        symbols_by_name,
-                        classes_by_name,
-                        source_bytes,
-                    )
-
-
-def _extract_imports(
-    parsed: ParsedJsFile,
+                    definitions.append(_class_definition(parsed, value, symbol_name, source))
+    return definitions
+
+
+def _register_definitions(
+    extract: FileExtract,
     nodes: Dict[str, SymbolNode],
     edges: List[GraphEdge],
-    file_paths: set[str],
+    symbols_by_module: Dict[str, Dict[str, str]],
+    classes_by_module: Dict[str, Dict[str, str]],
+    methods_by_class: Dict[Tuple[str, str], Dict[str, str]],
+    symbols_by_name: Dict[str, Set[str]],
+    classes_by_name: Dict[str, Set[str]],
 ) -> None:
-    if not parsed.tree:
-        return
-    root = parsed.tree.root_node
-    source_bytes = parsed.source.encode('utf-8')
-    base_dir = os.path.dirname(parsed.path)
-    seen: Set[tuple[str, str]] = set()
+    module_symbols = symbols_by_module.get(extract.module, {})
+    module_classes = classes_by_module.get(extract.module, {})
+    for kind, symbol, methods in extract.definitions:
+        if kind == 'class':
+            _register_class(
+                extract,
+                symbol,
+                methods,
+                nodes,
+                edges,
+                module_symbols,
+                module_classes,
+                methods_by_class,
+                symbols_by_name,
+                classes_by_name,
+            )
+        elif kind in {'type', 'type_alias'}:
+            _register_type_like(
+                extract,
+                symbol,
+                kind == 'type_alias',
+                nodes,
+                edges,
+                module_symbols,
+                module_classes,
+                symbols_by_name,
+                classes_by_name,
+            )
+        else:
+            nodes[symbol.id] = symbol
+            module_symbols[symbol.name] = symbol.id
+            symbols_by_name.setdefault(symbol.name, set()).add(symbol.id)
+            edges.append(GraphEdge(
+                source=file_id(extract.path),
+                target=symbol.id,
+                kind='contains',
+                confidence='high',
+            ))
+
+
+def _extract_imports(root: object, import_query: Optional[object], source: SourceBuffer) -> List[str]:
+    imports: List[str] = []
+    for child in root.children:
+        if child.type == 'import_statement':
+            source_node = child.child_by_field_name('source')
+            raw = _node_text(source_node, source) if source_node else ''
+            imports.append(_strip_quotes(raw))
+        elif child.type in {'export_statement', 'export_named_declaration', 'export_all_statement'}:
+            source_node = child.child_by_field_name('source')
+            raw = _node_text(source_node, source) if source_node else ''
+            imports.append(_strip_quotes(raw))
+
+    for match in _walk_order(query_matches(import_query, root)):
+        imports.append(_string_literal_value(match.get('argument'), source))
+    return [module_name for module_name in imports if module_name]
+
 
-    def record_import(module_name: str) -> None:
-        if not module_name:
-            return
+def _resolve_imports(extract: FileExtract, edges: List[GraphEdge], file_paths: set[str]) -> None:
+    base_dir = os.path.dirname(extract.path)
+    seen: Set[tuple[str, str]] = set()
+    for module_name in extract.imports:
         target_id = _resolve_import_target(module_name, base_dir, file_paths)
-        key = (file_id(parsed.path), target_id)
+        key = (file_id(extract.path), target_id)
         if key in seen:
-            return
+            continue
         seen.add(key)
         edges.append(GraphEdge(
             source=key[0],
@@ -220,31 +274,6 @@ def _extract_imports(
             confidence='medium' if target_id.startswith('file:') else 'low',
         ))
 
-    for child in root.children:
-        if child.type == 'import_statement':
-            source_node = child.child_by_field_name('source')
-            raw = _node_text(source_node, source_bytes) if source_node else ''
-            record_import(_strip_quotes(raw))
-        elif child.type in {'export_statement', 'export_named_declaration', 'export_all_statement'}:
-            source_node = child.child_by_field_name('source')
-            raw = _node_text(source_node, source_bytes) if source_node else ''
-            record_import(_strip_quotes(raw))
-
-    stack = [root]
-    while stack:
-        current = stack.pop()
-        if getattr(current, 'type', None) == 'call_expression':
-            func_node = current.child_by_field_name('function')
-            if func_node and func_node.type == 'identifier' and _node_text(func_node, source_bytes) == 'require':
-                args = current.child_by_field_name('arguments') or _child_by_type(current, 'arguments')
-                arg_node = _first_named_child(args)
-                record_import(_string_literal_value(arg_node, source_bytes))
-        elif getattr(current, 'type', None) in {'import_call', 'import_expression'}:
-            arg_node = current.child_by_field_name('argument') or _first_named_child(current)
-            record_import(_string_literal_value(arg_node, source_bytes))
-        for child in getattr(current, 'children', []) or []:
-            stack.append(child)
-
 
 def _resolve_import_target(module_name: str, base_dir: str, file_paths: set[str]) -> str:
     if module_name.startswith('.'):
@@ -266,150 +295,88 @@ def _resolve_import_target(module_name: str, base_dir: str, file_paths: set[str]
     return external_id(module_name)
 
 
-def _extract_inheritance(
-    parsed: ParsedJsFile,
-    nodes: Dict[str, SymbolNode],
-    edges: List[GraphEdge],
-    classes_by_module: Dict[str, Dict[str, str]],
-    classes_by_name: Dict[str, Set[str]],
-) -> None:
-    if not parsed.tree:
-        return
-    root = parsed.tree.root_node
-    source_bytes = parsed.source.encode('utf-8')
+def _extract_inheritance(root: object, source: SourceBuffer) -> List[Tuple[str, List[str]]]:
+    heritage_by_class: List[Tuple[str, List[str]]] = []
     for child in _iter_root_declarations(root):
         if child.type != 'class_declaration':
             continue
-        class_name = _node_name(child, source_bytes)
+        class_name = _node_name(child, source)
         if not class_name:
             continue
-        class_id = classes_by_module.get(parsed.module, {}).get(class_name)
         heritage = _child_by_type(child, 'class_heritage')
-        if not heritage or not class_id:
+        if not heritage:
             continue
+        bases: List[str] = []
         for node in heritage.children:
             if node.type in {'extends_clause', 'implements_clause'}:
                 for ident in node.children:
                     if ident.type not in {'identifier', 'type_identifier'}:
                         continue
-                    base_name = _node_text(ident, source_bytes)
-                    if not base_name:
-                        continue
-                    target_id = classes_by_module.get(parsed.module, {}).get(base_name)
-                    if not target_id:
-                        target_id = _resolve_unique_symbol(base_name, classes_by_name) or external_id(base_name)
-                    edges.append(GraphEdge(
-                        source=class_id,
-                        target=target_id,
-                        kind='inherits',
-                        confidence='medium' if target_id.startswith('symbol:') else 'low',
-                    ))
+                    base_name = _node_text(ident, source)
+                    if base_name:
+                        bases.append(base_name)
+        heritage_by_class.append((class_name, bases))
+    return heritage_by_class
 
 
-def _extract_calls(
-    parsed: ParsedJsFile,
-    nodes: Dict[str, SymbolNode],
+def _resolve_inheritance(
+    extract: FileExtract,
     edges: List[GraphEdge],
-    symbols_by_module: Dict[str, Dict[str, str]],
     classes_by_module: Dict[str, Dict[str, str]],
-    methods_by_class: Dict[Tuple[str, str], Dict[str, str]],
-    symbols_by_name: Dict[str, Set[str]],
     classes_by_name: Dict[str, Set[str]],
 ) -> None:
-    if not parsed.tree:
-        return
-    root = parsed.tree.root_node
-    source_bytes = parsed.source.encode('utf-8')
-    module_symbols = symbols_by_module.get(parsed.module, {})
-    module_classes = classes_by_module.get(parsed.module, {})
+    module_classes = classes_by_module.get(extract.module, {})
+    for class_name, bases in extract.heritage:
+        class_id = module_classes.get(class_name)
+        if not class_id:
+            continue
+        for base_name in bases:
+            target_id = module_classes.get(base_name)
+            if not target_id:
+                target_id = _resolve_unique_symbol(base_name, classes_by_name) or external_id(base_name)
+            edges.append(GraphEdge(
+                source=class_id,
+                target=target_id,
+                kind='inherits',
+                confidence='medium' if target_id.startswith('symbol:') else 'low',
+            ))
+
+
+def _extract_calls(
+    root: object,
+    call_query: Optional[object],
+    source: SourceBuffer,
+) -> List[Tuple[Optional[str], str, List[CallRef]]]:
+    scopes: List[Tuple[Optional[str], str, List[CallRef]]] = []
     for child in _iter_root_declarations(root):
         if child.type == 'function_declaration':
-            func_name = _node_name(child, source_bytes)
-            func_id = module_symbols.get(func_name)
-            if func_id:
-                _walk_calls(
-                    child,
-                    func_id,
-                    parsed.module,
-                    None,
-                    nodes,
-                    edges,
-                    module_symbols,
-                    module_classes,
-                    methods_by_class,
-                    symbols_by_name,
-                    classes_by_name,
-                    source_bytes,
-                )
+            func_name = _node_name(child, source)
+            scopes.append((None, func_name, _collect_calls(child, call_query, source)))
         elif child.type == 'class_declaration':
-            class_name = _node_name(child, source_bytes)
-            _walk_class_methods(
-                parsed,
-                child,
-                class_name,
-                nodes,
-                edges,
-                module_symbols,
-                module_classes,
-                methods_by_class,
-                symbols_by_name,
-                classes_by_name,
-                source_bytes,
-            )
+            class_name = _node_name(child, source)
+            _collect_class_method_calls(child, class_name, scopes, call_query, source)
         elif child.type in {'lexical_declaration', 'variable_declaration'}:
             for declarator in child.children:
                 if declarator.type != 'variable_declarator':
                     continue
                 name_node = declarator.child_by_field_name('name')
-                symbol_name = _node_text(name_node, source_bytes) if name_node else ''
+                symbol_name = _node_text(name_node, source) if name_node else ''
                 if not symbol_name:
                     continue
                 value = declarator.child_by_field_name('value')
                 if value and value.type in {'arrow_function', 'function'}:
-                    func_id = module_symbols.get(symbol_name)
-                    if func_id:
-                        _walk_calls(
-                            value,
-                            func_id,
-                            parsed.module,
-                            None,
-                            nodes,
-                            edges,
-                            module_symbols,
-                            module_classes,
-                            methods_by_class,
-                            symbols_by_name,
-                            classes_by_name,
-                            source_bytes,
-                        )
+                    scopes.append((None, symbol_name, _collect_calls(value, call_query, source)))
                 elif value and value.type in {'class', 'class_declaration', 'class_expression'}:
-                    _walk_class_methods(
-                        parsed,
-                        value,
-                        symbol_name,
-                        nodes,
-                        edges,
-                        module_symbols,
-                        module_classes,
-                        methods_by_class,
-                        symbols_by_name,
-                        classes_by_name,
-                        source_bytes,
-                    )
-
-
-def _walk_class_methods(
-    parsed: ParsedJsFile,
+                    _collect_class_method_calls(value, symbol_name, scopes, call_query, source)
+    return scopes
+
+
+def _collect_class_method_calls(
     class_node: object,
     class_name: Optional[str],
-    nodes: Dict[str, SymbolNode],
-    edges: List[GraphEdge],
-    module_symbols: Dict[str, str],
-    module_classes: Dict[str, str],
-    methods_by_class: Dict[Tuple[str, str], Dict[str, str]],
-    symbols_by_name: Dict[str, Set[str]],
-    classes_by_name: Dict[str, Set[str]],
-    source_bytes: bytes,
+    scopes: List[Tuple[Optional[str], str, List[CallRef]]],
+    call_query: Optional[object],
+    source: SourceBuffer,
 ) -> None:
     if not class_name:
         return
@@ -419,69 +386,91 @@ def _walk_class_methods(
     for item in class_body.children:
         if item.type != 'method_definition':
             continue
-        method_name = _node_name(item, source_bytes)
-        method_id = methods_by_class.get((parsed.module, class_name), {}).get(method_name)
-        if method_id:
-            _walk_calls(
-                item,
-                method_id,
-                parsed.module,
-                class_name,
-                nodes,
-                edges,
-                module_symbols,
-                module_classes,
-                methods_by_class,
-                symbols_by_name,
-                classes_by_name,
-                source_bytes,
-            )
+        method_name = _node_name(item, source)
+        scopes.append((class_name, method_name, _collect_calls(item, call_query, source)))
 
 
-def _walk_calls(
-    node: object,
-    source_id: str,
-    module_name: str,
-    current_class: Optional[str],
+def _collect_calls(node: object, call_query: Optional[object], source: SourceBuffer) -> List[CallRef]:
+    refs: List[CallRef] = []
+    for match in _walk_order(query_matches(call_query, node)):
+        ref = _call_ref(match, source)
+        if ref:
+            refs.append(ref)
+    return refs
+
+
+def _walk_order(matches: List[Dict[str, object]]) -> List[Dict[str, object]]:
+    # Queries report matches in document order, but edges have always been emitted in
+    # the order a pop-last stack walk reaches the calls: an enclosing call before the
+    # calls nested in it, and later siblings before earlier ones.
+    def key(match: Dict[str, object]) -> Tuple[int, int]:
+        call = match.get('call')
+        if call is None:
+            return (0, 0)
+        return (-call.end_byte, call.start_byte)
+
+    return sorted(matches, key=key)
+
+
+def _call_ref(match: Dict[str, object], source: SourceBuffer) -> Optional[CallRef]:
+    callee = match.get('callee')
+    if callee is not None:
+        name = _node_text(callee, source)
+        if not name:
+            return None
+        return ('call', None, name)
+    prop_name = _node_text(match.get('property'), source)
+    if not prop_name:
+        return None
+    obj = match.get('object')
+    if obj and obj.type in {'this', 'super'}:
+        return ('this', None, prop_name)
+    if obj and obj.type == 'identifier':
+        return ('member', _node_text(obj, source), prop_name)
+    return ('expr', None, prop_name)
+
+
+def _resolve_calls(
+    extract: FileExtract,
     nodes: Dict[str, SymbolNode],
     edges: List[GraphEdge],
-    module_symbols: Dict[str, str],
-    module_classes: Dict[str, str],
+    symbols_by_module: Dict[str, Dict[str, str]],
+    classes_by_module: Dict[str, Dict[str, str]],
     methods_by_class: Dict[Tuple[str, str], Dict[str, str]],
     symbols_by_name: Dict[str, Set[str]],
     classes_by_name: Dict[str, Set[str]],
-    source_bytes: bytes,
 ) -> None:
-    stack = [node]
-    while stack:
-        current = stack.pop()
-        if getattr(current, "type", None) == 'call_expression':
-            func_node = current.child_by_field_name('function')
+    module_symbols = symbols_by_module.get(extract.module, {})
+    module_classes = classes_by_module.get(extract.module, {})
+    for class_name, func_name, refs in extract.calls:
+        if class_name:
+            source_id = methods_by_class.get((extract.module, class_name), {}).get(func_name)
+        else:
+            source_id = module_symbols.get(func_name)
+        if not source_id:
+            continue
+        for ref in refs:
             target_id, confidence = _resolve_call_target(
-                func_node,
-                module_name,
-                current_class,
+                ref,
+                extract.module,
+                class_name,
                 nodes,
                 module_symbols,
                 module_classes,
                 methods_by_class,
                 symbols_by_name,
                 classes_by_name,
-                source_bytes,
             )
-            if target_id:
-                edges.append(GraphEdge(
-                    source=source_id,
-                    target=target_id,
-                    kind='calls',
-                    confidence=confidence,
-                ))
-        for child in getattr(current, "children", []) or []:
-            stack.append(child)
+            edges.append(GraphEdge(
+                source=source_id,
+                target=target_id,
+                kind='calls',
+                confidence=confidence,
+            ))
 
 
 def _resolve_call_target(
-    func_node: Optional[object],
+    ref: CallRef,
     module_name: str,
     current_class: Optional[str],
     nodes: Dict[str, SymbolNode],
@@ -490,14 +479,9 @@ def _resolve_call_target(
     methods_by_class: Dict[Tuple[str, str], Dict[str, str]],
     symbols_by_name: Dict[str, Set[str]],
     classes_by_name: Dict[str, Set[str]],
-    source_bytes: bytes,
-) -> tuple[Optional[str], str]:
-    if not func_node:
-        return None, 'low'
-    if func_node.type == 'identifier':
-        name = _node_text(func_node, source_bytes)
-        if not name:
-            return None, 'low'
+) -> tuple[str, str]:
+    ref_kind, obj_name, name = ref
+    if ref_kind == 'call':
         target_id = module_symbols.get(name)
         if target_id:
             return target_id, 'high'
@@ -505,34 +489,26 @@ def _resolve_call_target(
         if unique_symbol:
             return unique_symbol, 'medium'
         return external_id(name), 'low'
-    if func_node.type == 'member_expression':
-        obj = func_node.child_by_field_name('object')
-        prop = func_node.child_by_field_name('property')
-        prop_name = _node_text(prop, source_bytes) if prop else ''
-        if not prop_name:
-            return None, 'low'
-        if obj and obj.type in {'this', 'super'} and current_class:
-            method_id = methods_by_class.get((module_name, current_class), {}).get(prop_name)
+    if ref_kind == 'this' and current_class:
+        method_id = methods_by_class.get((module_name, current_class), {}).get(name)
+        if method_id:
+            return method_id, 'medium'
+    if ref_kind == 'member':
+        class_id = module_classes.get(obj_name)
+        if class_id:
+            method_id = methods_by_class.get((module_name, obj_name), {}).get(name)
+            if method_id:
+                return method_id, 'medium'
+        class_id = _resolve_unique_symbol(obj_name, classes_by_name)
+        if class_id:
+            class_node = nodes.get(class_id)
+            class_module = class_node.module if class_node else module_name
+            class_name = class_node.name if class_node else obj_name
+            method_id = methods_by_class.get((class_module or '', class_name), {}).get(name)
             if method_id:
                 return method_id, 'medium'
-        if obj and obj.type == 'identifier':
-            obj_name = _node_text(obj, source_bytes)
-            class_id = module_classes.get(obj_name)
-            if class_id:
-                method_id = methods_by_class.get((module_name, obj_name), {}).get(prop_name)
-                if method_id:
-                    return method_id, 'medium'
-            class_id = _resolve_unique_symbol(obj_name, classes_by_name)
-            if class_id:
-                class_node = nodes.get(class_id)
-                class_module = class_node.module if class_node else module_name
-                class_name = class_node.name if class_node else obj_name
-                method_id = methods_by_class.get((class_module or '', class_name), {}).get(prop_name)
-                if method_id:
-                    return method_id, 'medium'
-            return external_id(f'{obj_name}.{prop_name}'), 'low'
-        return external_id(prop_name), 'low'
-    return None, 'low'
+        return external_id(f'{obj_name}.{name}'), 'low'
+    return external_id(name), 'low'
 
 
 def _resolve_unique_symbol(name: str, symbol_map: Dict[str, Set[str]]) -> Optional[str]:
@@ -554,10 +530,45 @@ def _iter_root_declarations(root: object) -> List[object]:
     return nodes
 
 
-def _register_class(
+def _class_definition(
     parsed: ParsedJsFile,
     class_node: object,
     class_name: str,
+    source: SourceBuffer,
+) -> Tuple[str, SymbolNode, List[SymbolNode]]:
+    class_symbol = SymbolNode(
+        id=symbol_id(f'{parsed.module}.{class_name}'),
+        name=class_name,
+        kind='class',
+        summary='',
+        signature=_signature_from_node(class_node, source),
+        location=_location_from_node(parsed.path, class_node),
+        module=parsed.module,
+    )
+    methods: List[SymbolNode] = []
+    class_body = _child_by_type(class_node, 'class_body')
+    for item in getattr(class_body, 'children', []) or []:
+        if item.type != 'method_definition':
+            continue
+        method_name = _node_name(item, source)
+        if not method_name:
+            continue
+        methods.append(SymbolNode(
+            id=symbol_id(f'{parsed.module}.{class_name}.{method_name}'),
+            name=method_name,
+            kind='method',
+            summary='',
+            signature=_signature_from_node(item, source),
+            location=_location_from_node(parsed.path, item),
+            module=parsed.module,
+        ))
+    return 'class', class_symbol, methods
+
+
+def _register_class(
+    extract: FileExtract,
+    class_symbol: SymbolNode,
+    methods: List[SymbolNode],
     nodes: Dict[str, SymbolNode],
     edges: List[GraphEdge],
     module_symbols: Dict[str, str],
@@ -565,90 +576,57 @@ def _register_class(
     methods_by_class: Dict[Tuple[str, str], Dict[str, str]],
     symbols_by_name: Dict[str, Set[str]],
     classes_by_name: Dict[str, Set[str]],
-    source_bytes: bytes,
 ) -> None:
+    class_name = class_symbol.name
     if class_name in module_classes:
         return
-    class_id = symbol_id(f'{parsed.module}.{class_name}')
-    nodes[class_id] = SymbolNode(
-        id=class_id,
-        name=class_name,
-        kind='class',
-        summary='',
-        signature=_signature_from_node(class_node, source_bytes),
-        location=_location_from_node(parsed.path, class_node),
-        module=parsed.module,
-    )
+    class_id = class_symbol.id
+    nodes[class_id] = class_symbol
     module_classes[class_name] = class_id
     module_symbols[class_name] = class_id
     symbols_by_name.setdefault(class_name, set()).add(class_id)
     classes_by_name.setdefault(class_name, set()).add(class_id)
-    methods_by_class[(parsed.module, class_name)] = {}
+    methods_by_class[(extract.module, class_name)] = {}
     edges.append(GraphEdge(
-        source=file_id(parsed.path),
+        source=file_id(extract.path),
         target=class_id,
         kind='contains',
         confidence='high',
     ))
-    class_body = _child_by_type(class_node, 'class_body')
-    if not class_body:
-        return
-    for item in class_body.children:
-        if item.type != 'method_definition':
-            continue
-        method_name = _node_name(item, source_bytes)
-        if not method_name:
-            continue
-        method_id = symbol_id(f'{parsed.module}.{class_name}.{method_name}')
-        nodes[method_id] = SymbolNode(
-            id=method_id,
-            name=method_name,
-            kind='method',
-            summary='',
-            signature=_signature_from_node(item, source_bytes),
-            location=_location_from_node(parsed.path, item),
-            module=parsed.module,
-        )
-        methods_by_class[(parsed.module, class_name)][method_name] = method_id
+    for method in methods:
+        nodes[method.id] = method
+        methods_by_class[(extract.module, class_name)][method.name] = method.id
         edges.append(GraphEdge(
             source=class_id,
-            target=method_id,
+            target=method.id,
             kind='contains',
             confidence='high',
         ))
 
 
 def _register_type_like(
-    parsed: ParsedJsFile,
-    node: object,
-    type_name: str,
+    extract: FileExtract,
+    type_symbol: SymbolNode,
+    is_alias: bool,
     nodes: Dict[str, SymbolNode],
     edges: List[GraphEdge],
     module_symbols: Dict[str, str],
     module_classes: Dict[str, str],
     symbols_by_name: Dict[str, Set[str]],
     classes_by_name: Dict[str, Set[str]],
-    source_bytes: bytes,
 ) -> None:
+    type_name = type_symbol.name
     if type_name in module_symbols:
         return
-    type_id = symbol_id(f'{parsed.module}.{type_name}')
-    nodes[type_id] = SymbolNode(
-        id=type_id,
-        name=type_name,
-        kind='class',
-        summary=_ts_decl_label(node.type),
-        signature=_signature_from_node(node, source_bytes),
-        location=_location_from_node(parsed.path, node),
-        module=parsed.module,
-    )
+    type_id = type_symbol.id
+    nodes[type_id] = type_symbol
     module_symbols[type_name] = type_id
     symbols_by_name.setdefault(type_name, set()).add(type_id)
-    if node.type != 'type_alias_declaration':
+    if not is_alias:
         module_classes[type_name] = type_id
         classes_by_name.setdefault(type_name, set()).add(type_id)
     edges.append(GraphEdge(
-        source=file_id(parsed.path),
+        source=file_id(extract.path),
         target=type_id,
         kind='contains',
         confidence='high',
@@ -674,39 +652,29 @@ def _child_by_type(node: object, node_type: str) -> Optional[object]:
     return None
 
 
-def _first_named_child(node: Optional[object]) -> Optional[object]:
-    if not node:
-        return None
-    for child in getattr(node, "children", []) or []:
-        if getattr(child, 'is_named', False):
-            return child
-    return None
-
-
-def _node_name(node: object, source_bytes: bytes) -> str:
+def _node_name(node: object, source: SourceBuffer) -> str:
     name_node = node.child_by_field_name('name')
     if not name_node:
         return ''
-    return _node_text(name_node, source_bytes)
+    return _node_text(name_node, source)
 
 
-def _signature_from_node(node: object, source_bytes: bytes) -> Optional[str]:
-    text = _node_text(node, source_bytes)
+def _signature_from_node(node: object, source: SourceBuffer) -> Optional[str]:
+    text = source.first_line_at(node.start_byte, node.end_byte).strip()
+    if not text:
+        text = _node_text(node, source).strip()
     if not text:
         return None
-    first_line = text.strip().splitlines()[0].strip()
+    first_line = text.splitlines()[0].strip()
     if first_line.endswith('{'):
         return first_line[:-1].rstrip()
     return first_line
 
 
-def _node_text(node: Optional[object], source_bytes: bytes) -> str:
+def _node_text(node: Optional[object], source: SourceBuffer) -> str:
     if not node:
         return ''
-    try:
-        return source_bytes[node.start_byte:node.end_byte].decode('utf-8', errors='replace')
-    except Exception:
-        return ''
+    return source.text_at(node.start_byte, node.end_byte)
 
 
 def _strip_quotes(value: str) -> str:
@@ -716,11 +684,11 @@ def _strip_quotes(value: str) -> str:
     return text
 
 
-def _string_literal_value(node: Optional[object], source_bytes: bytes) -> str:
+def _string_literal_value(node: Optional[object], source: SourceBuffer) -> str:
     if not node:
         return ''
     if node.type in {'string', 'template_string'}:
-        return _strip_quotes(_node_text(node, source_bytes))
+        return _strip_quotes(_node_text(node, source))
     return ''
 
 
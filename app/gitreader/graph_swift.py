@@ -1,8 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Set, Tuple
 
 from .models import GraphEdge, SourceLocation, SymbolNode, external_id, file_id, symbol_id
 from .parse_swift import ParsedSwiftFile
+from .source import SourceBuffer
+from .ts_query import compile_query, query_matches
 
 
 @dataclass
@@ -20,6 +22,19 @@ TYPE_NODES = {
     'extension_declaration',
 }
 
+# Call sites, `body` identifiers and code blocks are matched by tree-sitter itself;
+# patterns a grammar does not support are skipped when the query is compiled.
+CALL_QUERY_PATTERNS = (
+    '(function_call_expression function: (_) @callee)',
+    '(function_call_expression called_expression: (_) @callee)',
+)
+BODY_QUERY_PATTERNS = (
+    '((identifier) @name (#eq? @name "body"))',
+)
+CODE_BLOCK_QUERY_PATTERNS = (
+    '(code_block) @block',
+)
+
 SWIFTUI_PROTOCOLS = {'View', 'App', 'Scene'}
 SWIFTUI_MODIFIERS = {
     'accessibilityHint',
@@ -80,7 +95,54 @@ SWIFTUI_MODIFIERS = {
 }
 
 
-def build_graph_swift(parsed_files: List[ParsedSwiftFile]) -> GraphResult:
+# A call site reduced to what resolution needs: ('call', None, name) for bare calls,
+# ('member', obj, prop) for identifier receivers and ('expr', None, prop) otherwise.
+CallRef = Tuple[str, Optional[str], str]
+
+
+# Bump whenever extraction output changes; cached extracts are keyed by it.
+EXTRACTOR_VERSION = 1
+EXTRACT_KIND = f'swift:{EXTRACTOR_VERSION}'
+
+
+@dataclass
+class FileExtract:
+    path: str
+    module: str
+    definitions: List[Tuple[SymbolNode, List[SymbolNode]]] = field(default_factory=list)
+    imports: List[str] = field(default_factory=list)
+    inheritance: List[Tuple[str, List[str]]] = field(default_factory=list)
+    calls: List[Tuple[Optional[str], str, List[CallRef]]] = field(default_factory=list)
+    compositions: List[Tuple[str, List[str], List[str]]] = field(default_factory=list)
+
+
+@dataclass
+class _SwiftQueries:
+    calls: Optional[object]
+    body: Optional[object]
+    code_block: Optional[object]
+
+
+def extract_swift_file(parsed: ParsedSwiftFile) -> FileExtract:
+    extract = FileExtract(path=parsed.path, module=parsed.module)
+    if not parsed.tree:
+        return extract
+    source = parsed.source
+    root = parsed.tree.root_node
+    queries = _SwiftQueries(
+        calls=compile_query('swift', parsed.tree, CALL_QUERY_PATTERNS),
+        body=compile_query('swift', parsed.tree, BODY_QUERY_PATTERNS),
+        code_block=compile_query('swift', parsed.tree, CODE_BLOCK_QUERY_PATTERNS),
+    )
+    extract.definitions = _extract_definitions(parsed, root, source)
+    extract.imports = _extract_imports(root, source)
+    extract.inheritance = _extract_inheritance(root, source)
+    extract.calls = _extract_calls(root, queries, source)
+    extract.compositions = _extract_swiftui_composition(root, queries, source)
+    return extract
+
+
+def build_graph_swift(extracts: List[FileExtract]) -> GraphResult:
     nodes: Dict[str, SymbolNode] = {}
     edges: List[GraphEdge] = []
     files: List[str] = []
@@ -91,23 +153,23 @@ def build_graph_swift(parsed_files: List[ParsedSwiftFile]) -> GraphResult:
     types_by_name: Dict[str, Set[str]] = {}
     symbols_by_name: Dict[str, Set[str]] = {}
 
-    for parsed in parsed_files:
+    for extract in extracts:
         file_node = SymbolNode(
-            id=file_id(parsed.path),
-            name=parsed.path,
+            id=file_id(extract.path),
+            name=extract.path,
             kind='file',
             summary='',
-            module=parsed.module,
-            location=SourceLocation(path=parsed.path),
+            module=extract.module,
+            location=SourceLocation(path=extract.path),
         )
         nodes[file_node.id] = file_node
-        files.append(parsed.path)
-        types_by_module.setdefault(parsed.module, {})
-        symbols_by_module.setdefault(parsed.module, {})
+        files.append(extract.path)
+        types_by_module.setdefault(extract.module, {})
+        symbols_by_module.setdefault(extract.module, {})
 
-    for parsed in parsed_files:
-        _extract_definitions(
-            parsed,
+    for extract in extracts:
+        _register_definitions(
+            extract,
             nodes,
             edges,
             types_by_module,
@@ -117,13 +179,11 @@ def build_graph_swift(parsed_files: List[ParsedSwiftFile]) -> GraphResult:
             symbols_by_name,
         )
 
-    swiftui_types_by_module = _collect_swiftui_conformance(parsed_files)
-
-    for parsed in parsed_files:
-        _extract_imports(parsed, nodes, edges)
-        _extract_inheritance(parsed, nodes, edges, types_by_module, types_by_name)
-        _extract_calls(
-            parsed,
+    for extract in extracts:
+        _resolve_imports(extract, nodes, edges)
+        _resolve_inheritance(extract, nodes, edges, types_by_module, types_by_name)
+        _resolve_calls(
+            extract,
             nodes,
             edges,
             symbols_by_module,
@@ -132,95 +192,108 @@ def build_graph_swift(parsed_files: List[ParsedSwiftFile]) -> GraphResult:
             symbols_by_name,
             types_by_name,
         )
-        _extract_swiftui_composition(parsed, nodes, edges, types_by_module, swiftui_types_by_module)
+        _resolve_swiftui_composition(extract, nodes, edges, types_by_module)
 
     return GraphResult(nodes=nodes, edges=edges, files=files)
 
 
 def _extract_definitions(
     parsed: ParsedSwiftFile,
-    nodes: Dict[str, SymbolNode],
-    edges: List[GraphEdge],
-    types_by_module: Dict[str, Dict[str, str]],
-    symbols_by_module: Dict[str, Dict[str, str]],
-    methods_by_type: Dict[Tuple[str, str], Dict[str, str]],
-    types_by_name: Dict[str, Set[str]],
-    symbols_by_name: Dict[str, Set[str]],
-) -> None:
-    if not parsed.tree:
-        return
-    root = parsed.tree.root_node
-    source_bytes = parsed.source.encode('utf-8')
-    module_types = types_by_module.get(parsed.module, {})
-    module_symbols = symbols_by_module.get(parsed.module, {})
+    root: object,
+    source: SourceBuffer,
+) -> List[Tuple[SymbolNode, List[SymbolNode]]]:
+    definitions: List[Tuple[SymbolNode, List[SymbolNode]]] = []
     for child in root.children:
         if child.type in TYPE_NODES:
-            type_name = _type_name(child, source_bytes)
+            type_name = _type_name(child, source)
             if not type_name:
                 continue
-            type_id = module_types.get(type_name)
-            if not type_id:
-                type_id = symbol_id(f'{parsed.module}.{type_name}')
-                nodes[type_id] = SymbolNode(
-                    id=type_id,
-                    name=type_name,
-                    kind='class',
-                    summary='',
-                    signature=_signature_from_node(child, source_bytes),
-                    location=_location_from_node(parsed.path, child),
-                    module=parsed.module,
-                )
-                module_types[type_name] = type_id
-                module_symbols[type_name] = type_id
-                types_by_name.setdefault(type_name, set()).add(type_id)
-                symbols_by_name.setdefault(type_name, set()).add(type_id)
-                methods_by_type[(parsed.module, type_name)] = {}
-                edges.append(GraphEdge(
-                    source=file_id(parsed.path),
-                    target=type_id,
-                    kind='contains',
-                    confidence='high',
-                ))
+            type_symbol = SymbolNode(
+                id=symbol_id(f'{parsed.module}.{type_name}'),
+                name=type_name,
+                kind='class',
+                summary='',
+                signature=_signature_from_node(child, source),
+                location=_location_from_node(parsed.path, child),
+                module=parsed.module,
+            )
+            methods: List[SymbolNode] = []
             for fn_node in _direct_function_decls(child):
-                method_name = _node_name(fn_node, source_bytes)
+                method_name = _node_name(fn_node, source)
                 if not method_name:
                     continue
-                method_id = symbol_id(f'{parsed.module}.{type_name}.{method_name}')
-                nodes[method_id] = SymbolNode(
-                    id=method_id,
+                methods.append(SymbolNode(
+                    id=symbol_id(f'{parsed.module}.{type_name}.{method_name}'),
                     name=method_name,
                     kind='method',
                     summary='',
-                    signature=_signature_from_node(fn_node, source_bytes),
+                    signature=_signature_from_node(fn_node, source),
                     location=_location_from_node(parsed.path, fn_node),
                     module=parsed.module,
-                )
-                methods_by_type[(parsed.module, type_name)][method_name] = method_id
-                edges.append(GraphEdge(
-                    source=type_id,
-                    target=method_id,
-                    kind='contains',
-                    confidence='high',
                 ))
+            definitions.append((type_symbol, methods))
         elif child.type == 'function_declaration':
-            func_name = _node_name(child, source_bytes)
+            func_name = _node_name(child, source)
             if not func_name:
                 continue
-            func_id = symbol_id(f'{parsed.module}.{func_name}')
-            nodes[func_id] = SymbolNode(
-                id=func_id,
+            definitions.append((SymbolNode(
+                id=symbol_id(f'{parsed.module}.{func_name}'),
                 name=func_name,
                 kind='function',
                 summary='',
-                signature=_signature_from_node(child, source_bytes),
+                signature=_signature_from_node(child, source),
                 location=_location_from_node(parsed.path, child),
                 module=parsed.module,
-            )
-            module_symbols[func_name] = func_id
-            symbols_by_name.setdefault(func_name, set()).add(func_id)
+            ), []))
+    return definitions
+
+
+def _register_definitions(
+    extract: FileExtract,
+    nodes: Dict[str, SymbolNode],
+    edges: List[GraphEdge],
+    types_by_module: Dict[str, Dict[str, str]],
+    symbols_by_module: Dict[str, Dict[str, str]],
+    methods_by_type: Dict[Tuple[str, str], Dict[str, str]],
+    types_by_name: Dict[str, Set[str]],
+    symbols_by_name: Dict[str, Set[str]],
+) -> None:
+    module_types = types_by_module.get(extract.module, {})
+    module_symbols = symbols_by_module.get(extract.module, {})
+    for symbol, methods in extract.definitions:
+        if symbol.kind == 'function':
+            nodes[symbol.id] = symbol
+            module_symbols[symbol.name] = symbol.id
+            symbols_by_name.setdefault(symbol.name, set()).add(symbol.id)
+            edges.append(GraphEdge(
+                source=file_id(extract.path),
+                target=symbol.id,
+                kind='contains',
+                confidence='high',
+            ))
+            continue
+        type_name = symbol.name
+        type_id = module_types.get(type_name)
+        if not type_id:
+            type_id = symbol.id
+            nodes[type_id] = symbol
+            module_types[type_name] = type_id
+            module_symbols[type_name] = type_id
+            types_by_name.setdefault(type_name, set()).add(type_id)
+            symbols_by_name.setdefault(type_name, set()).add(type_id)
+            methods_by_type[(extract.module, type_name)] = {}
             edges.append(GraphEdge(
-                source=file_id(parsed.path),
-                target=func_id,
+                source=file_id(extract.path),
+                target=type_id,
+                kind='contains',
+                confidence='high',
+            ))
+        for method in methods:
+            nodes[method.id] = method
+            methods_by_type[(extract.module, type_name)][method.name] = method.id
+            edges.append(GraphEdge(
+                source=type_id,
+                target=method.id,
                 kind='contains',
                 confidence='high',
             ))
@@ -241,57 +314,65 @@ def _direct_function_decls(node: object) -> List[object]:
     return candidates
 
 
-def _extract_imports(parsed: ParsedSwiftFile, nodes: Dict[str, SymbolNode], edges: List[GraphEdge]) -> None:
-    if not parsed.tree:
-        return
-    root = parsed.tree.root_node
-    source_bytes = parsed.source.encode('utf-8')
+def _extract_imports(root: object, source: SourceBuffer) -> List[str]:
+    imports: List[str] = []
     for child in root.children:
         if child.type != 'import_declaration':
             continue
         path_node = child.child_by_field_name('path') or _first_named_child(child, 'import_path')
-        module_name = _node_text(path_node, source_bytes).strip()
-        if not module_name:
-            continue
+        module_name = _node_text(path_node, source).strip()
+        if module_name:
+            imports.append(module_name)
+    return imports
+
+
+def _resolve_imports(extract: FileExtract, nodes: Dict[str, SymbolNode], edges: List[GraphEdge]) -> None:
+    for module_name in extract.imports:
         target_id = _ensure_external(nodes, module_name)
         edges.append(GraphEdge(
-            source=file_id(parsed.path),
+            source=file_id(extract.path),
             target=target_id,
             kind='imports',
             confidence='low',
         ))
 
 
-def _extract_inheritance(
-    parsed: ParsedSwiftFile,
-    nodes: Dict[str, SymbolNode],
-    edges: List[GraphEdge],
-    types_by_module: Dict[str, Dict[str, str]],
-    types_by_name: Dict[str, Set[str]],
-) -> None:
-    if not parsed.tree:
-        return
-    root = parsed.tree.root_node
-    source_bytes = parsed.source.encode('utf-8')
+def _extract_inheritance(root: object, source: SourceBuffer) -> List[Tuple[str, List[str]]]:
+    inheritance_by_type: List[Tuple[str, List[str]]] = []
     for child in root.children:
         if child.type not in TYPE_NODES:
             continue
-        type_name = _type_name(child, source_bytes)
+        type_name = _type_name(child, source)
         if not type_name:
             continue
-        type_id = types_by_module.get(parsed.module, {}).get(type_name)
-        if not type_id:
-            continue
         inheritance = _first_named_child(child, 'type_inheritance_clause')
         if not inheritance:
             continue
+        bases: List[str] = []
         for node in getattr(inheritance, "children", []) or []:
             if node.type != 'type_identifier':
                 continue
-            base_name = _node_text(node, source_bytes)
-            if not base_name:
-                continue
-            target_id = types_by_module.get(parsed.module, {}).get(base_name)
+            base_name = _node_text(node, source)
+            if base_name:
+                bases.append(base_name)
+        inheritance_by_type.append((type_name, bases))
+    return inheritance_by_type
+
+
+def _resolve_inheritance(
+    extract: FileExtract,
+    nodes: Dict[str, SymbolNode],
+    edges: List[GraphEdge],
+    types_by_module: Dict[str, Dict[str, str]],
+    types_by_name: Dict[str, Set[str]],
+) -> None:
+    module_types = types_by_module.get(extract.module, {})
+    for type_name, bases in extract.inheritance:
+        type_id = module_types.get(type_name)
+        if not type_id:
+            continue
+        for base_name in bases:
+            target_id = module_types.get(base_name)
             if not target_id:
                 target_id = _resolve_unique_symbol(base_name, types_by_name)
             if not target_id:
@@ -305,95 +386,108 @@ def _extract_inheritance(
 
 
 def _extract_calls(
-    parsed: ParsedSwiftFile,
-    nodes: Dict[str, SymbolNode],
-    edges: List[GraphEdge],
-    symbols_by_module: Dict[str, Dict[str, str]],
-    types_by_module: Dict[str, Dict[str, str]],
-    methods_by_type: Dict[Tuple[str, str], Dict[str, str]],
-    symbols_by_name: Dict[str, Set[str]],
-    types_by_name: Dict[str, Set[str]],
-) -> None:
-    if not parsed.tree:
-        return
-    root = parsed.tree.root_node
-    source_bytes = parsed.source.encode('utf-8')
-    module_symbols = symbols_by_module.get(parsed.module, {})
-    module_types = types_by_module.get(parsed.module, {})
+    root: object,
+    queries: _SwiftQueries,
+    source: SourceBuffer,
+) -> List[Tuple[Optional[str], str, List[CallRef]]]:
+    scopes: List[Tuple[Optional[str], str, List[CallRef]]] = []
     for child in root.children:
         if child.type == 'function_declaration':
-            func_name = _node_name(child, source_bytes)
-            func_id = module_symbols.get(func_name)
-            if func_id:
-                _walk_calls(
-                    child,
-                    func_id,
-                    parsed.module,
-                    None,
-                    nodes,
-                    edges,
-                    module_symbols,
-                    module_types,
-                    methods_by_type,
-                    symbols_by_name,
-                    types_by_name,
-                    source_bytes,
-                )
+            func_name = _node_name(child, source)
+            scopes.append((None, func_name, _collect_calls(child, queries, source)))
         elif child.type in TYPE_NODES:
-            type_name = _type_name(child, source_bytes)
+            type_name = _type_name(child, source)
             if not type_name:
                 continue
             for fn_node in _direct_function_decls(child):
-                method_name = _node_name(fn_node, source_bytes)
-                method_id = methods_by_type.get((parsed.module, type_name), {}).get(method_name)
-                if method_id:
-                    _walk_calls(
-                        fn_node,
-                        method_id,
-                        parsed.module,
-                        type_name,
-                        nodes,
-                        edges,
-                        module_symbols,
-                        module_types,
-                        methods_by_type,
-                        symbols_by_name,
-                        types_by_name,
-                        source_bytes,
-                    )
+                method_name = _node_name(fn_node, source)
+                scopes.append((type_name, method_name, _collect_calls(fn_node, queries, source)))
+    return scopes
 
 
-def _extract_swiftui_composition(
-    parsed: ParsedSwiftFile,
+def _resolve_calls(
+    extract: FileExtract,
     nodes: Dict[str, SymbolNode],
     edges: List[GraphEdge],
+    symbols_by_module: Dict[str, Dict[str, str]],
     types_by_module: Dict[str, Dict[str, str]],
-    swiftui_types_by_module: Dict[str, Set[str]],
+    methods_by_type: Dict[Tuple[str, str], Dict[str, str]],
+    symbols_by_name: Dict[str, Set[str]],
+    types_by_name: Dict[str, Set[str]],
 ) -> None:
-    if not parsed.tree:
-        return
-    root = parsed.tree.root_node
-    source_bytes = parsed.source.encode('utf-8')
-    module_types = types_by_module.get(parsed.module, {})
-    module_swiftui_types = swiftui_types_by_module.get(parsed.module, set())
+    module_symbols = symbols_by_module.get(extract.module, {})
+    module_types = types_by_module.get(extract.module, {})
+    for type_name, func_name, refs in extract.calls:
+        if type_name:
+            source_id = methods_by_type.get((extract.module, type_name), {}).get(func_name)
+        else:
+            source_id = module_symbols.get(func_name)
+        if not source_id:
+            continue
+        for ref in refs:
+            target_id, confidence = _resolve_call_target(
+                ref,
+                extract.module,
+                type_name,
+                nodes,
+                module_symbols,
+                module_types,
+                methods_by_type,
+                symbols_by_name,
+                types_by_name,
+            )
+            edges.append(GraphEdge(
+                source=source_id,
+                target=target_id,
+                kind='calls',
+                confidence=confidence,
+            ))
+
+
+def _extract_swiftui_composition(
+    root: object,
+    queries: _SwiftQueries,
+    source: SourceBuffer,
+) -> List[Tuple[str, List[str], List[str]]]:
+    typed_children: List[Tuple[str, object, bool]] = []
+    swiftui_types: Set[str] = set()
     for child in root.children:
         if child.type not in TYPE_NODES:
             continue
-        type_name = _type_name(child, source_bytes)
+        type_name = _type_name(child, source)
         if not type_name:
             continue
-        type_id = module_types.get(type_name)
-        if not type_id:
-            continue
-        if not _is_swiftui_type(child, source_bytes) and type_name not in module_swiftui_types:
+        is_swiftui = _is_swiftui_type(child, source)
+        if is_swiftui:
+            swiftui_types.add(type_name)
+        typed_children.append((type_name, child, is_swiftui))
+
+    compositions: List[Tuple[str, List[str], List[str]]] = []
+    for type_name, child, is_swiftui in typed_children:
+        if not is_swiftui and type_name not in swiftui_types:
             continue
-        body_node = _find_swiftui_body(child, source_bytes)
+        body_node = _find_swiftui_body(child, queries, source)
         if not body_node:
             continue
-        view_names, modifier_names = _collect_swiftui_views(body_node, source_bytes)
+        view_names, modifier_names = _collect_swiftui_views(body_node, queries, source)
         if not view_names and not modifier_names:
             continue
-        for view_name in sorted(view_names):
+        compositions.append((type_name, sorted(view_names), sorted(modifier_names)))
+    return compositions
+
+
+def _resolve_swiftui_composition(
+    extract: FileExtract,
+    nodes: Dict[str, SymbolNode],
+    edges: List[GraphEdge],
+    types_by_module: Dict[str, Dict[str, str]],
+) -> None:
+    module_types = types_by_module.get(extract.module, {})
+    for type_name, view_names, modifier_names in extract.compositions:
+        type_id = module_types.get(type_name)
+        if not type_id:
+            continue
+        for view_name in view_names:
             target_id = _ensure_external(nodes, view_name)
             edges.append(GraphEdge(
                 source=type_id,
@@ -401,7 +495,7 @@ def _extract_swiftui_composition(
                 kind='contains',
                 confidence='low',
             ))
-        for modifier_name in sorted(modifier_names):
+        for modifier_name in modifier_names:
             target_id = _ensure_external(nodes, f'modifier:{modifier_name}')
             edges.append(GraphEdge(
                 source=type_id,
@@ -411,94 +505,90 @@ def _extract_swiftui_composition(
             ))
 
 
-def _collect_swiftui_conformance(parsed_files: List[ParsedSwiftFile]) -> Dict[str, Set[str]]:
-    swiftui_types_by_module: Dict[str, Set[str]] = {}
-    for parsed in parsed_files:
-        swiftui_types_by_module.setdefault(parsed.module, set())
-        if not parsed.tree:
-            continue
-        source_bytes = parsed.source.encode('utf-8')
-        for child in parsed.tree.root_node.children:
-            if child.type not in TYPE_NODES:
-                continue
-            type_name = _type_name(child, source_bytes)
-            if not type_name:
-                continue
-            if _is_swiftui_type(child, source_bytes):
-                swiftui_types_by_module[parsed.module].add(type_name)
-    return swiftui_types_by_module
-
-
-def _is_swiftui_type(node: object, source_bytes: bytes) -> bool:
+def _is_swiftui_type(node: object, source: SourceBuffer) -> bool:
     inheritance = _first_named_child(node, 'type_inheritance_clause')
     if not inheritance:
         return False
     for child in getattr(inheritance, "children", []) or []:
         if child.type != 'type_identifier':
             continue
-        base_name = _node_text(child, source_bytes)
+        base_name = _node_text(child, source)
         if base_name in SWIFTUI_PROTOCOLS:
             return True
     return False
 
 
-def _find_swiftui_body(node: object, source_bytes: bytes) -> Optional[object]:
-    stack = [node]
-    while stack:
-        current = stack.pop()
-        if getattr(current, "type", None) == 'variable_declaration':
-            if _contains_identifier(current, 'body', source_bytes):
-                code_block = _find_first_child(current, 'code_block')
-                if code_block:
-                    return code_block
-                initializer = current.child_by_field_name('value') or current.child_by_field_name('initializer')
-                if initializer:
-                    return initializer
-        for child in getattr(current, "children", []) or []:
-            stack.append(child)
-    return None
+def _find_swiftui_body(node: object, queries: _SwiftQueries, source: SourceBuffer) -> Optional[object]:
+    declarations: Dict[Tuple[int, int], object] = {}
+    for match in query_matches(queries.body, node):
+        current = match.get('name')
+        while current is not None and current != node:
+            if current.type == 'variable_declaration':
+                declarations[(current.start_byte, current.end_byte)] = current
+            current = current.parent
+    candidates: List[Tuple[object, object]] = []
+    for declaration in declarations.values():
+        blocks = [match['block'] for match in query_matches(queries.code_block, declaration) if 'block' in match]
+        if blocks:
+            candidates.append((declaration, min(blocks, key=lambda block: block.start_byte)))
+            continue
+        initializer = declaration.child_by_field_name('value') or declaration.child_by_field_name('initializer')
+        if initializer:
+            candidates.append((declaration, initializer))
+    if not candidates:
+        return None
+    # Prefer the last declaration in the type, or the outermost one enclosing it.
+    last, _ = max(candidates, key=lambda item: item[0].start_byte)
+    enclosing = [
+        item for item in candidates
+        if item[0].start_byte <= last.start_byte and item[0].end_byte >= last.end_byte
+    ]
+    return min(enclosing, key=lambda item: (item[0].start_byte, -item[0].end_byte))[1]
 
 
-def _collect_swiftui_views(node: object, source_bytes: bytes) -> Tuple[Set[str], Set[str]]:
+def _collect_swiftui_views(
+    node: object,
+    queries: _SwiftQueries,
+    source: SourceBuffer,
+) -> Tuple[Set[str], Set[str]]:
     view_names: Set[str] = set()
     modifier_names: Set[str] = set()
-    stack = [node]
-    while stack:
-        current = stack.pop()
-        if getattr(current, "type", None) == 'function_call_expression':
-            callee = current.child_by_field_name('function') or current.child_by_field_name('called_expression')
-            name = _swiftui_view_name(callee, source_bytes)
-            if name:
-                view_names.add(name)
-            modifier = _swiftui_modifier_name(callee, source_bytes)
-            if modifier:
-                modifier_names.add(modifier)
-        for child in getattr(current, "children", []) or []:
-            stack.append(child)
+    for match in query_matches(queries.calls, node):
+        callee = match.get('callee')
+        name = _swiftui_view_name(callee, source)
+        if name:
+            view_names.add(name)
+        modifier = _swiftui_modifier_name(callee, queries, source)
+        if modifier:
+            modifier_names.add(modifier)
     return view_names, modifier_names
 
 
-def _swiftui_view_name(callee: Optional[object], source_bytes: bytes) -> Optional[str]:
+def _swiftui_view_name(callee: Optional[object], source: SourceBuffer) -> Optional[str]:
     if not callee:
         return None
     if callee.type == 'identifier':
-        name = _node_text(callee, source_bytes)
+        name = _node_text(callee, source)
         if name[:1].isupper():
             return name
         return None
     if callee.type == 'member_expression':
         prop = callee.child_by_field_name('name') or callee.child_by_field_name('property')
-        prop_name = _node_text(prop, source_bytes) if prop else ''
+        prop_name = _node_text(prop, source) if prop else ''
         if prop_name[:1].isupper():
             return prop_name
     return None
 
 
-def _swiftui_modifier_name(callee: Optional[object], source_bytes: bytes) -> Optional[str]:
+def _swiftui_modifier_name(
+    callee: Optional[object],
+    queries: _SwiftQueries,
+    source: SourceBuffer,
+) -> Optional[str]:
     if not callee or callee.type != 'member_expression':
         return None
     prop = callee.child_by_field_name('name') or callee.child_by_field_name('property')
-    prop_name = _node_text(prop, source_bytes) if prop else ''
+    prop_name = _node_text(prop, source) if prop else ''
     if not prop_name:
         return None
     if prop_name in SWIFTUI_MODIFIERS:
@@ -516,89 +606,49 @@ def _swiftui_modifier_name(callee: Optional[object], source_bytes: bytes) -> Opt
                 continue
             candidates.append(child)
     for base in candidates:
-        if _expression_contains_view_call(base, source_bytes):
+        if _expression_contains_view_call(base, queries, source):
             return prop_name
     return None
 
 
-def _expression_contains_view_call(node: Optional[object], source_bytes: bytes) -> bool:
-    if not node:
-        return False
-    stack = [node]
-    while stack:
-        current = stack.pop()
-        if getattr(current, "type", None) == 'function_call_expression':
-            callee = current.child_by_field_name('function') or current.child_by_field_name('called_expression')
-            if _swiftui_view_name(callee, source_bytes):
-                return True
-        for child in getattr(current, "children", []) or []:
-            stack.append(child)
-    return False
-
-
-def _contains_identifier(node: object, name: str, source_bytes: bytes) -> bool:
-    for child in getattr(node, "children", []) or []:
-        if child.type == 'identifier' and _node_text(child, source_bytes) == name:
-            return True
-        if _contains_identifier(child, name, source_bytes):
+def _expression_contains_view_call(node: Optional[object], queries: _SwiftQueries, source: SourceBuffer) -> bool:
+    for match in query_matches(queries.calls, node):
+        if _swiftui_view_name(match.get('callee'), source):
             return True
     return False
 
 
-def _find_first_child(node: object, child_type: str) -> Optional[object]:
-    for child in getattr(node, "children", []) or []:
-        if child.type == child_type:
-            return child
-        found = _find_first_child(child, child_type)
-        if found:
-            return found
-    return None
+def _collect_calls(node: object, queries: _SwiftQueries, source: SourceBuffer) -> List[CallRef]:
+    refs: List[CallRef] = []
+    for match in query_matches(queries.calls, node):
+        ref = _call_ref(match.get('callee'), source)
+        if ref:
+            refs.append(ref)
+    return refs
 
 
-def _walk_calls(
-    node: object,
-    source_id: str,
-    module_name: str,
-    current_type: Optional[str],
-    nodes: Dict[str, SymbolNode],
-    edges: List[GraphEdge],
-    module_symbols: Dict[str, str],
-    module_types: Dict[str, str],
-    methods_by_type: Dict[Tuple[str, str], Dict[str, str]],
-    symbols_by_name: Dict[str, Set[str]],
-    types_by_name: Dict[str, Set[str]],
-    source_bytes: bytes,
-) -> None:
-    stack = [node]
-    while stack:
-        current = stack.pop()
-        if getattr(current, "type", None) == 'function_call_expression':
-            callee = current.child_by_field_name('function') or current.child_by_field_name('called_expression')
-            target_id, confidence = _resolve_call_target(
-                callee,
-                module_name,
-                current_type,
-                nodes,
-                module_symbols,
-                module_types,
-                methods_by_type,
-                symbols_by_name,
-                types_by_name,
-                source_bytes,
-            )
-            if target_id:
-                edges.append(GraphEdge(
-                    source=source_id,
-                    target=target_id,
-                    kind='calls',
-                    confidence=confidence,
-                ))
-        for child in getattr(current, "children", []) or []:
-            stack.append(child)
+def _call_ref(callee: Optional[object], source: SourceBuffer) -> Optional[CallRef]:
+    if not callee:
+        return None
+    if callee.type == 'identifier':
+        name = _node_text(callee, source)
+        if not name:
+            return None
+        return ('call', None, name)
+    if callee.type == 'member_expression':
+        obj = callee.child_by_field_name('base') or callee.child_by_field_name('object')
+        prop = callee.child_by_field_name('name') or callee.child_by_field_name('property')
+        prop_name = _node_text(prop, source) if prop else ''
+        if not prop_name:
+            return None
+        if obj and obj.type == 'identifier':
+            return ('member', _node_text(obj, source), prop_name)
+        return ('expr', None, prop_name)
+    return None
 
 
 def _resolve_call_target(
-    callee: Optional[object],
+    ref: CallRef,
     module_name: str,
     current_type: Optional[str],
     nodes: Dict[str, SymbolNode],
@@ -607,14 +657,9 @@ def _resolve_call_target(
     methods_by_type: Dict[Tuple[str, str], Dict[str, str]],
     symbols_by_name: Dict[str, Set[str]],
     types_by_name: Dict[str, Set[str]],
-    source_bytes: bytes,
-) -> tuple[Optional[str], str]:
-    if not callee:
-        return None, 'low'
-    if callee.type == 'identifier':
-        name = _node_text(callee, source_bytes)
-        if not name:
-            return None, 'low'
+) -> tuple[str, str]:
+    ref_kind, obj_name, name = ref
+    if ref_kind == 'call':
         target_id = module_symbols.get(name)
         if target_id:
             return target_id, 'medium'
@@ -622,34 +667,26 @@ def _resolve_call_target(
         if unique_symbol:
             return unique_symbol, 'medium'
         return _ensure_external(nodes, name), 'low'
-    if callee.type == 'member_expression':
-        obj = callee.child_by_field_name('base') or callee.child_by_field_name('object')
-        prop = callee.child_by_field_name('name') or callee.child_by_field_name('property')
-        prop_name = _node_text(prop, source_bytes) if prop else ''
-        if not prop_name:
-            return None, 'low'
-        if obj and obj.type == 'identifier':
-            obj_name = _node_text(obj, source_bytes)
-            type_id = module_types.get(obj_name)
-            if type_id:
-                method_id = methods_by_type.get((module_name, obj_name), {}).get(prop_name)
-                if method_id:
-                    return method_id, 'medium'
-            type_id = _resolve_unique_symbol(obj_name, types_by_name)
-            if type_id:
-                type_node = nodes.get(type_id)
-                type_module = type_node.module if type_node else module_name
-                type_name = type_node.name if type_node else obj_name
-                method_id = methods_by_type.get((type_module or '', type_name), {}).get(prop_name)
-                if method_id:
-                    return method_id, 'medium'
-            return _ensure_external(nodes, f'{obj_name}.{prop_name}'), 'low'
-        if current_type:
-            method_id = methods_by_type.get((module_name, current_type), {}).get(prop_name)
+    if ref_kind == 'member':
+        type_id = module_types.get(obj_name)
+        if type_id:
+            method_id = methods_by_type.get((module_name, obj_name), {}).get(name)
+            if method_id:
+                return method_id, 'medium'
+        type_id = _resolve_unique_symbol(obj_name, types_by_name)
+        if type_id:
+            type_node = nodes.get(type_id)
+            type_module = type_node.module if type_node else module_name
+            type_name = type_node.name if type_node else obj_name
+            method_id = methods_by_type.get((type_module or '', type_name), {}).get(name)
             if method_id:
                 return method_id, 'medium'
-        return _ensure_external(nodes, prop_name), 'low'
-    return None, 'low'
+        return _ensure_external(nodes, f'{obj_name}.{name}'), 'low'
+    if current_type:
+        method_id = methods_by_type.get((module_name, current_type), {}).get(name)
+        if method_id:
+            return method_id, 'medium'
+    return _ensure_external(nodes, name), 'low'
 
 
 def _resolve_unique_symbol(name: str, symbol_map: Dict[str, Set[str]]) -> Optional[str]:
@@ -659,26 +696,28 @@ def _resolve_unique_symbol(name: str, symbol_map: Dict[str, Set[str]]) -> Option
     return next(iter(candidates))
 
 
-def _type_name(node: object, source_bytes: bytes) -> str:
+def _type_name(node: object, source: SourceBuffer) -> str:
     for field_name in ('name', 'type_name', 'extended_type'):
         field = node.child_by_field_name(field_name)
         if field:
-            return _node_text(field, source_bytes)
-    return _node_name(node, source_bytes)
+            return _node_text(field, source)
+    return _node_name(node, source)
 
 
-def _node_name(node: object, source_bytes: bytes) -> str:
+def _node_name(node: object, source: SourceBuffer) -> str:
     name_node = node.child_by_field_name('name')
     if not name_node:
         return ''
-    return _node_text(name_node, source_bytes)
+    return _node_text(name_node, source)
 
 
-def _signature_from_node(node: object, source_bytes: bytes) -> Optional[str]:
-    text = _node_text(node, source_bytes)
+def _signature_from_node(node: object, source: SourceBuffer) -> Optional[str]:
+    text = source.first_line_at(node.start_byte, node.end_byte).strip()
+    if not text:
+        text = _node_text(node, source).strip()
     if not text:
         return None
-    first_line = text.strip().splitlines()[0].strip()
+    first_line = text.splitlines()[0].strip()
     if first_line.endswith('{'):
         return first_line[:-1].rstrip()
     return first_line
@@ -691,13 +730,10 @@ def _first_named_child(node: object, child_type: str) -> Optional[object]:
     return None
 
 
-def _node_text(node: Optional[object], source_bytes: bytes) -> str:
+def _node_text(node: Optional[object], source: SourceBuffer) -> str:
     if not node:
         return ''
-    try:
-        return source_bytes[node.start_byte:node.end_byte].decode('utf-8', errors='replace')
-    except Exception:
-        return ''
+    return source.text_at(node.start_byte, node.end_byte)
 
 
 def _ensure_external(nodes: Dict[str, SymbolNode], name: str) -> str:
@@ -1,10 +1,12 @@
 import hashlib
 import os
 import re
+import shutil
 import subprocess
 from dataclasses import dataclass
 from typing import Optional
 
+from . import storage
 from .models import RepoSpec
 
 
@@ -13,37 +15,146 @@ class RepoHandle:
     repo_id: str
     root_path: str
     commit_sha: Optional[str]
+    # Set when sources are read from commit_sha in this object database rather
+    # than from files under root_path.
+    git_dir: Optional[str] = None
+
+
+MIRRORS_DIR = 'mirrors'
+WORKTREES_DIR = 'worktrees'
+WORKTREES_ENV = 'GITREADER_WORKTREES'
 
 
 def ensure_repo(spec: RepoSpec, cache_root: str) -> RepoHandle:
     if spec.local_path:
         root_path = os.path.abspath(spec.local_path)
+        if spec.ref:
+            # An explicit ref is read from the repository's objects; the working
+            # copy is left alone.
+            git_dir = _git_output(['rev-parse', '--absolute-git-dir'], cwd=root_path)
+            commit_sha = _git_output(['rev-parse', '--verify', f'{spec.ref}^{{commit}}'], cwd=root_path)
+            return RepoHandle(
+                repo_id=_repo_id_for_spec(spec),
+                root_path=root_path,
+                commit_sha=commit_sha,
+                git_dir=git_dir,
+            )
         commit_sha = _get_commit_sha(root_path)
         return RepoHandle(repo_id=_repo_id_for_spec(spec), root_path=root_path, commit_sha=commit_sha)
 
     if not spec.repo_url:
         raise ValueError('repo_url or local_path is required')
 
-    repo_id = _repo_id_for_spec(spec)
-    repo_path = os.path.join(cache_root, repo_id)
-    if not os.path.isdir(repo_path):
-        _run_git(['clone', '--depth', '1', spec.repo_url, repo_path])
-    else:
-        _run_git(['fetch', '--depth', '1', 'origin'], cwd=repo_path)
-
-    if spec.ref:
-        _run_git(['checkout', spec.ref], cwd=repo_path)
-    else:
-        _run_git(['checkout', 'HEAD'], cwd=repo_path)
-
-    commit_sha = _get_commit_sha(repo_path)
-    return RepoHandle(repo_id=repo_id, root_path=repo_path, commit_sha=commit_sha)
+    # One bare object store per remote. By default refs are indexed straight from
+    # it, so any number of refs can be read side by side without a checkout; with
+    # GITREADER_WORKTREES set each ref gets a worktree checked out from it instead.
+    # Subdir requests fetch without blobs and then pull only that subtree's blobs.
+    # Once that has happened the mirror is a partial clone and later fetches inherit
+    # its filter, so whole-tree requests then batch-fetch their missing blobs too.
+    subdir = normalize_subdir(spec.subdir)
+    mirror_id = _mirror_id_for_url(spec.repo_url)
+    mirror_path = os.path.join(cache_root, MIRRORS_DIR, f'{mirror_id}.git')
+    # Setup, fetches and worktree changes in one repository contend for its config,
+    # shallow and ref locks, across threads and worker processes alike.
+    with storage.build_lock(os.path.join(cache_root, MIRRORS_DIR), mirror_id):
+        _ensure_mirror(mirror_path, spec.repo_url)
+        commit_sha = _fetch_ref(mirror_path, spec.ref, blobless=bool(subdir))
+        if not _worktrees_enabled():
+            if subdir or _is_partial(mirror_path):
+                _fetch_missing_blobs(mirror_path, commit_sha, subdir)
+            return RepoHandle(
+                repo_id=_repo_id_for_spec(spec),
+                root_path=mirror_path,
+                commit_sha=commit_sha,
+                git_dir=mirror_path,
+            )
+        worktree_path = os.path.join(cache_root, WORKTREES_DIR, _worktree_id_for_spec(spec))
+        _checkout_worktree(mirror_path, worktree_path, commit_sha, subdir)
+    return RepoHandle(repo_id=_repo_id_for_spec(spec), root_path=worktree_path, commit_sha=commit_sha)
+
+
+def _worktrees_enabled() -> bool:
+    return os.getenv(WORKTREES_ENV, '').lower() in {'1', 'true', 'yes'}
+
+
+def _ensure_mirror(mirror_path: str, repo_url: str) -> None:
+    if not os.path.isdir(mirror_path):
+        _run_git(['init', '--bare', '--quiet', mirror_path])
+        _run_git(['remote', 'add', 'origin', repo_url], cwd=mirror_path)
+
+
+def _fetch_ref(mirror_path: str, ref: Optional[str], blobless: bool = False) -> str:
+    remote_ref = ref or 'HEAD'
+    local_ref = f'refs/gitreader/{_hash_key(remote_ref)}'
+    args = ['fetch', '--quiet', '--no-tags', '--depth', '1']
+    if blobless:
+        args.append('--filter=blob:none')
+    _run_git(args + ['origin', f'+{remote_ref}:{local_ref}'], cwd=mirror_path)
+    return _git_output(['rev-parse', '--verify', f'{local_ref}^{{commit}}'], cwd=mirror_path)
+
+
+def _is_partial(mirror_path: str) -> bool:
+    result = subprocess.run(
+        ['git', 'config', '--bool', '--get', 'remote.origin.promisor'],
+        cwd=mirror_path,
+        capture_output=True,
+        check=False,
+    )
+    return result.stdout.strip() == b'true'
+
+
+def _fetch_missing_blobs(mirror_path: str, commit_sha: str, subdir: str = '') -> None:
+    # One batched fetch for the tree being read ('' for all of it), the way checkout
+    # does it, instead of a lazy round trip per blob when the reader first asks for it.
+    objects = _git_output(['rev-list', '--objects', '--missing=print', commit_sha], cwd=mirror_path)
+    missing = [line[1:] for line in objects.splitlines() if line.startswith('?')]
+    if subdir and missing:
+        listing = _git_output(['ls-tree', '-r', '--full-tree', commit_sha, '--', subdir], cwd=mirror_path)
+        wanted = set()
+        for line in listing.splitlines():
+            parts = line.split(None, 3)
+            if len(parts) >= 3 and parts[1] == 'blob':
+                wanted.add(parts[2])
+        missing = [object_id for object_id in missing if object_id in wanted]
+    if not missing:
+        return
+    subprocess.run(
+        [
+            'git', '-c', 'fetch.negotiationAlgorithm=noop', 'fetch', '--quiet', 'origin',
+            '--no-tags', '--no-write-fetch-head', '--recurse-submodules=no', '--filter=blob:none', '--stdin',
+        ],
+        cwd=mirror_path,
+        input='\n'.join(missing).encode('ascii') + b'\n',
+        check=False,
+    )
+
+
+def _checkout_worktree(mirror_path: str, worktree_path: str, commit_sha: str, subdir: str = '') -> None:
+    if os.path.exists(os.path.join(worktree_path, '.git')):
+        if _get_commit_sha(worktree_path) != commit_sha:
+            _run_git(['checkout', '--quiet', '--force', '--detach', commit_sha], cwd=worktree_path)
+        return
+    if os.path.isdir(worktree_path):
+        shutil.rmtree(worktree_path)
+    os.makedirs(os.path.dirname(worktree_path), exist_ok=True)
+    _run_git(['worktree', 'prune'], cwd=mirror_path)
+    if not subdir:
+        _run_git(['worktree', 'add', '--quiet', '--force', '--detach', worktree_path, commit_sha], cwd=mirror_path)
+        return
+    _run_git(['worktree', 'add', '--quiet', '--force', '--no-checkout', '--detach', worktree_path, commit_sha], cwd=mirror_path)
+    _run_git(['sparse-checkout', 'set', '--cone', subdir], cwd=worktree_path)
+    _run_git(['checkout', '--quiet', '--force', '--detach', commit_sha], cwd=worktree_path)
 
 
 def _run_git(args, cwd: Optional[str] = None) -> None:
     subprocess.check_call(['git'] + args, cwd=cwd)
 
 
+def _git_output(args, cwd: Optional[str] = None) -> str:
+    output = subprocess.check_output(['git'] + args, cwd=cwd)
+    return output.decode('utf-8', errors='replace').strip()
+
+
 def _get_commit_sha(repo_path: str) -> Optional[str]:
     git_dir = os.path.join(repo_path, '.git')
     if not os.path.exists(git_dir):
@@ -65,6 +176,27 @@ def _repo_id_for_spec(spec: RepoSpec) -> str:
     return f'{name}-{slug}'
 
 
+def _mirror_id_for_url(repo_url: str) -> str:
+    return f'{_slugify(repo_url)}-{_hash_key(repo_url)}'
+
+
+def _worktree_id_for_spec(spec: RepoSpec) -> str:
+    repo_url = spec.repo_url or ''
+    key = f'{repo_url}|{spec.ref or ""}'
+    subdir = normalize_subdir(spec.subdir)
+    if subdir:
+        key = f'{key}|{subdir}'
+    return f'{_slugify(repo_url)}-{_hash_key(key)}'
+
+
+def normalize_subdir(subdir: Optional[str]) -> str:
+    return (subdir or '').replace(os.sep, '/').strip('/')
+
+
+def _hash_key(value: str) -> str:
+    return hashlib.sha1(value.encode('utf-8', errors='replace')).hexdigest()[:12]
+
+
 def _slugify(value: str) -> str:
     value = value.strip().replace(os.sep, '-')
     value = re.sub(r'[^a-zA-Z0-9._-]+', '-', value)
@@ -0,0 +1,104 @@
+import importlib
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Set, Tuple
+
+
+@dataclass(frozen=True)
+class LanguagePlugin:
+    # What the indexer needs to know about a language without importing it; the
+    # parser, extractor and graph builder are 'module:attribute' references that
+    # are resolved the first time a scan turns up files for the language.
+    name: str
+    extensions: Tuple[str, ...]
+    scan_fields: Tuple[str, ...]
+    parser: str
+    extractor: str
+    graph_builder: str
+
+    def files(self, scan_result: object) -> List[str]:
+        files: List[str] = []
+        for field_name in self.scan_fields:
+            files.extend(getattr(scan_result, field_name))
+        return files
+
+
+@dataclass(frozen=True)
+class LoadedLanguage:
+    plugin: LanguagePlugin
+    iter_parsed: Callable
+    extract: Callable
+    build_graph: Callable
+    # Cache namespace for this language's per-file extracts.
+    extract_kind: str
+
+
+_REGISTRY: Dict[str, LanguagePlugin] = {}
+_LOADED: Dict[str, LoadedLanguage] = {}
+_LOAD_LOCK = threading.Lock()
+
+
+def register_language(plugin: LanguagePlugin) -> None:
+    _REGISTRY[plugin.name] = plugin
+    _LOADED.pop(plugin.name, None)
+
+
+def registered_languages() -> List[LanguagePlugin]:
+    return list(_REGISTRY.values())
+
+
+def source_extensions() -> Set[str]:
+    return {extension for plugin in _REGISTRY.values() for extension in plugin.extensions}
+
+
+def load_language(name: str) -> LoadedLanguage:
+    loaded = _LOADED.get(name)
+    if loaded is not None:
+        return loaded
+    with _LOAD_LOCK:
+        loaded = _LOADED.get(name)
+        if loaded is None:
+            plugin = _REGISTRY[name]
+            extract = _resolve(plugin.extractor)
+            loaded = LoadedLanguage(
+                plugin=plugin,
+                iter_parsed=_resolve(plugin.parser),
+                extract=extract,
+                build_graph=_resolve(plugin.graph_builder),
+                extract_kind=importlib.import_module(extract.__module__).EXTRACT_KIND,
+            )
+            _LOADED[name] = loaded
+    return loaded
+
+
+def _resolve(reference: str) -> Callable:
+    module_name, _, attribute = reference.partition(':')
+    module = importlib.import_module(f'.{module_name}', __package__)
+    return getattr(module, attribute)
+
+
+# Registration order is merge order: earlier languages win node id collisions.
+register_language(LanguagePlugin(
+    name='python',
+    extensions=('.py',),
+    scan_fields=('python_files',),
+    parser='parse_python:iter_parsed_files',
+    extractor='graph:extract_file',
+    graph_builder='graph:build_graph',
+))
+register_language(LanguagePlugin(
+    name='javascript',
+    extensions=('.js', '.jsx', '.ts', '.tsx'),
+    scan_fields=('js_files', 'jsx_files', 'ts_files', 'tsx_files'),
+    parser='parse_js:iter_parsed_js_files',
+    extractor='graph_js:extract_js_file',
+    graph_builder='graph_js:build_graph_js',
+))
+register_language(LanguagePlugin(
+    name='swift',
+    extensions=('.swift',),
+    scan_fields=('swift_files',),
+    parser='parse_swift:iter_parsed_swift_files',
+    extractor='graph_swift:extract_swift_file',
+    graph_builder='graph_swift:build_graph_swift',
+))
@@ -0,0 +1,526 @@
+import json
+import os
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeout
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+
+class ProviderUnavailable(RuntimeError):
+    pass
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+class CircuitBreaker:
+    # Closed: calls go through. After `failure_threshold` consecutive failures the
+    # circuit opens and callers are refused at once, so they serve their fallback
+    # instead of waiting out a timeout. After `reset_after` seconds one probe call
+    # is let through (half-open); its outcome closes or re-opens the circuit.
+    def __init__(self, failure_threshold: int, reset_after: float) -> None:
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_after = reset_after
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.probe_thread: Optional[int] = None
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_after:
+                self.state = 'half_open'
+                self.probing = False
+            if self.state == 'half_open' and not self.probing:
+                self.probing = True
+                self.probe_thread = threading.get_ident()
+                return True
+            return False
+
+    def release(self) -> None:
+        # For a call that ended without recording an outcome: hands back the probe
+        # slot if this thread holds it, so a later call can probe instead.
+        with self.lock:
+            if self.probing and self.probe_thread == threading.get_ident():
+                self.probing = False
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def to_dict(self) -> Dict[str, object]:
+        with self.lock:
+            return {'state': self.state, 'consecutive_failures': self.failures}
+
+
+class LatencyTracker:
+    # Timeouts follow the provider's recent p95 latency (with headroom), bounded by
+    # GITREADER_LLM_MIN_TIMEOUT and GITREADER_LLM_TIMEOUT. Until enough calls have
+    # been observed the configured maximum applies.
+    def __init__(self, window: int, min_samples: int) -> None:
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self.lock:
+            self.samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def timeout(self, minimum: float, maximum: float, headroom: float) -> float:
+        p95 = self.p95()
+        if p95 is None:
+            return maximum
+        return max(minimum, min(maximum, p95 * headroom))
+
+
+class Provider:
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url
+        self.breaker = CircuitBreaker(
+            failure_threshold=_env_int('GITREADER_LLM_BREAKER_FAILURES', 3),
+            reset_after=_env_float('GITREADER_LLM_BREAKER_RESET', 30.0),
+        )
+        self.latency = LatencyTracker(window=100, min_samples=10)
+        self.usage = {'calls': 0, 'failures': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+        self.usage_lock = threading.Lock()
+
+    def record_usage(self, usage: object, failed: bool = False) -> None:
+        with self.usage_lock:
+            self.usage['calls'] += 1
+            if failed:
+                self.usage['failures'] += 1
+            if isinstance(usage, dict):
+                for field_name in ('prompt_tokens', 'completion_tokens'):
+                    if isinstance(usage.get(field_name), int):
+                        self.usage[field_name] += usage[field_name]
+
+    def usage_totals(self) -> Dict[str, int]:
+        with self.usage_lock:
+            return dict(self.usage)
+
+    def timeout(self) -> float:
+        maximum = float(_env_int('GITREADER_LLM_TIMEOUT', 30))
+        if self.breaker.state == 'half_open':
+            # A recovering provider may be slow to warm up; do not judge it by the old p95.
+            return maximum
+        minimum = _env_float('GITREADER_LLM_MIN_TIMEOUT', 5.0)
+        return self.latency.timeout(min(minimum, maximum), maximum, headroom=1.5)
+
+    def to_dict(self) -> Dict[str, object]:
+        p95 = self.latency.p95()
+        return {
+            **self.breaker.to_dict(),
+            'p95_seconds': round(p95, 3) if p95 is not None else None,
+            'timeout_seconds': round(self.timeout(), 3),
+            'usage': self.usage_totals(),
+        }
+
+
+_PROVIDERS: Dict[str, Provider] = {}
+_PROVIDERS_LOCK = threading.Lock()
+
+
+def provider(base_url: str) -> Provider:
+    with _PROVIDERS_LOCK:
+        entry = _PROVIDERS.get(base_url)
+        if entry is None:
+            entry = Provider(base_url)
+            _PROVIDERS[base_url] = entry
+        return entry
+
+
+def provider_status() -> Dict[str, Dict[str, object]]:
+    with _PROVIDERS_LOCK:
+        providers = list(_PROVIDERS.values())
+    return {entry.base_url: entry.to_dict() for entry in providers}
+
+
+def chat_completion(api_key: str, base_url: str, payload: Dict[str, object]) -> str:
+    # The one place that talks to the provider, so the narrator and the tour share
+    # its breaker and latency history.
+    entry = provider(base_url)
+    if not entry.breaker.allow():
+        raise ProviderUnavailable(f'LLM provider circuit open: {base_url}')
+    recorded = False
+    try:
+        timeout = entry.timeout()
+        body = json.dumps(payload).encode('utf-8')
+        # Roughly four bytes of prompt per token, plus the completion allowance.
+        estimate = len(body) / 4 + int(payload.get('max_tokens') or 0)
+        budget = scheduler().budget
+        request = urllib.request.Request(
+            f'{base_url}/chat/completions',
+            data=body,
+            headers={
+                'Content-Type': 'application/json',
+                'Authorization': f'Bearer {api_key}',
+            },
+            method='POST',
+        )
+        start = time.perf_counter()
+        try:
+            budget.charge(estimate)
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                raw = response.read().decode('utf-8', errors='replace')
+            payload = json.loads(raw)
+            usage = payload.get('usage') if isinstance(payload, dict) else None
+            if isinstance(usage, dict) and isinstance(usage.get('total_tokens'), int):
+                budget.charge(usage['total_tokens'] - estimate)
+            content = _response_content(payload)
+        except Exception as exc:
+            if _is_timeout(exc):
+                # Count the timeout as a sample so a provider that has become slower
+                # raises the p95 instead of timing out forever.
+                entry.latency.record(timeout)
+            recorded = True
+            entry.breaker.record_failure()
+            entry.record_usage(None, failed=True)
+            raise
+        entry.record_usage(usage)
+        entry.latency.record(time.perf_counter() - start)
+        recorded = True
+        entry.breaker.record_success()
+        return content
+    finally:
+        if not recorded:
+            # Whatever escaped (a payload that would not encode, an interrupt) must
+            # not leave a half-open breaker waiting on a probe that never reports.
+            entry.breaker.release()
+
+
+def _response_content(payload: object) -> str:
+    choices = payload.get('choices') if isinstance(payload, dict) else None
+    if not choices:
+        raise ValueError('No choices in LLM response')
+    message = choices[0].get('message') if isinstance(choices[0], dict) else None
+    content = message.get('content') if isinstance(message, dict) else None
+    if not content:
+        raise ValueError('Empty LLM response')
+    return str(content)
+
+
+def _is_timeout(exc: Exception) -> bool:
+    if isinstance(exc, urllib.error.URLError) and not isinstance(exc, urllib.error.HTTPError):
+        exc = exc.reason if isinstance(exc.reason, Exception) else exc
+    return isinstance(exc, (socket.timeout, TimeoutError))
+
+
+INTERACTIVE = 'interactive'
+PREFETCH = 'prefetch'
+BULK = 'bulk'
+PRIORITIES = (INTERACTIVE, PREFETCH, BULK)
+
+
+class TokenBudget:
+    # Tokens-per-minute allowance refilled continuously. Calls are charged an
+    # estimate up front and corrected from the provider's reported usage, so the
+    # balance may go negative; no new work is dispatched until it recovers.
+    def __init__(self, tokens_per_minute: int) -> None:
+        self.rate = tokens_per_minute / 60.0
+        self.capacity = float(tokens_per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def charge(self, tokens: float) -> None:
+        if self.unlimited:
+            return
+        with self.lock:
+            self._refill()
+            self.level = min(self.capacity, self.level - tokens)
+
+    def wait_time(self) -> float:
+        # Seconds until the balance is positive again (0 when it already is).
+        if self.unlimited:
+            return 0.0
+        with self.lock:
+            self._refill()
+            if self.level > 0:
+                return 0.0
+            return (1.0 - self.level) / self.rate
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class LLMJob:
+    def __init__(
+        self,
+        key: Hashable,
+        run: Callable[[], object],
+        priority: str,
+        group: str,
+        expires_at: Optional[float],
+    ) -> None:
+        self.key = key
+        self.run = run
+        self.priority = priority
+        self.group = group
+        self.expires_at = expires_at
+        self.future: Future = Future()
+
+
+class LLMScheduler:
+    # All generation work goes through one queue per priority class; within a
+    # class, groups (repositories) take turns so one repo's warm-up cannot starve
+    # another. `reserved` workers only ever take interactive jobs, so a click is
+    # never stuck behind background work. While the token budget is overdrawn
+    # only interactive jobs are dispatched (and still charged), so background
+    # work that drained it does not hold up a click. Jobs are keyed: submitting a key that is already queued
+    # or running joins it (and promotes a queued job to the higher priority).
+    def __init__(self, workers: int, reserved: int, budget: TokenBudget) -> None:
+        self.workers = max(workers, 1)
+        self.reserved = min(max(reserved, 0), self.workers - 1)
+        self.budget = budget
+        self.queues: Dict[str, OrderedDict[str, Deque[LLMJob]]] = {priority: OrderedDict() for priority in PRIORITIES}
+        self.jobs: Dict[Hashable, LLMJob] = {}
+        self.running = 0
+        self.running_background = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.condition = threading.Condition()
+        self.threads: List[threading.Thread] = []
+
+    def submit(
+        self,
+        key: Hashable,
+        run: Callable[[], object],
+        priority: str = INTERACTIVE,
+        group: str = '',
+        ttl: Optional[float] = None,
+    ) -> Future:
+        if priority not in PRIORITIES:
+            raise ValueError(f'Unknown LLM job priority: {priority}')
+        with self.condition:
+            job = self.jobs.get(key)
+            if job is not None:
+                if PRIORITIES.index(priority) < PRIORITIES.index(job.priority) and self._unqueue(job):
+                    job.priority = priority
+                    job.expires_at = None
+                    self._enqueue(job)
+                    self.condition.notify()
+                return job.future
+            expires_at = time.monotonic() + ttl if ttl else None
+            job = LLMJob(key, run, priority, group, expires_at)
+            self.jobs[key] = job
+            self._enqueue(job)
+            self._start_workers()
+            self.condition.notify()
+            return job.future
+
+    def cancel(self, group: Optional[str] = None, priority: Optional[str] = None) -> int:
+        # Drops queued (not running) jobs matching the group and/or priority.
+        cancelled = 0
+        with self.condition:
+            for job in list(self.jobs.values()):
+                if group is not None and job.group != group:
+                    continue
+                if priority is not None and job.priority != priority:
+                    continue
+                if self._unqueue(job):
+                    self._drop(job)
+                    cancelled += 1
+        return cancelled
+
+    def stats(self) -> Dict[str, object]:
+        with self.condition:
+            return {
+                'workers': self.workers,
+                'running': self.running,
+                'queued': {
+                    priority: sum(len(jobs) for jobs in self.queues[priority].values())
+                    for priority in PRIORITIES
+                },
+                'completed': self.completed,
+                'cancelled': self.cancelled,
+            }
+
+    def _enqueue(self, job: LLMJob) -> None:
+        self.queues[job.priority].setdefault(job.group, deque()).append(job)
+
+    def _unqueue(self, job: LLMJob) -> bool:
+        jobs = self.queues[job.priority].get(job.group)
+        if not jobs or job not in jobs:
+            return False
+        jobs.remove(job)
+        if not jobs:
+            del self.queues[job.priority][job.group]
+        return True
+
+    def _drop(self, job: LLMJob) -> None:
+        job.future.cancel()
+        if self.jobs.get(job.key) is job:
+            del self.jobs[job.key]
+        self.cancelled += 1
+
+    def _next_job(self) -> Tuple[Optional[LLMJob], Optional[float]]:
+        # The next dispatchable job, or how long to wait before looking again.
+        wait_time = self.budget.wait_time()
+        now = time.monotonic()
+        for priority in PRIORITIES:
+            if priority != INTERACTIVE:
+                if wait_time > 0:
+                    return None, wait_time
+                if self.running_background >= self.workers - self.reserved:
+                    break
+            queue = self.queues[priority]
+            while queue:
+                group, jobs = next(iter(queue.items()))
+                job = jobs.popleft()
+                if jobs:
+                    queue.move_to_end(group)
+                else:
+                    del queue[group]
+                if job.expires_at is not None and job.expires_at < now:
+                    self._drop(job)
+                    continue
+                if not job.future.set_running_or_notify_cancel():
+                    # Cancelled by a caller holding the future.
+                    if self.jobs.get(job.key) is job:
+                        del self.jobs[job.key]
+                    continue
+                return job, None
+        return None, None
+
+    def _start_workers(self) -> None:
+        # Started on first use so forked server workers each run their own threads.
+        while len(self.threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f'gitreader-llm-{len(self.threads)}', daemon=True)
+            self.threads.append(thread)
+            thread.start()
+
+    def _work(self) -> None:
+        while True:
+            with self.condition:
+                job, wait_time = self._next_job()
+                while job is None:
+                    self.condition.wait(timeout=wait_time)
+                    job, wait_time = self._next_job()
+                background = job.priority != INTERACTIVE
+                self.running += 1
+                if background:
+                    self.running_background += 1
+            try:
+                result = job.run()
+            except BaseException as exc:
+                job.future.set_exception(exc)
+            else:
+                job.future.set_result(result)
+            finally:
+                with self.condition:
+                    self.running -= 1
+                    if background:
+                        self.running_background -= 1
+                    self.completed += 1
+                    if self.jobs.get(job.key) is job:
+                        del self.jobs[job.key]
+                    self.condition.notify_all()
+
+
+_SCHEDULER: Optional[LLMScheduler] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def scheduler() -> LLMScheduler:
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = LLMScheduler(
+                workers=_env_int('GITREADER_LLM_WORKERS', 4),
+                reserved=_env_int('GITREADER_LLM_RESERVED_INTERACTIVE', 1),
+                budget=TokenBudget(_env_int('GITREADER_LLM_TPM', 0)),
+            )
+        return _SCHEDULER
+
+
+def job_ttl(priority: str) -> Optional[float]:
+    # How long a queued job stays wanted. Prefetched work is for a reader who may
+    # have moved on, so it is dropped unrun after GITREADER_LLM_PREFETCH_TTL
+    # seconds (default 120). Bulk jobs are waited on by prewarm and keep no ttl
+    # unless GITREADER_LLM_BULK_TTL sets one; interactive jobs never expire.
+    if priority == PREFETCH:
+        ttl = _env_float('GITREADER_LLM_PREFETCH_TTL', 120.0)
+    elif priority == BULK:
+        ttl = _env_float('GITREADER_LLM_BULK_TTL', 0.0)
+    else:
+        return None
+    return ttl if ttl > 0 else None
+
+
+def request_deadline() -> Optional[float]:
+    # Seconds an interactive request waits for generation before answering with
+    # its fallback; GITREADER_LLM_DEADLINE=0 waits for the result.
+    deadline = _env_float('GITREADER_LLM_DEADLINE', 1.5)
+    return deadline if deadline > 0 else None
+
+
+def submit(
+    key: Hashable,
+    job: Callable[[], object],
+    priority: str = INTERACTIVE,
+    group: str = '',
+    ttl: Optional[float] = None,
+) -> Future:
+    # Generation runs off the request thread and outlives it: a request that gives
+    # up at its deadline leaves the job to finish and fill the cache. Requests for
+    # the same key while it is queued or running join the job instead of starting
+    # another call. Background jobs pass a ttl so work nobody needs anymore is
+    # dropped rather than run.
+    return scheduler().submit(key, job, priority=priority, group=group, ttl=ttl)
+
+
+def wait(future: Future, deadline: Optional[float]) -> Optional[object]:
+    # The job's result, or None if it is still running at the deadline (or was
+    # cancelled before it ran).
+    try:
+        return future.result(timeout=deadline)
+    except (FutureTimeout, CancelledError):
+        return None
@@ -1,10 +1,22 @@
 from __future__ import annotations
 
+import sys
+from array import array
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Union
+from enum import IntEnum
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
 
 
-@dataclass
+# Ids, kinds and confidences repeat across thousands of nodes and edges. Interning
+# them means every instance points at one shared string per value; json.load would
+# otherwise allocate a fresh copy for every occurrence when an index is reloaded.
+def intern_str(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return sys.intern(str(value))
+
+
+@dataclass(slots=True)
 class SourceLocation:
     path: str
     start_line: int = 0
@@ -12,6 +24,9 @@ class SourceLocation:
     start_col: int = 0
     end_col: int = 0
 
+    def __post_init__(self) -> None:
+        self.path = sys.intern(self.path)
+
     def to_dict(self) -> Dict[str, Union[int, str]]:
         return {
             'path': self.path,
@@ -22,7 +37,7 @@ class SourceLocation:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class SymbolNode:
     id: str
     name: str
@@ -33,6 +48,12 @@ class SymbolNode:
     location: Optional[SourceLocation] = None
     module: Optional[str] = None
 
+    def __post_init__(self) -> None:
+        self.id = sys.intern(self.id)
+        self.name = sys.intern(self.name)
+        self.kind = sys.intern(self.kind)
+        self.module = intern_str(self.module)
+
     def to_dict(self) -> Dict[str, object]:
         payload: Dict[str, object] = {
             'id': self.id,
@@ -51,13 +72,29 @@ class SymbolNode:
         return payload
 
 
-@dataclass
+@dataclass(slots=True)
 class GraphEdge:
     source: str
     target: str
     kind: str
     confidence: str = 'low'
 
+    def __post_init__(self) -> None:
+        self.source = sys.intern(self.source)
+        self.target = sys.intern(self.target)
+        self.kind = sys.intern(self.kind)
+        self.confidence = sys.intern(self.confidence)
+
+    @classmethod
+    def _decoded(cls, source: str, target: str, kind: str, confidence: str) -> 'GraphEdge':
+        # From strings an EdgeList has already interned: skips __post_init__.
+        edge = object.__new__(cls)
+        edge.source = source
+        edge.target = target
+        edge.kind = kind
+        edge.confidence = confidence
+        return edge
+
     def to_dict(self) -> Dict[str, str]:
         return {
             'source': self.source,
@@ -67,6 +104,170 @@ class GraphEdge:
         }
 
 
+class EdgeKind(IntEnum):
+    CONTAINS = 0
+    IMPORTS = 1
+    CALLS = 2
+    INHERITS = 3
+    BLUEPRINT = 4
+
+
+class Confidence(IntEnum):
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+
+
+class _Codes:
+    # Small ints for a handful of repeated strings, seeded from an enum so the
+    # known values have fixed codes; anything else is appended as it turns up.
+    __slots__ = ('names', 'codes')
+
+    def __init__(self, members: Iterable[IntEnum]) -> None:
+        self.names: List[str] = [sys.intern(member.name.lower()) for member in sorted(members)]
+        self.codes: Dict[str, int] = {name: code for code, name in enumerate(self.names)}
+
+    def code(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            if len(self.names) > 255:
+                raise ValueError(f'Too many distinct values: {name}')
+            code = len(self.names)
+            name = sys.intern(name)
+            self.names.append(name)
+            self.codes[name] = code
+        return code
+
+
+class EdgeAdjacency:
+    # Edge positions grouped by one end, as compressed rows over the edge list's
+    # ids: the edges at ids[i] are positions[offsets[i]:offsets[i + 1]], in edge
+    # order. A counting sort keeps it at four bytes an edge.
+    def __init__(self, column: array, linked: Sequence[int], size: int) -> None:
+        counts = [0] * (size + 1)
+        for position in linked:
+            counts[column[position] + 1] += 1
+        for end in range(size):
+            counts[end + 1] += counts[end]
+        self.offsets = array('I', counts)
+        slots = counts[:-1]
+        positions = [0] * len(linked)
+        for position in linked:
+            end = column[position]
+            positions[slots[end]] = position
+            slots[end] += 1
+        self.positions = array('I', positions)
+
+    def get(self, row: Optional[int]) -> array:
+        if row is None:
+            return self.positions[0:0]
+        return self.positions[self.offsets[row]:self.offsets[row + 1]]
+
+
+class EdgeList(Sequence[GraphEdge]):
+    # The index's edges as parallel arrays: source and target are positions in
+    # ids, kind and confidence are one-byte codes (EdgeKind, Confidence). Ten
+    # bytes an edge instead of an object each; GraphEdge values are built on
+    # access, so callers iterate and index it like the list it replaces.
+    def __init__(self, edges: Iterable[GraphEdge] = ()) -> None:
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.sources = array('I')
+        self.targets = array('I')
+        self.kinds = array('B')
+        self.confidences = array('B')
+        self.kind_codes = _Codes(EdgeKind)
+        self.confidence_codes = _Codes(Confidence)
+        # Per-node lookups, built on first use and dropped whenever an edge is added.
+        self._outgoing: Optional[EdgeAdjacency] = None
+        self._incoming: Optional[EdgeAdjacency] = None
+        self.extend(edges)
+
+    def add(self, source: str, target: str, kind: str, confidence: str = 'low') -> None:
+        self.sources.append(self._position(source))
+        self.targets.append(self._position(target))
+        self.kinds.append(self.kind_codes.code(kind))
+        self.confidences.append(self.confidence_codes.code(confidence))
+        self._outgoing = self._incoming = None
+
+    def append(self, edge: GraphEdge) -> None:
+        self.add(edge.source, edge.target, edge.kind, edge.confidence)
+
+    def extend(self, edges: Iterable[GraphEdge]) -> None:
+        for edge in edges:
+            self.add(edge.source, edge.target, edge.kind, edge.confidence)
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    @overload
+    def __getitem__(self, position: int) -> GraphEdge: ...
+
+    @overload
+    def __getitem__(self, position: slice) -> List[GraphEdge]: ...
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._edge(item) for item in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError('edge index out of range')
+        return self._edge(position)
+
+    def __iter__(self) -> Iterator[GraphEdge]:
+        ids = self.ids
+        kind_names = self.kind_codes.names
+        confidence_names = self.confidence_codes.names
+        for source, target, kind, confidence in zip(self.sources, self.targets, self.kinds, self.confidences):
+            yield GraphEdge._decoded(ids[source], ids[target], kind_names[kind], confidence_names[confidence])
+
+    def rows(self) -> Iterator[Tuple[str, str, str, str]]:
+        # (source, target, kind, confidence) per edge without building GraphEdge
+        # objects: for loops over every edge of a large index.
+        ids = self.ids.__getitem__
+        return zip(
+            map(ids, self.sources),
+            map(ids, self.targets),
+            map(self.kind_codes.names.__getitem__, self.kinds),
+            map(self.confidence_codes.names.__getitem__, self.confidences),
+        )
+
+    def outgoing(self, node_id: str) -> List[GraphEdge]:
+        if self._outgoing is None:
+            self._outgoing = EdgeAdjacency(self.sources, range(len(self)), len(self.ids))
+        return [self._edge(position) for position in self._outgoing.get(self.positions.get(node_id))]
+
+    def incoming(self, node_id: str) -> List[GraphEdge]:
+        if self._incoming is None:
+            self._incoming = EdgeAdjacency(self.targets, range(len(self)), len(self.ids))
+        return [self._edge(position) for position in self._incoming.get(self.positions.get(node_id))]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (EdgeList, list)):
+            return len(self) == len(other) and all(mine == theirs for mine, theirs in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'EdgeList({len(self)} edges)'
+
+    def _edge(self, position: int) -> GraphEdge:
+        return GraphEdge._decoded(
+            self.ids[self.sources[position]],
+            self.ids[self.targets[position]],
+            self.kind_codes.names[self.kinds[position]],
+            self.confidence_codes.names[self.confidences[position]],
+        )
+
+    def _position(self, node_id: str) -> int:
+        position = self.positions.get(node_id)
+        if position is None:
+            position = len(self.ids)
+            self.ids.append(sys.intern(node_id))
+            self.positions[self.ids[position]] = position
+        return position
+
+
 @dataclass
 class ParseWarning:
     code: str
@@ -103,12 +304,21 @@ class RepoIndex:
     root_path: str
     commit_sha: Optional[str]
     nodes: Dict[str, SymbolNode] = field(default_factory=dict)
-    edges: List[GraphEdge] = field(default_factory=list)
+    edges: EdgeList = field(default_factory=EdgeList)
     toc: List[Dict[str, str]] = field(default_factory=list)
     warnings: List[ParseWarning] = field(default_factory=list)
     stats: Dict[str, int] = field(default_factory=dict)
     content_signature: Optional[str] = None
     generated_at: float = 0.0
+    # Indexes built from the object database read sources at commit_sha:tree_path.
+    git_dir: Optional[str] = None
+    tree_path: str = ''
+    # Incremented each time the index for this repo_id is rebuilt and published.
+    generation: int = 0
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.edges, EdgeList):
+            self.edges = EdgeList(self.edges)
 
     def to_dict(self) -> Dict[str, object]:
         return {
@@ -122,6 +332,9 @@ class RepoIndex:
             'stats': dict(self.stats),
             'content_signature': self.content_signature,
             'generated_at': self.generated_at,
+            'git_dir': self.git_dir,
+            'tree_path': self.tree_path,
+            'generation': self.generation,
         }
 
     @classmethod
@@ -149,16 +362,15 @@ class RepoIndex:
                 module=raw.get('module'),
             )
             nodes[node.id] = node
-        edges = [
-            GraphEdge(
-                source=str(edge.get('source', '')),
-                target=str(edge.get('target', '')),
-                kind=str(edge.get('kind', '')),
-                confidence=str(edge.get('confidence', 'low')),
-            )
-            for edge in payload.get('edges', [])
-            if isinstance(edge, dict)
-        ]
+        edges = EdgeList()
+        for edge in payload.get('edges', []):
+            if isinstance(edge, dict):
+                edges.add(
+                    str(edge.get('source', '')),
+                    str(edge.get('target', '')),
+                    str(edge.get('kind', '')),
+                    str(edge.get('confidence', 'low')),
+                )
         warnings = [
             ParseWarning(
                 code=str(warning.get('code', 'warning')),
@@ -180,6 +392,9 @@ class RepoIndex:
             stats=dict(payload.get('stats', {})),
             content_signature=payload.get('content_signature'),
             generated_at=float(payload.get('generated_at', 0.0)),
+            git_dir=payload.get('git_dir'),
+            tree_path=str(payload.get('tree_path') or ''),
+            generation=int(payload.get('generation', 0) or 0),
         )
 
 
@@ -3,17 +3,17 @@ import json
 import logging
 import os
 import time
-import urllib.request
-from typing import Dict, List, Optional
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
 
-from . import storage
+from . import fallbacks, llm, storage
 from .models import RepoSpec, RepoIndex, SymbolNode
-from .service import build_symbol_snippet, get_repo_index
-from .signals import extract_signals, format_signals, primary_route, signal_summary
+from .service import build_symbol_snippet, get_narration_fallbacks, get_repo_index
+from .signals import extract_signals, format_signals
 
 
 LOGGER = logging.getLogger(__name__)
-PROMPT_VERSION = 'v2'
+PROMPT_VERSION = 'v3'
 
 
 def narrate_symbol(
@@ -28,19 +28,93 @@ def narrate_symbol(
     if not node:
         raise ValueError('Symbol not found')
 
-    snippet_section = section or _default_section(node)
-    snippet = build_symbol_snippet(index, node, section=snippet_section)
-    cache_key = _narration_cache_key(index, node, mode, snippet)
-    cache_root = os.path.join(cache_root, 'narration')
-    cached = storage.load_narration(cache_root, index.repo_id, cache_key)
+    cached, fallback, job = _narration_job(index, node, cache_root, section, llm.INTERACTIVE)
     if cached:
+        cached['mode'] = mode
         cached['cached'] = True
         return cached
+    if job is None:
+        # Nothing to generate: the deterministic narration is the answer.
+        model = os.getenv('GITREADER_LLM_MODEL', 'gpt-5.2')
+        return {**_narration_response(node, fallback, 'fallback', model), 'mode': mode}
+    response = llm.wait(job, llm.request_deadline())
+    if response is None:
+        # Still generating: answer with the deterministic narration now; the job
+        # fills the cache and a later request picks the result up.
+        model = os.getenv('GITREADER_LLM_MODEL', 'gpt-5.2')
+        return {**_narration_response(node, fallback, 'fallback', model), 'mode': mode, 'pending': True}
+    return {**response, 'mode': mode}
+
+
+def warm_narration(
+    index: RepoIndex,
+    node: SymbolNode,
+    cache_root: str,
+    section: Optional[str] = None,
+    priority: str = llm.BULK,
+) -> Optional[Future]:
+    # Queues generation for a symbol ahead of any request; None if already cached
+    # or there is no provider to ask.
+    cached, _, job = _narration_job(index, node, cache_root, section, priority)
+    return None if cached else job
+
 
-    context = _build_context(index, node)
-    narration, source, model = _generate_narration(node, snippet, context, mode)
-    response = {
-        'mode': mode,
+def _narration_job(
+    index: RepoIndex,
+    node: SymbolNode,
+    cache_root: str,
+    section: Optional[str],
+    priority: str,
+) -> Tuple[Optional[Dict[str, object]], Dict[str, object], Optional[Future]]:
+    entry = _fallback_entry(index, node, cache_root, section)
+    snippet: Optional[Dict[str, object]] = None
+    if entry is not None:
+        snippet_hash = str(entry['snippet_hash'])
+    else:
+        snippet = build_symbol_snippet(index, node, section=section or fallbacks.default_section(node))
+        snippet_hash = fallbacks.snippet_hash(str(snippet.get('snippet') or ''))
+    cache_key = _narration_cache_key(index, node, snippet_hash)
+    narration_root = os.path.join(cache_root, 'narration')
+    cached = storage.load_narration(narration_root, index.repo_id, cache_key)
+    if cached:
+        return cached, {}, None
+
+    # One generation fills every field, so the entry is stored without a mode and
+    # each narrator tab is served from it.
+    if entry is not None:
+        signals = {kind: list(entry['signals'].get(kind, [])) for kind in extract_signals('')}
+        fallback = dict(entry['fallback'])
+    else:
+        signals = extract_signals(str(snippet.get('snippet') or ''))
+        fallback = fallbacks.fallback_narration(node, snippet, fallbacks.edge_context(index, node), signals)
+    if not _api_key():
+        # No job either; the caller answers with the fallback, which is not a cache hit.
+        return None, fallback, None
+    if snippet is None:
+        # Only now is the source needed, for the prompt.
+        snippet = build_symbol_snippet(index, node, section=fallbacks.default_section(node))
+
+    def generate() -> Dict[str, object]:
+        narration, source, model = _generate_narration(index, node, snippet, signals, fallback)
+        response = _narration_response(node, narration, source, model)
+        # A fallback standing in for a failed call is served but not cached, so the
+        # next request (or warm-up run) asks the provider again.
+        if source != 'fallback':
+            storage.save_narration(narration_root, index.repo_id, cache_key, response)
+        return response
+
+    job = llm.submit(
+        ('narration', narration_root, index.repo_id, cache_key),
+        generate,
+        priority=priority,
+        group=index.repo_id,
+        ttl=llm.job_ttl(priority),
+    )
+    return None, fallback, job
+
+
+def _narration_response(node: SymbolNode, narration: Dict[str, object], source: str, model: str) -> Dict[str, object]:
+    return {
         'symbol_id': node.id,
         'symbol_name': node.name,
         'hook': narration['hook'],
@@ -53,8 +127,6 @@ def narrate_symbol(
         'model': model,
         'prompt_version': PROMPT_VERSION,
     }
-    storage.save_narration(cache_root, index.repo_id, cache_key, response)
-    return response
 
 
 def load_cached_narration(
@@ -64,77 +136,67 @@ def load_cached_narration(
     mode: str,
     section: Optional[str] = None,
 ) -> Optional[Dict[str, object]]:
-    snippet_section = section or _default_section(node)
-    try:
-        snippet = build_symbol_snippet(index, node, section=snippet_section)
-    except ValueError:
-        return None
-    cache_key = _narration_cache_key(index, node, mode, snippet)
+    entry = _fallback_entry(index, node, cache_root, section)
+    if entry is not None:
+        snippet_hash = str(entry['snippet_hash'])
+    else:
+        try:
+            snippet = build_symbol_snippet(index, node, section=section or fallbacks.default_section(node))
+        except ValueError:
+            return None
+        snippet_hash = fallbacks.snippet_hash(str(snippet.get('snippet') or ''))
+    cache_key = _narration_cache_key(index, node, snippet_hash)
     narration_root = os.path.join(cache_root, 'narration')
-    return storage.load_narration(narration_root, index.repo_id, cache_key)
+    cached = storage.load_narration(narration_root, index.repo_id, cache_key)
+    if cached:
+        cached['mode'] = mode
+    return cached
+
+
+def _api_key() -> Optional[str]:
+    return os.getenv('GITREADER_LLM_API_KEY') or os.getenv('OPENAI_API_KEY')
 
 
-def _default_section(node: SymbolNode) -> str:
-    if node.kind in ('function', 'method', 'class'):
-        return 'body'
-    return 'full'
+def _fallback_entry(
+    index: RepoIndex,
+    node: SymbolNode,
+    cache_root: str,
+    section: Optional[str],
+) -> Optional[Dict[str, object]]:
+    # The precomputed entry covers the default section only.
+    if section and section != fallbacks.default_section(node):
+        return None
+    return get_narration_fallbacks(index, cache_root).get(node.id)
 
 
-def _narration_cache_key(index: RepoIndex, node: SymbolNode, mode: str, snippet: Dict[str, object]) -> str:
-    snippet_text = str(snippet.get('snippet') or '')
-    snippet_hash = hashlib.sha1(snippet_text.encode('utf-8', errors='replace')).hexdigest()
+def _narration_cache_key(index: RepoIndex, node: SymbolNode, snippet_hash: str) -> str:
+    # No commit or mode: an unchanged snippet keeps its narration across commits,
+    # and all modes share the one entry.
     payload = '|'.join([
         index.repo_id,
-        index.commit_sha or '',
         node.id,
-        mode,
         snippet_hash,
         PROMPT_VERSION,
     ])
     return hashlib.sha1(payload.encode('utf-8', errors='replace')).hexdigest()
 
 
-def _build_context(index: RepoIndex, node: SymbolNode) -> Dict[str, List[str]]:
-    incoming: List[str] = []
-    outgoing: List[str] = []
-    max_edges = 8
-    for edge in index.edges:
-        if edge.source == node.id:
-            target = index.nodes.get(edge.target)
-            target_name = target.name if target else edge.target
-            target_kind = target.kind if target else 'unknown'
-            outgoing.append(f'{edge.kind} -> {target_name} ({target_kind})')
-        elif edge.target == node.id:
-            source = index.nodes.get(edge.source)
-            source_name = source.name if source else edge.source
-            source_kind = source.kind if source else 'unknown'
-            incoming.append(f'{edge.kind} <- {source_name} ({source_kind})')
-        if len(incoming) >= max_edges and len(outgoing) >= max_edges:
-            break
-    return {
-        'incoming': incoming[:max_edges],
-        'outgoing': outgoing[:max_edges],
-    }
-
-
 def _generate_narration(
+    index: RepoIndex,
     node: SymbolNode,
     snippet: Dict[str, object],
-    context: Dict[str, List[str]],
-    mode: str,
+    signals: Dict[str, List[str]],
+    fallback: Dict[str, object],
 ) -> tuple[Dict[str, object], str, str]:
-    api_key = os.getenv('GITREADER_LLM_API_KEY') or os.getenv('OPENAI_API_KEY')
+    api_key = _api_key()
     model = os.getenv('GITREADER_LLM_MODEL', 'gpt-5.2')
     base_url = os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1').rstrip('/')
 
-    snippet_text = str(snippet.get('snippet') or '')
-    signals = extract_signals(snippet_text)
-    fallback = _fallback_narration(node, snippet, context, signals)
     if not api_key:
         LOGGER.warning('gitreader narrator disabled: missing GITREADER_LLM_API_KEY or OPENAI_API_KEY')
         return fallback, 'fallback', model
 
-    messages = _build_messages(node, snippet, context, mode, signals)
+    messages = _build_messages(node, snippet, fallbacks.edge_context(index, node), signals)
     start_time = time.perf_counter()
     try:
         content = _call_openai(
@@ -147,7 +209,7 @@ def _generate_narration(
         LOGGER.warning('gitreader narrator failed: %s', exc)
         return fallback, 'fallback', model
     elapsed = time.perf_counter() - start_time
-    LOGGER.info('gitreader narrator generated mode=%s symbol=%s model=%s time=%.2fs', mode, node.id, model, elapsed)
+    LOGGER.info('gitreader narrator generated symbol=%s model=%s time=%.2fs', node.id, model, elapsed)
 
     parsed = _parse_narration(content)
     narration = _merge_with_fallback(parsed, fallback)
@@ -158,7 +220,6 @@ def _build_messages(
     node: SymbolNode,
     snippet: Dict[str, object],
     context: Dict[str, List[str]],
-    mode: str,
     signals: Dict[str, List[str]],
 ) -> List[Dict[str, str]]:
     snippet_text = _format_snippet(snippet)
@@ -177,7 +238,6 @@ def _build_messages(
         'and concrete symbols. Avoid generic filler. Use line numbers from the snippet for key_lines.'
     )
     user = (
-        f'Mode: {mode}\n'
         f'Symbol: {node.name}\n'
         f'Kind: {node.kind}\n'
         f'Location: {location}\n'
@@ -223,28 +283,7 @@ def _call_openai(
         'temperature': _env_float('GITREADER_LLM_TEMPERATURE', 0.4),
         'max_tokens': _env_int('GITREADER_LLM_MAX_TOKENS', 700),
     }
-    body = json.dumps(payload).encode('utf-8')
-    request = urllib.request.Request(
-        f'{base_url}/chat/completions',
-        data=body,
-        headers={
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {api_key}',
-        },
-        method='POST',
-    )
-    timeout = _env_int('GITREADER_LLM_TIMEOUT', 30)
-    with urllib.request.urlopen(request, timeout=timeout) as response:
-        raw = response.read().decode('utf-8', errors='replace')
-    payload = json.loads(raw)
-    choices = payload.get('choices') if isinstance(payload, dict) else None
-    if not choices:
-        raise ValueError('No choices in LLM response')
-    message = choices[0].get('message') if isinstance(choices[0], dict) else None
-    content = message.get('content') if isinstance(message, dict) else None
-    if not content:
-        raise ValueError('Empty LLM response')
-    return str(content)
+    return llm.chat_completion(api_key, base_url, payload)
 
 
 def _parse_narration(content: str) -> Dict[str, object]:
@@ -315,191 +354,6 @@ def _merge_with_fallback(primary: Dict[str, object], fallback: Dict[str, object]
     return merged
 
 
-def _fallback_narration(
-    node: SymbolNode,
-    snippet: Dict[str, object],
-    context: Dict[str, List[str]],
-    signals: Dict[str, List[str]],
-) -> Dict[str, object]:
-    name = node.name
-    kind_label = _kind_label(node.kind)
-    location_label = _format_location(node, snippet)
-    signature = node.signature or ''
-    doc_line = node.summary or ''
-    route_label = primary_route(signals)
-    hook = _build_hook(name, kind_label, location_label, signature, doc_line, route_label, signals)
-    summary = _build_summary(node, location_label, signature, doc_line, context, route_label, signals)
-    key_lines = []
-    for highlight in snippet.get('highlights', []) or []:
-        if not isinstance(highlight, dict):
-            continue
-        line = highlight.get('start_line')
-        label = highlight.get('label', 'key line')
-        if isinstance(line, int) and line > 0:
-            key_lines.append({'line': line, 'text': str(label).replace('_', ' ').title()})
-    if not key_lines and isinstance(snippet.get('start_line'), int):
-        key_lines.append({'line': int(snippet.get('start_line')), 'text': 'Snippet start'})
-    connections = context.get('outgoing') or context.get('incoming') or [
-        'Connections are still being mapped.',
-    ]
-    next_thread = _build_next_thread(context)
-    return {
-        'hook': hook,
-        'summary': summary,
-        'key_lines': key_lines[:4],
-        'connections': connections[:4],
-        'next_thread': next_thread,
-    }
-
-
-def _kind_label(kind: str) -> str:
-    labels = {
-        'file': 'File',
-        'class': 'Class',
-        'function': 'Function',
-        'method': 'Method',
-        'blueprint': 'Blueprint',
-        'external': 'External symbol',
-    }
-    return labels.get(kind, 'Symbol')
-
-
-def _format_location(node: SymbolNode, snippet: Dict[str, object]) -> str:
-    path = node.location.path if node.location and node.location.path else ''
-    start_line = snippet.get('start_line') if isinstance(snippet.get('start_line'), int) else None
-    end_line = snippet.get('end_line') if isinstance(snippet.get('end_line'), int) else None
-    if start_line is None and node.location:
-        start_line = node.location.start_line or None
-    if end_line is None and node.location:
-        end_line = node.location.end_line or None
-    if path and start_line:
-        if end_line and end_line != start_line:
-            return f'{path}:{start_line}-{end_line}'
-        return f'{path}:{start_line}'
-    return path or ''
-
-
-def _build_hook(
-    name: str,
-    kind_label: str,
-    location_label: str,
-    signature: str,
-    doc_line: str,
-    route_label: str,
-    signals: Dict[str, List[str]],
-) -> str:
-    if route_label:
-        return f'{name} handles {route_label}.'
-    templates = signals.get('templates') or []
-    if templates:
-        return f'{name} renders {templates[0]}.'
-    if doc_line:
-        return f'{name}: {doc_line}'
-    if signature and location_label:
-        return f'{signature} in {location_label}.'
-    if location_label:
-        return f'{kind_label} {name} in {location_label}.'
-    if signature:
-        return signature
-    return f'{kind_label} {name} anchors this part of the flow.'
-
-
-def _build_summary(
-    node: SymbolNode,
-    location_label: str,
-    signature: str,
-    doc_line: str,
-    context: Dict[str, List[str]],
-    route_label: str,
-    signals: Dict[str, List[str]],
-) -> List[str]:
-    summary: List[str] = []
-    kind_label = _kind_label(node.kind)
-    if location_label and route_label:
-        summary.append(f'{kind_label} {node.name} in {location_label}. Route: {route_label}.')
-    elif location_label:
-        summary.append(f'{kind_label} {node.name} in {location_label}.')
-    elif route_label:
-        summary.append(f'Route: {route_label}.')
-    else:
-        summary.append(f'{kind_label} {node.name}.')
-    if signature:
-        summary.append(f'Signature: {signature}')
-    if doc_line:
-        summary.append(f'Docstring: {doc_line}')
-    summary.extend(signal_summary(signals))
-
-    outgoing = _edge_items(context.get('outgoing', []))
-    incoming = _edge_items(context.get('incoming', []))
-    if node.kind == 'file':
-        contains = _edge_summary(outgoing, 'contains', 'Contains')
-        if contains:
-            summary.append(contains)
-        imported = _edge_summary(incoming, 'imports', 'Imported by')
-        if imported:
-            summary.append(imported)
-    elif node.kind == 'class':
-        contains = _edge_summary(outgoing, 'contains', 'Contains')
-        if contains:
-            summary.append(contains)
-        calls = _edge_summary(outgoing, 'calls', 'Calls')
-        if calls:
-            summary.append(calls)
-    else:
-        calls = _edge_summary(outgoing, 'calls', 'Calls')
-        if calls:
-            summary.append(calls)
-        used_by = _edge_summary(incoming, 'calls', 'Used by')
-        if used_by:
-            summary.append(used_by)
-    return summary[:4]
-
-
-def _edge_items(entries: List[str]) -> List[tuple[str, str]]:
-    items: List[tuple[str, str]] = []
-    for entry in entries:
-        if '->' in entry:
-            left, right = entry.split('->', 1)
-        elif '<-' in entry:
-            left, right = entry.split('<-', 1)
-        else:
-            continue
-        kind = left.strip()
-        name = right.strip()
-        if '(' in name:
-            name = name.split('(', 1)[0].strip()
-        if kind and name:
-            items.append((kind, name))
-    return items
-
-
-def _edge_summary(items: List[tuple[str, str]], kind: str, label: str, limit: int = 3) -> str:
-    names = [name for edge_kind, name in items if edge_kind == kind]
-    if not names:
-        return ''
-    deduped: List[str] = []
-    seen = set()
-    for name in names:
-        if name in seen:
-            continue
-        seen.add(name)
-        deduped.append(name)
-        if len(deduped) >= limit:
-            break
-    suffix = '...' if len(names) > len(deduped) else ''
-    return f'{label}: {", ".join(deduped)}{suffix}'
-
-
-def _build_next_thread(context: Dict[str, List[str]]) -> str:
-    outgoing = _edge_items(context.get('outgoing', []))
-    incoming = _edge_items(context.get('incoming', []))
-    if outgoing:
-        return f'Follow {outgoing[0][1]} to continue the thread.'
-    if incoming:
-        return f'Backtrack to {incoming[0][1]} to see the caller.'
-    return 'Follow the nearest referenced symbol to continue the thread.'
-
-
 def _env_int(name: str, default: int) -> int:
     value = os.getenv(name)
     if not value:
@@ -1,6 +1,6 @@
 import os
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 try:
     from tree_sitter_languages import get_parser as get_ts_parser
@@ -14,6 +14,7 @@ except Exception:
     Language = None
 
 from .models import ParseWarning
+from .source import SourceBuffer, SourceReader, directory_reader
 
 
 @dataclass
@@ -21,7 +22,7 @@ class ParsedJsFile:
     path: str
     module: str
     tree: Optional[object]
-    source: str
+    source: SourceBuffer
     language: str
 
 
@@ -40,18 +41,27 @@ LANGUAGE_BY_EXT = {
 
 
 def parse_js_files(root_path: str, rel_paths: List[str]) -> ParsedJs:
-    parsed_files: List[ParsedJsFile] = []
     warnings: List[ParseWarning] = []
+    parsed_files = list(iter_parsed_js_files(root_path, rel_paths, warnings))
+    return ParsedJs(files=parsed_files, warnings=warnings)
+
+
+def iter_parsed_js_files(
+    root_path: str,
+    rel_paths: List[str],
+    warnings: List[ParseWarning],
+    read: Optional[SourceReader] = None,
+) -> Iterator[ParsedJsFile]:
+    read = read or directory_reader(root_path)
     for rel_path in rel_paths:
-        full_path = os.path.join(root_path, rel_path)
-        source = _read_source(full_path, rel_path, warnings)
+        source = read(rel_path, warnings)
         if source is None:
             continue
         parser, language = _get_parser_for_path(rel_path, warnings)
         tree = None
         if parser and language:
             try:
-                tree = parser.parse(source.encode('utf-8'))
+                tree = parser.parse(source.data)
             except Exception as exc:
                 warnings.append(ParseWarning(
                     code='parse_failed',
@@ -66,14 +76,13 @@ def parse_js_files(root_path: str, rel_paths: List[str]) -> ParsedJs:
                     path=rel_path,
                 ))
         module_path = module_path_from_file(rel_path)
-        parsed_files.append(ParsedJsFile(
+        yield ParsedJsFile(
             path=rel_path,
             module=module_path,
             tree=tree,
             source=source,
             language=language,
-        ))
-    return ParsedJs(files=parsed_files, warnings=warnings)
+        )
 
 
 def module_path_from_file(rel_path: str) -> str:
@@ -171,32 +180,3 @@ def _ensure_language(raw: object) -> object:
         return Language(raw)
     except Exception:
         return raw
-
-
-def _read_source(full_path: str, rel_path: str, warnings: List[ParseWarning]) -> Optional[str]:
-    try:
-        with open(full_path, 'r', encoding='utf-8') as handle:
-            return handle.read()
-    except UnicodeDecodeError:
-        try:
-            with open(full_path, 'r', encoding='utf-8', errors='replace') as handle:
-                warnings.append(ParseWarning(
-                    code='decode_lossy',
-                    message='Decoded with replacement characters',
-                    path=rel_path,
-                ))
-                return handle.read()
-        except OSError as exc:
-            warnings.append(ParseWarning(
-                code='read_failed',
-                message=str(exc),
-                path=rel_path,
-            ))
-            return None
-    except OSError as exc:
-        warnings.append(ParseWarning(
-            code='read_failed',
-            message=str(exc),
-            path=rel_path,
-        ))
-        return None
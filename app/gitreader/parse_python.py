@@ -1,9 +1,10 @@
 import ast
 import os
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from .models import ParseWarning
+from .source import SourceBuffer, SourceReader, directory_reader
 
 
 @dataclass
@@ -11,7 +12,7 @@ class ParsedFile:
     path: str
     module: str
     tree: ast.AST
-    source: str
+    source: SourceBuffer
 
 
 @dataclass
@@ -21,15 +22,24 @@ class ParsedPython:
 
 
 def parse_files(root_path: str, rel_paths: List[str]) -> ParsedPython:
-    parsed_files: List[ParsedFile] = []
     warnings: List[ParseWarning] = []
+    parsed_files = list(iter_parsed_files(root_path, rel_paths, warnings))
+    return ParsedPython(files=parsed_files, warnings=warnings)
+
+
+def iter_parsed_files(
+    root_path: str,
+    rel_paths: List[str],
+    warnings: List[ParseWarning],
+    read: Optional[SourceReader] = None,
+) -> Iterator[ParsedFile]:
+    read = read or directory_reader(root_path)
     for rel_path in rel_paths:
-        full_path = os.path.join(root_path, rel_path)
-        source = _read_source(full_path, rel_path, warnings)
+        source = read(rel_path, warnings)
         if source is None:
             continue
         try:
-            tree = ast.parse(source, filename=rel_path)
+            tree = ast.parse(source.text, filename=rel_path)
         except SyntaxError as exc:
             warnings.append(ParseWarning(
                 code='syntax_error',
@@ -39,13 +49,12 @@ def parse_files(root_path: str, rel_paths: List[str]) -> ParsedPython:
             ))
             continue
         module_path = module_path_from_file(rel_path)
-        parsed_files.append(ParsedFile(
+        yield ParsedFile(
             path=rel_path,
             module=module_path,
             tree=tree,
             source=source,
-        ))
-    return ParsedPython(files=parsed_files, warnings=warnings)
+        )
 
 
 def module_path_from_file(rel_path: str) -> str:
@@ -57,40 +66,22 @@ def module_path_from_file(rel_path: str) -> str:
     return module_path.strip('.')
 
 
-def _read_source(full_path: str, rel_path: str, warnings: List[ParseWarning]) -> Optional[str]:
-    try:
-        with open(full_path, 'r', encoding='utf-8') as handle:
-            return handle.read()
-    except UnicodeDecodeError:
-        try:
-            with open(full_path, 'r', encoding='utf-8', errors='replace') as handle:
-                warnings.append(ParseWarning(
-                    code='decode_lossy',
-                    message='Decoded with replacement characters',
-                    path=rel_path,
-                ))
-                return handle.read()
-        except OSError as exc:
-            warnings.append(ParseWarning(
-                code='read_failed',
-                message=str(exc),
-                path=rel_path,
-            ))
-            return None
-    except OSError as exc:
-        warnings.append(ParseWarning(
-            code='read_failed',
-            message=str(exc),
-            path=rel_path,
-        ))
+def signature_from_node(node: ast.AST, source: SourceBuffer, line_offsets: List[int]) -> Optional[str]:
+    lineno = getattr(node, 'lineno', None)
+    end_lineno = getattr(node, 'end_lineno', None)
+    col_offset = getattr(node, 'col_offset', None)
+    end_col_offset = getattr(node, 'end_col_offset', None)
+    if lineno is None or end_lineno is None or col_offset is None or end_col_offset is None:
         return None
-
-
-def signature_from_node(node: ast.AST, source: str) -> Optional[str]:
-    segment = ast.get_source_segment(source, node)
-    if not segment:
+    if lineno < 1 or lineno > len(line_offsets):
+        return None
+    # Offsets are UTF-8 byte columns; only the first line of the node is needed.
+    line_start = line_offsets[lineno - 1]
+    end = line_start + end_col_offset if end_lineno == lineno else len(source.data)
+    first = source.first_line_at(line_start + col_offset, end).strip()
+    if not first:
         return None
-    line = segment.strip().splitlines()[0].strip()
+    line = first.splitlines()[0].strip()
     if line.endswith(':'):
         return line[:-1]
     return line
@@ -1,6 +1,6 @@
 import os
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 try:
     from tree_sitter_languages import get_parser as get_ts_parser
@@ -14,6 +14,7 @@ except Exception:
     Language = None
 
 from .models import ParseWarning
+from .source import SourceBuffer, SourceReader, directory_reader
 
 
 @dataclass
@@ -21,7 +22,7 @@ class ParsedSwiftFile:
     path: str
     module: str
     tree: Optional[object]
-    source: str
+    source: SourceBuffer
 
 
 @dataclass
@@ -31,18 +32,27 @@ class ParsedSwift:
 
 
 def parse_swift_files(root_path: str, rel_paths: List[str]) -> ParsedSwift:
-    parsed_files: List[ParsedSwiftFile] = []
     warnings: List[ParseWarning] = []
+    parsed_files = list(iter_parsed_swift_files(root_path, rel_paths, warnings))
+    return ParsedSwift(files=parsed_files, warnings=warnings)
+
+
+def iter_parsed_swift_files(
+    root_path: str,
+    rel_paths: List[str],
+    warnings: List[ParseWarning],
+    read: Optional[SourceReader] = None,
+) -> Iterator[ParsedSwiftFile]:
+    read = read or directory_reader(root_path)
     for rel_path in rel_paths:
-        full_path = os.path.join(root_path, rel_path)
-        source = _read_source(full_path, rel_path, warnings)
+        source = read(rel_path, warnings)
         if source is None:
             continue
         parser = _get_parser(warnings, rel_path)
         tree = None
         if parser:
             try:
-                tree = parser.parse(source.encode('utf-8'))
+                tree = parser.parse(source.data)
             except Exception as exc:
                 warnings.append(ParseWarning(
                     code='parse_failed',
@@ -57,13 +67,12 @@ def parse_swift_files(root_path: str, rel_paths: List[str]) -> ParsedSwift:
                     path=rel_path,
                 ))
         module_path = module_path_from_file(rel_path)
-        parsed_files.append(ParsedSwiftFile(
+        yield ParsedSwiftFile(
             path=rel_path,
             module=module_path,
             tree=tree,
             source=source,
-        ))
-    return ParsedSwift(files=parsed_files, warnings=warnings)
+        )
 
 
 def module_path_from_file(rel_path: str) -> str:
@@ -100,35 +109,6 @@ def _get_parser(warnings: List[ParseWarning], rel_path: str):
         return None
 
 
-def _read_source(full_path: str, rel_path: str, warnings: List[ParseWarning]) -> Optional[str]:
-    try:
-        with open(full_path, 'r', encoding='utf-8') as handle:
-            return handle.read()
-    except UnicodeDecodeError:
-        try:
-            with open(full_path, 'r', encoding='utf-8', errors='replace') as handle:
-                warnings.append(ParseWarning(
-                    code='decode_lossy',
-                    message='Decoded with replacement characters',
-                    path=rel_path,
-                ))
-                return handle.read()
-        except OSError as exc:
-            warnings.append(ParseWarning(
-                code='read_failed',
-                message=str(exc),
-                path=rel_path,
-            ))
-            return None
-    except OSError as exc:
-        warnings.append(ParseWarning(
-            code='read_failed',
-            message=str(exc),
-            path=rel_path,
-        ))
-        return None
-
-
 def _set_parser_language(parser: object, language: object, warnings: List[ParseWarning], rel_path: str) -> None:
     if hasattr(parser, 'set_language'):
         try:
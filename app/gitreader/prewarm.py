@@ -0,0 +1,219 @@
+"""Pre-generate narrations and tour steps for a repository's top-ranked symbols.
+
+Usage: python -m app.gitreader.prewarm (--repo URL | --local PATH) [--ref REF] [--subdir DIR]
+       [--top N] [--concurrency N] [--tour-modes story,teacher] [--cache-root DIR]
+       [--prompt-price USD] [--completion-price USD] [--json]
+
+Symbols are ranked with story arc scenes first, then by call-graph centrality
+(PageRank, betweenness and core number; fan-in/fan-out without NumPy).
+Results go into the same narration and tour caches the server reads. Anything
+already cached is skipped, so an interrupted run picks up where it stopped.
+Failed calls are not cached and are retried on the next run.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Set
+
+from . import llm
+from .models import RepoSpec
+from .narrator import warm_narration
+from .service import get_graph_ranks, get_story_arcs
+from .story import rank_symbols
+from .tour import warm_tour_step
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CACHE_ROOT = os.path.join(ROOT, 'instance', 'gitreader')
+
+
+@dataclass
+class PrewarmReport:
+    repo_id: str = ''
+    targets: int = 0
+    cached: int = 0
+    generated: int = 0
+    fallback: int = 0
+    skipped: int = 0
+    errors: int = 0
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    elapsed: float = 0.0
+    interrupted: bool = False
+
+    def cost(self, prompt_price: float, completion_price: float) -> float:
+        # Prices are USD per million tokens.
+        return (self.prompt_tokens * prompt_price + self.completion_tokens * completion_price) / 1_000_000
+
+    def to_dict(self) -> Dict[str, object]:
+        payload = asdict(self)
+        payload['items_per_second'] = round(self.generated / self.elapsed, 3) if self.elapsed else 0.0
+        payload['tokens_per_second'] = (
+            round((self.prompt_tokens + self.completion_tokens) / self.elapsed, 1) if self.elapsed else 0.0
+        )
+        return payload
+
+
+def prewarm(
+    spec: RepoSpec,
+    cache_root: str,
+    top: int = 200,
+    tour_modes: Optional[List[str]] = None,
+    concurrency: int = 4,
+    progress: Optional[Callable[[PrewarmReport], None]] = None,
+) -> PrewarmReport:
+    report = PrewarmReport()
+    start = time.perf_counter()
+    usage_before = _usage_totals()
+    index, arcs, _ = get_story_arcs(spec, cache_root=cache_root)
+    report.repo_id = index.repo_id
+
+    ranked = rank_symbols(index, arcs, get_graph_ranks(index, cache_root))
+    selected = [node_id for node_id in ranked if index.nodes[node_id].kind != 'external'][:top]
+    selected_ids: Set[str] = set(selected)
+    tasks: List[Callable[[], Optional[Future]]] = []
+    for node_id in selected:
+        tasks.append(lambda node=index.nodes[node_id]: warm_narration(index, node, cache_root))
+    # Tour steps are keyed by arc position, so walk the arcs and warm the steps
+    # whose scene made the cut.
+    for arc in sorted(arcs, key=lambda item: int(item.get('thread_index', 0))):
+        scenes = arc.get('scenes') if isinstance(arc.get('scenes'), list) else []
+        for step_index, scene in enumerate(scenes):
+            if scene.get('id') not in selected_ids:
+                continue
+            for mode in tour_modes or []:
+                tasks.append(
+                    lambda arc=arc, step_index=step_index, mode=mode: warm_tour_step(index, arc, step_index, mode, cache_root)
+                )
+    report.targets = len(tasks)
+
+    pending: Set[Future] = set()
+    try:
+        for task in tasks:
+            try:
+                future = task()
+            except ValueError:
+                # No snippet to narrate (e.g. the file is gone from the tree).
+                report.skipped += 1
+                continue
+            if future is None:
+                report.cached += 1
+                continue
+            pending.add(future)
+            # Bounded in-flight work keeps prompts from being built far ahead of the provider.
+            while len(pending) >= concurrency:
+                pending = _collect(pending, report, progress)
+        while pending:
+            pending = _collect(pending, report, progress)
+    except KeyboardInterrupt:
+        report.interrupted = True
+        llm.scheduler().cancel(group=index.repo_id)
+
+    usage_after = _usage_totals()
+    report.calls = usage_after['calls'] - usage_before['calls']
+    report.prompt_tokens = usage_after['prompt_tokens'] - usage_before['prompt_tokens']
+    report.completion_tokens = usage_after['completion_tokens'] - usage_before['completion_tokens']
+    report.elapsed = round(time.perf_counter() - start, 3)
+    return report
+
+
+def _collect(
+    pending: Set[Future],
+    report: PrewarmReport,
+    progress: Optional[Callable[[PrewarmReport], None]],
+) -> Set[Future]:
+    done, still_pending = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        try:
+            result = future.result()
+        except Exception:
+            report.errors += 1
+            continue
+        if isinstance(result, dict) and result.get('source') == 'fallback':
+            report.fallback += 1
+        else:
+            report.generated += 1
+    if progress is not None:
+        progress(report)
+    return still_pending
+
+
+def _usage_totals() -> Dict[str, int]:
+    totals = {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+    for status in llm.provider_status().values():
+        usage = status.get('usage') or {}
+        for key in totals:
+            totals[key] += int(usage.get(key) or 0)
+    return totals
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repo')
+    parser.add_argument('--local')
+    parser.add_argument('--ref')
+    parser.add_argument('--subdir')
+    parser.add_argument('--top', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--tour-modes', default='story', help='comma-separated; empty to skip tour steps')
+    parser.add_argument('--cache-root', default=DEFAULT_CACHE_ROOT)
+    parser.add_argument('--prompt-price', type=float, default=0.0, help='USD per million prompt tokens')
+    parser.add_argument('--completion-price', type=float, default=0.0, help='USD per million completion tokens')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+
+    if not args.repo and not args.local:
+        parser.error('one of --repo or --local is required')
+    if not (os.getenv('GITREADER_LLM_API_KEY') or os.getenv('OPENAI_API_KEY')):
+        # Without a provider every entry would be a fallback, which requests compute anyway.
+        raise SystemExit('prewarm needs GITREADER_LLM_API_KEY or OPENAI_API_KEY')
+    # This process only runs background work: no slots held back for interactive jobs.
+    os.environ['GITREADER_LLM_WORKERS'] = str(args.concurrency)
+    os.environ['GITREADER_LLM_RESERVED_INTERACTIVE'] = '0'
+
+    spec = RepoSpec(repo_url=args.repo, ref=args.ref, subdir=args.subdir, local_path=args.local)
+    tour_modes = [mode.strip() for mode in args.tour_modes.split(',') if mode.strip()]
+    last_print = [0.0]
+
+    def progress(report: PrewarmReport) -> None:
+        now = time.perf_counter()
+        if now - last_print[0] < 2.0:
+            return
+        last_print[0] = now
+        done = report.cached + report.generated + report.fallback + report.skipped + report.errors
+        print(f'  {done}/{report.targets} done, {report.generated} generated', file=sys.stderr)
+
+    report = prewarm(
+        spec,
+        cache_root=args.cache_root,
+        top=args.top,
+        tour_modes=tour_modes,
+        concurrency=args.concurrency,
+        progress=None if args.json else progress,
+    )
+    summary = report.to_dict()
+    summary['cost_usd'] = round(report.cost(args.prompt_price, args.completion_price), 4)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(
+            f'{report.repo_id}: {report.targets} targets, {report.generated} generated, '
+            f'{report.cached} already cached, {report.fallback} failed (fallback), '
+            f'{report.skipped} skipped, {report.errors} errors in {report.elapsed:.1f}s'
+        )
+        print(
+            f'  {report.calls} calls, {report.prompt_tokens} prompt + {report.completion_tokens} completion tokens, '
+            f'{summary["items_per_second"]} items/s, {summary["tokens_per_second"]} tokens/s, '
+            f'cost ${summary["cost_usd"]:.4f}'
+        )
+    if report.interrupted:
+        raise SystemExit(130)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .models import EdgeKind, RepoIndex
+
+
+# Bump when the scores change so stored ranks are recomputed.
+RANKS_VERSION = 1
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-10
+PAGERANK_MAX_ITERATIONS = 100
+BETWEENNESS_SAMPLES_ENV = 'GITREADER_BETWEENNESS_SAMPLES'
+
+_NUMPY = None
+_NUMPY_CHECKED = False
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _numpy():
+    # NumPy is optional: without it no ranks are computed and callers keep the
+    # degree-based scores. Imported on first use to stay off the cold-start path.
+    global _NUMPY, _NUMPY_CHECKED
+    if not _NUMPY_CHECKED:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _NUMPY = numpy
+        _NUMPY_CHECKED = True
+    return _NUMPY
+
+
+def ranks_available() -> bool:
+    return _numpy() is not None
+
+
+@dataclass
+class CallGraphCSR:
+    # Call edges between indexed symbols as compressed sparse rows: the callees of
+    # node_ids[i] are node_ids[indices[indptr[i]:indptr[i + 1]]]. Repeated calls
+    # between the same pair collapse into one edge.
+    node_ids: List[str]
+    indptr: object
+    indices: object
+
+    @property
+    def size(self) -> int:
+        return len(self.node_ids)
+
+
+def call_graph_csr(index: RepoIndex) -> Optional[CallGraphCSR]:
+    np = _numpy()
+    if np is None:
+        return None
+    node_ids = sorted(node_id for node_id, node in index.nodes.items() if node.kind != 'external')
+    positions = {node_id: position for position, node_id in enumerate(node_ids)}
+    # The edge arrays are read in place: edge-list ids map to graph positions,
+    # -1 for externals and ids that are not nodes.
+    edges = index.edges
+    lookup = np.array([positions.get(node_id, -1) for node_id in edges.ids], dtype=np.int64)
+    sources = lookup[np.frombuffer(edges.sources, dtype=np.uint32)]
+    targets = lookup[np.frombuffer(edges.targets, dtype=np.uint32)]
+    calls = np.frombuffer(edges.kinds, dtype=np.uint8) == EdgeKind.CALLS
+    keep = calls & (sources >= 0) & (targets >= 0)
+    return _csr(np, node_ids, sources[keep], targets[keep])
+
+
+def compute_ranks(index: RepoIndex) -> Optional[Dict[str, Dict[str, float]]]:
+    # {'pagerank': {node_id: score}, 'betweenness': {...}, 'core': {...}} over the
+    # call graph, or None without NumPy.
+    graph = call_graph_csr(index)
+    if graph is None:
+        return None
+    np = _numpy()
+    pagerank = _pagerank(np, graph)
+    betweenness = _betweenness(np, graph, _env_int(BETWEENNESS_SAMPLES_ENV, 64))
+    core = _core_numbers(np, graph)
+    return {
+        'pagerank': {node_id: float(value) for node_id, value in zip(graph.node_ids, pagerank.round(10))},
+        'betweenness': {node_id: float(value) for node_id, value in zip(graph.node_ids, betweenness.round(10))},
+        'core': {node_id: int(value) for node_id, value in zip(graph.node_ids, core)},
+    }
+
+
+def _csr(np, node_ids: List[str], sources, targets) -> CallGraphCSR:
+    size = len(node_ids)
+    if sources.size:
+        pairs = np.unique(sources * size + targets)
+        sources, targets = pairs // size, pairs % size
+    counts = np.bincount(sources, minlength=size)
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    # np.unique sorted the pairs by source, so targets are already in row order.
+    return CallGraphCSR(node_ids=node_ids, indptr=indptr, indices=targets.astype(np.int64))
+
+
+def _gather(np, graph: CallGraphCSR, rows):
+    # (row, column) pairs for every edge leaving the given rows, in one pass.
+    starts = graph.indptr[rows]
+    counts = graph.indptr[rows + 1] - starts
+    total = int(counts.sum())
+    if not total:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+    return np.repeat(rows, counts), graph.indices[offsets]
+
+
+def _pagerank(np, graph: CallGraphCSR):
+    size = graph.size
+    if not size:
+        return np.zeros(0)
+    out_degree = np.diff(graph.indptr)
+    sources = np.repeat(np.arange(size), out_degree)
+    dangling = out_degree == 0
+    inverse_degree = np.divide(1.0, out_degree, out=np.zeros(size), where=~dangling)
+    ranks = np.full(size, 1.0 / size)
+    for _ in range(PAGERANK_MAX_ITERATIONS):
+        spread = np.bincount(graph.indices, weights=(ranks * inverse_degree)[sources], minlength=size)
+        # Symbols that call nothing hand their rank to every symbol evenly.
+        updated = (1.0 - PAGERANK_DAMPING) / size + PAGERANK_DAMPING * (spread + ranks[dangling].sum() / size)
+        converged = np.abs(updated - ranks).sum() < PAGERANK_TOLERANCE * size
+        ranks = updated
+        if converged:
+            break
+    return ranks
+
+
+def _betweenness(np, graph: CallGraphCSR, samples: int):
+    # Brandes' algorithm from a fixed sample of sources, one vectorised BFS level at
+    # a time; exact when the sample covers every node. Normalised to [0, 1].
+    size = graph.size
+    centrality = np.zeros(size)
+    if size < 3:
+        return centrality
+    if samples <= 0 or samples >= size:
+        pivots = np.arange(size)
+    else:
+        pivots = np.sort(np.random.default_rng(0).choice(size, samples, replace=False))
+    for source in pivots:
+        distance = np.full(size, -1, dtype=np.int64)
+        sigma = np.zeros(size)
+        distance[source] = 0
+        sigma[source] = 1.0
+        frontier = np.array([source], dtype=np.int64)
+        levels = []
+        depth = 0
+        while frontier.size:
+            parents, children = _gather(np, graph, frontier)
+            if not children.size:
+                break
+            unseen = children[distance[children] < 0]
+            distance[unseen] = depth + 1
+            on_path = distance[children] == depth + 1
+            parents, children = parents[on_path], children[on_path]
+            sigma += np.bincount(children, weights=sigma[parents], minlength=size)
+            levels.append((parents, children))
+            # Nodes first reached at this level, already deduplicated.
+            frontier = np.flatnonzero(distance == depth + 1)
+            depth += 1
+        delta = np.zeros(size)
+        for parents, children in reversed(levels):
+            delta += np.bincount(
+                parents,
+                weights=sigma[parents] / sigma[children] * (1.0 + delta[children]),
+                minlength=size,
+            )
+        delta[source] = 0.0
+        centrality += delta
+    centrality *= size / len(pivots)
+    return centrality / ((size - 1) * (size - 2))
+
+
+def _core_numbers(np, graph: CallGraphCSR):
+    # k-core of the undirected call graph: peel every node of degree <= k, update
+    # the survivors' degrees, and raise k only once nothing more can be peeled.
+    size = graph.size
+    core = np.zeros(size, dtype=np.int64)
+    if not size:
+        return core
+    sources = np.repeat(np.arange(size), np.diff(graph.indptr))
+    keep = sources != graph.indices
+    undirected = _csr(
+        np,
+        graph.node_ids,
+        np.concatenate([sources[keep], graph.indices[keep]]),
+        np.concatenate([graph.indices[keep], sources[keep]]),
+    )
+    degree = np.diff(undirected.indptr)
+    remaining = np.ones(size, dtype=bool)
+    level = 0
+    while remaining.any():
+        level = max(level, int(degree[remaining].min()))
+        while True:
+            peeled = np.flatnonzero(remaining & (degree <= level))
+            if not peeled.size:
+                break
+            core[peeled] = level
+            remaining[peeled] = False
+            _, neighbours = _gather(np, undirected, peeled)
+            degree -= np.bincount(neighbours, minlength=size)
+    return core
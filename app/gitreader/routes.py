@@ -2,11 +2,29 @@ import os
 
 from flask import current_app, jsonify, render_template, request
 
-from . import gitreader
+from . import gitreader, llm, warmup
 from .models import GraphEdge, RepoSpec, SourceLocation, SymbolNode
 from .narrator import load_cached_narration, narrate_symbol
-from .service import get_repo_index, get_story_arcs, get_symbol_snippet
-from .tour import start_tour, step_tour
+from .service import (
+    get_graph_ranks,
+    get_neighbourhood,
+    get_paths,
+    get_repo_index,
+    get_story_arc,
+    get_story_arcs,
+    get_story_catalogue,
+    get_symbol_snippet,
+    search_symbols,
+)
+from .tour import resume_tour_session, start_tour, step_tour, step_tour_session
+from .traversal import EdgeFilter
+
+
+MAX_NEIGHBOURHOOD_HOPS = 6
+MAX_NEIGHBOURHOOD_NODES = 2000
+MAX_PATH_DEPTH = 12
+MAX_PATHS = 50
+MAX_SEARCH_RESULTS = 100
 
 
 @gitreader.route('/')
@@ -14,6 +32,22 @@ def index():
     return render_template('gitreader/index.html')
 
 
+@gitreader.route('/api/health')
+def health():
+    # Provider breakers are reported but never fail the check: narration falls back.
+    return jsonify({
+        'status': 'ok',
+        'pid': os.getpid(),
+        'llm': {'providers': llm.provider_status(), 'jobs': llm.scheduler().stats()},
+    })
+
+
+@gitreader.route('/api/ready')
+def ready():
+    state = warmup.STATE.to_dict()
+    return jsonify(state), 200 if state['ready'] else 503
+
+
 @gitreader.route('/api/toc')
 def toc():
     spec = _repo_spec_from_request()
@@ -64,6 +98,104 @@ def graph():
     })
 
 
+@gitreader.route('/api/neighbourhood')
+def neighbourhood():
+    # The k-hop subgraph around one symbol, for exploring without the full graph.
+    node_id = request.args.get('id')
+    if not node_id:
+        return _error_response('missing_id', 'Missing id', status=400)
+    spec = _repo_spec_from_request()
+    try:
+        hops = _int_arg('hops', 2, 1, MAX_NEIGHBOURHOOD_HOPS)
+        max_nodes = _int_arg('max_nodes', 200, 1, MAX_NEIGHBOURHOOD_NODES)
+        edge_filter = _edge_filter_from_request('both')
+        cache_root = os.path.join(current_app.instance_path, 'gitreader')
+        repo_index, subgraph = get_neighbourhood(spec, cache_root, node_id, hops, edge_filter, max_nodes)
+    except ValueError as exc:
+        message = str(exc)
+        if 'not found' in message.lower():
+            return _error_response('symbol_not_found', message, status=404)
+        return _error_response('bad_request', message, status=400)
+    except Exception:
+        current_app.logger.exception('gitreader neighbourhood failed')
+        return _error_response('server_error', 'Failed to load neighbourhood', status=500)
+    nodes, edges = _collapse_externals(subgraph.nodes, subgraph.edges)
+    return jsonify({
+        'id': node_id,
+        'hops': hops,
+        'nodes': [node.to_dict() for node in nodes],
+        'edges': [edge.to_dict() for edge in edges],
+        'depths': subgraph.depths,
+        'truncated': subgraph.truncated,
+        'stats': repo_index.stats,
+        'warnings': [warning.to_dict() for warning in repo_index.warnings],
+    })
+
+
+@gitreader.route('/api/path')
+def graph_path():
+    # Shortest paths from one symbol to another, following calls by default.
+    source_id = request.args.get('source')
+    target_id = request.args.get('target')
+    if not source_id or not target_id:
+        return _error_response('missing_id', 'Missing source or target', status=400)
+    spec = _repo_spec_from_request()
+    try:
+        max_depth = _int_arg('max_depth', 6, 1, MAX_PATH_DEPTH)
+        max_paths = _int_arg('max_paths', 5, 1, MAX_PATHS)
+        edge_filter = _edge_filter_from_request('out')
+        cache_root = os.path.join(current_app.instance_path, 'gitreader')
+        repo_index, paths, subgraph = get_paths(spec, cache_root, source_id, target_id, max_depth, edge_filter, max_paths)
+    except ValueError as exc:
+        message = str(exc)
+        if 'not found' in message.lower():
+            return _error_response('symbol_not_found', message, status=404)
+        return _error_response('bad_request', message, status=400)
+    except Exception:
+        current_app.logger.exception('gitreader path failed')
+        return _error_response('server_error', 'Failed to find paths', status=500)
+    return jsonify({
+        'source': source_id,
+        'target': target_id,
+        'paths': paths,
+        'length': len(paths[0]) - 1 if paths else None,
+        'nodes': [node.to_dict() for node in subgraph.nodes],
+        'edges': [edge.to_dict() for edge in subgraph.edges],
+        'stats': repo_index.stats,
+        'warnings': [warning.to_dict() for warning in repo_index.warnings],
+    })
+
+
+@gitreader.route('/api/search')
+def search():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return _error_response('missing_query', 'Missing q', status=400)
+    kinds = request.args.get('kind')
+    spec = _repo_spec_from_request()
+    try:
+        limit = _int_arg('limit', 20, 1, MAX_SEARCH_RESULTS)
+        cache_root = os.path.join(current_app.instance_path, 'gitreader')
+        repo_index, results = search_symbols(
+            spec,
+            cache_root,
+            query,
+            limit=limit,
+            kinds={kind.strip() for kind in kinds.split(',') if kind.strip()} if kinds else None,
+        )
+    except ValueError as exc:
+        return _error_response('bad_request', str(exc), status=400)
+    except Exception:
+        current_app.logger.exception('gitreader search failed')
+        return _error_response('server_error', 'Failed to search symbols', status=500)
+    return jsonify({
+        'query': query,
+        'results': results,
+        'stats': repo_index.stats,
+        'warnings': [warning.to_dict() for warning in repo_index.warnings],
+    })
+
+
 @gitreader.route('/api/narrate', methods=['POST'])
 def narrate():
     payload = request.get_json(silent=True) or {}
@@ -99,6 +231,8 @@ def narrate():
 def story():
     spec = _repo_spec_from_request()
     arc_id = request.args.get('id')
+    if arc_id:
+        return _story_arc(spec, arc_id)
     try:
         cache_root = os.path.join(current_app.instance_path, 'gitreader')
         repo_index, arcs, warnings = get_story_arcs(spec, cache_root=cache_root)
@@ -108,15 +242,8 @@ def story():
         current_app.logger.exception('gitreader story failed')
         return _error_response('server_error', 'Failed to build story arcs', status=500)
 
-    total_arcs = len(arcs)
-    if arc_id:
-        arc = next((item for item in arcs if item.get('id') == arc_id), None)
-        if not arc:
-            return _error_response('story_not_found', 'Story arc not found', status=404)
-        arcs = [arc]
-
     stats = dict(repo_index.stats)
-    stats['story_arcs'] = total_arcs
+    stats['story_arcs'] = len(arcs)
     return jsonify({
         'arcs': arcs,
         'stats': stats,
@@ -124,6 +251,48 @@ def story():
     })
 
 
+def _story_arc(spec, arc_id: str):
+    # Only the requested route's threads are built; the other threads of the route
+    # come along so the UI can label and open them without another scan.
+    try:
+        cache_root = os.path.join(current_app.instance_path, 'gitreader')
+        repo_index, arc, related_arcs, warnings = get_story_arc(spec, cache_root=cache_root, arc_id=arc_id)
+    except ValueError as exc:
+        return _error_response('bad_request', str(exc), status=400)
+    except Exception:
+        current_app.logger.exception('gitreader story failed')
+        return _error_response('server_error', 'Failed to build story arcs', status=500)
+    if not arc:
+        return _error_response('story_not_found', 'Story arc not found', status=404)
+    return jsonify({
+        'arcs': [arc],
+        'related_arcs': related_arcs,
+        'stats': dict(repo_index.stats),
+        'warnings': [warning.to_dict() for warning in warnings],
+    })
+
+
+@gitreader.route('/api/story/arcs')
+def story_catalogue():
+    spec = _repo_spec_from_request()
+    try:
+        cache_root = os.path.join(current_app.instance_path, 'gitreader')
+        repo_index, catalogue, warnings = get_story_catalogue(spec, cache_root=cache_root)
+    except ValueError as exc:
+        return _error_response('bad_request', str(exc), status=400)
+    except Exception:
+        current_app.logger.exception('gitreader story catalogue failed')
+        return _error_response('server_error', 'Failed to list story arcs', status=500)
+
+    stats = dict(repo_index.stats)
+    stats['story_routes'] = len(catalogue)
+    return jsonify({
+        'arcs': catalogue,
+        'stats': stats,
+        'warnings': [warning.to_dict() for warning in warnings],
+    })
+
+
 @gitreader.route('/api/tour/start', methods=['POST'])
 def tour_start():
     payload = request.get_json(silent=True) or {}
@@ -148,23 +317,48 @@ def tour_start():
 @gitreader.route('/api/tour/step', methods=['POST'])
 def tour_step():
     payload = request.get_json(silent=True) or {}
+    session_id = payload.get('session_id')
     state = payload.get('state')
-    if not isinstance(state, dict):
-        return _error_response('bad_request', 'Missing tour state', status=400)
+    if not session_id and not isinstance(state, dict):
+        return _error_response('bad_request', 'Missing tour session', status=400)
     action = payload.get('action', 'next')
     target_node_id = payload.get('target_node_id')
     target_arc_id = payload.get('target_arc_id')
-    spec = _repo_spec_from_request()
     try:
         cache_root = os.path.join(current_app.instance_path, 'gitreader')
-        state, step, warnings = step_tour(
-            spec,
-            cache_root=cache_root,
-            state=state,
-            action=action,
-            target_node_id=target_node_id,
-            target_arc_id=target_arc_id,
-        )
+        result = None
+        if session_id:
+            result = step_tour_session(
+                str(session_id),
+                cache_root=cache_root,
+                action=action,
+                target_node_id=target_node_id,
+                target_arc_id=target_arc_id,
+            )
+            if result is None:
+                if not isinstance(state, dict):
+                    return _error_response('tour_session_not_found', 'Tour session expired', status=404)
+                # Another worker's session, or one evicted or expired: carry on
+                # from the state the client sent along, in a new session.
+                result = resume_tour_session(
+                    _repo_spec_from_request(),
+                    cache_root=cache_root,
+                    state=state,
+                    action=action,
+                    target_node_id=target_node_id,
+                    target_arc_id=target_arc_id,
+                )
+        if result is None:
+            # Clients without a session still send the full state back each step.
+            result = step_tour(
+                _repo_spec_from_request(),
+                cache_root=cache_root,
+                state=state,
+                action=action,
+                target_node_id=target_node_id,
+                target_arc_id=target_arc_id,
+            )
+        state, step, warnings = result
     except ValueError as exc:
         return _error_response('bad_request', str(exc), status=400)
     except Exception:
@@ -229,6 +423,26 @@ def _load_symbol_snippet(spec: RepoSpec, symbol_id: str, section: str):
     return get_symbol_snippet(spec, cache_root=cache_root, symbol_id=symbol_id, section=section)
 
 
+def _int_arg(name: str, default: int, minimum: int, maximum: int) -> int:
+    value = request.args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        parsed = int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+    return max(minimum, min(maximum, parsed))
+
+
+def _edge_filter_from_request(default_direction: str) -> EdgeFilter:
+    kinds = request.args.get('kinds')
+    return EdgeFilter(
+        direction=request.args.get('direction', default_direction),
+        kinds=frozenset(kind.strip() for kind in kinds.split(',') if kind.strip()) if kinds else None,
+        min_confidence=request.args.get('min_confidence', 'low'),
+    )
+
+
 def _error_response(code: str, message: str, status: int = 400, details: dict | None = None):
     payload = {
         'error': {
@@ -269,18 +483,22 @@ def _apply_scope_paths(repo_index, allowed_paths: set[str]):
     if not allowed:
         return list(repo_index.nodes.values()), list(repo_index.edges)
     external_extra = set()
-    for edge in repo_index.edges:
-        if edge.source in allowed and edge.target not in allowed:
-            target_node = repo_index.nodes.get(edge.target)
+    for source, target, _kind, _confidence in repo_index.edges.rows():
+        if source in allowed and target not in allowed:
+            target_node = repo_index.nodes.get(target)
             if target_node and target_node.kind == 'external':
-                external_extra.add(edge.target)
-        elif edge.target in allowed and edge.source not in allowed:
-            source_node = repo_index.nodes.get(edge.source)
+                external_extra.add(target)
+        elif target in allowed and source not in allowed:
+            source_node = repo_index.nodes.get(source)
             if source_node and source_node.kind == 'external':
-                external_extra.add(edge.source)
+                external_extra.add(source)
     allowed |= external_extra
     nodes = [node for node_id, node in repo_index.nodes.items() if node_id in allowed]
-    edges = [edge for edge in repo_index.edges if edge.source in allowed and edge.target in allowed]
+    edges = [
+        GraphEdge(source=source, target=target, kind=kind, confidence=confidence)
+        for source, target, kind, confidence in repo_index.edges.rows()
+        if source in allowed and target in allowed
+    ]
     return nodes, edges
 
 
@@ -458,6 +676,11 @@ def _cached_summary_for_paths(repo_index, cache_root: str, allowed_paths: set[st
             file_nodes.append(node)
         elif node.kind in {'class', 'function', 'method'}:
             other_nodes.append(node)
+    ranks = get_graph_ranks(repo_index, cache_root)
+    if ranks:
+        # The chapter speaks in the voice of its most central symbols first.
+        pagerank = ranks.get('pagerank', {})
+        other_nodes.sort(key=lambda node: (-pagerank.get(node.id, 0.0), node.id))
     candidates = (file_nodes + other_nodes)[:12]
     for node in candidates:
         cached = load_cached_narration(repo_index, node, cache_root, mode='summary')
@@ -514,9 +737,9 @@ def _story_scope_paths(repo_index):
         if node.kind == 'external' and 'render_template' in node.name
     }
     if render_targets:
-        for edge in repo_index.edges:
-            if edge.target in render_targets:
-                source_node = repo_index.nodes.get(edge.source)
+        for source, target, _kind, _confidence in repo_index.edges.rows():
+            if target in render_targets:
+                source_node = repo_index.nodes.get(source)
                 if source_node and source_node.location and source_node.location.path:
                     template_paths.add(source_node.location.path.replace(os.sep, '/'))
 
@@ -1,7 +1,8 @@
 import os
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
+from .languages import source_extensions
 from .models import ParseWarning
 
 
@@ -23,6 +24,10 @@ DEFAULT_SKIP_DIRS = {
     'Carthage',
 }
 
+# Source files are read in full by the parsers, which sniff for binary content on
+# that same read; only other files are opened here.
+SOURCE_EXTENSIONS = source_extensions()
+
 
 @dataclass
 class ScanResult:
@@ -67,42 +72,71 @@ def scan_repo(root_path: str, max_file_size: int, max_files: Optional[int] = Non
                     path=rel_path,
                 ))
                 continue
-            result.total_files += 1
-            result.total_bytes += stat.st_size
-            if stat.st_size > max_file_size:
-                result.skipped_files.append(rel_path)
-                result.warnings.append(ParseWarning(
-                    code='file_too_large',
-                    message=f'Skipped file larger than {max_file_size} bytes',
-                    path=rel_path,
-                ))
-                continue
-            if _is_binary(full_path):
-                result.skipped_files.append(rel_path)
-                result.warnings.append(ParseWarning(
-                    code='binary_file',
-                    message='Skipped binary file',
-                    path=rel_path,
-                ))
-                continue
-            _, ext = os.path.splitext(filename)
-            ext = ext.lower()
-            result.extension_counts[ext] = result.extension_counts.get(ext, 0) + 1
-            if ext == '.py':
-                result.python_files.append(rel_path)
-            elif ext == '.js':
-                result.js_files.append(rel_path)
-            elif ext == '.jsx':
-                result.jsx_files.append(rel_path)
-            elif ext == '.ts':
-                result.ts_files.append(rel_path)
-            elif ext == '.tsx':
-                result.tsx_files.append(rel_path)
-            elif ext == '.swift':
-                result.swift_files.append(rel_path)
+            _add_file(result, rel_path, stat.st_size, max_file_size, lambda: _is_binary(full_path))
     return result
 
 
+def scan_tree(
+    entries: Iterable[Tuple[str, int]],
+    max_file_size: int,
+    max_files: Optional[int] = None,
+    is_binary: Optional[Callable[[str], bool]] = None,
+) -> ScanResult:
+    # Same classification as scan_repo over (path, size) pairs from a git tree.
+    # Without is_binary nothing is sniffed: non-source files count by extension.
+    result = ScanResult()
+    for rel_path, size in entries:
+        if any(part in DEFAULT_SKIP_DIRS for part in rel_path.split('/')[:-1]):
+            continue
+        if max_files is not None and result.source_file_count() >= max_files:
+            return result
+        sniff = (lambda: is_binary(rel_path)) if is_binary else (lambda: False)
+        _add_file(result, rel_path, size, max_file_size, sniff)
+    return result
+
+
+def _add_file(
+    result: ScanResult,
+    rel_path: str,
+    size: int,
+    max_file_size: int,
+    is_binary: Callable[[], bool],
+) -> None:
+    result.total_files += 1
+    result.total_bytes += size
+    if size > max_file_size:
+        result.skipped_files.append(rel_path)
+        result.warnings.append(ParseWarning(
+            code='file_too_large',
+            message=f'Skipped file larger than {max_file_size} bytes',
+            path=rel_path,
+        ))
+        return
+    _, ext = os.path.splitext(rel_path)
+    ext = ext.lower()
+    if ext not in SOURCE_EXTENSIONS and is_binary():
+        result.skipped_files.append(rel_path)
+        result.warnings.append(ParseWarning(
+            code='binary_file',
+            message='Skipped binary file',
+            path=rel_path,
+        ))
+        return
+    result.extension_counts[ext] = result.extension_counts.get(ext, 0) + 1
+    if ext == '.py':
+        result.python_files.append(rel_path)
+    elif ext == '.js':
+        result.js_files.append(rel_path)
+    elif ext == '.jsx':
+        result.jsx_files.append(rel_path)
+    elif ext == '.ts':
+        result.ts_files.append(rel_path)
+    elif ext == '.tsx':
+        result.tsx_files.append(rel_path)
+    elif ext == '.swift':
+        result.swift_files.append(rel_path)
+
+
 def _is_binary(path: str) -> bool:
     try:
         with open(path, 'rb') as handle:
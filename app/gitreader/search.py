@@ -0,0 +1,290 @@
+import base64
+import bisect
+import math
+import re
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .models import RepoIndex, SymbolNode
+
+
+# Bump when the stored layout or the terms change so search tables are rebuilt.
+SEARCH_VERSION = 1
+SEPARATOR_RE = re.compile(r'[./:\\]')
+BOUNDARY_CHARS = set('./:\\_-')
+PREFIX_TERMS_LIMIT = 2000
+FUZZY_TERMS_LIMIT = 400
+CANDIDATE_NODES_LIMIT = 1000
+MIN_TRIGRAM_SIMILARITY = 0.5
+FIELD_WEIGHTS = {
+    'name': 1.0,
+    'qualified': 0.8,
+    'path': 0.5,
+}
+# Ties on match quality go to the more central symbol.
+CENTRALITY_WEIGHT = 0.05
+# The best a trigram-only match can score; once a page of results beats it the
+# partial matches are not looked up at all.
+PARTIAL_MATCH_CEILING = 0.45 + CENTRALITY_WEIGHT
+# Terms checked per query while looking for partial matches.
+PARTIAL_SCAN_LIMIT = 10000
+
+
+class SearchIndex:
+    # Symbol lookup by name and file path. terms holds every distinct lowercased
+    # name and path in sorted order, so all terms sharing a prefix form one
+    # contiguous run: a prefix trie flattened into a list. The nodes behind
+    # terms[i] are posting_nodes[posting_offsets[i]:posting_offsets[i + 1]], and
+    # trigrams maps each three-character window to the terms containing it.
+    # Qualified ids are matched against the candidates those two produce.
+    def __init__(
+        self,
+        node_ids: List[str],
+        weights: array,
+        terms: List[str],
+        posting_offsets: array,
+        posting_nodes: array,
+        trigrams: Dict[str, array],
+    ) -> None:
+        self.node_ids = node_ids
+        self.weights = weights
+        self.terms = terms
+        self.posting_offsets = posting_offsets
+        self.posting_nodes = posting_nodes
+        self.trigrams = trigrams
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, object]) -> 'SearchIndex':
+        # The same strings as the index's interned ids, so only one copy is kept.
+        return cls(
+            node_ids=[sys.intern(node_id) for node_id in payload.get('node_ids', [])],
+            weights=_unpack('f', payload.get('weights', '')),
+            terms=list(payload.get('terms', [])),
+            posting_offsets=_unpack('I', payload.get('posting_offsets', '')),
+            posting_nodes=_unpack('I', payload.get('posting_nodes', '')),
+            trigrams={gram: _unpack('I', packed) for gram, packed in dict(payload.get('trigrams', {})).items()},
+        )
+
+    def to_dict(self) -> Dict[str, object]:
+        # Integer and float tables are stored as packed arrays: hundreds of
+        # thousands of symbols load in one decode instead of millions of ints.
+        return {
+            'node_ids': self.node_ids,
+            'weights': _pack(self.weights),
+            'terms': self.terms,
+            'posting_offsets': _pack(self.posting_offsets),
+            'posting_nodes': _pack(self.posting_nodes),
+            'trigrams': {gram: _pack(positions) for gram, positions in self.trigrams.items()},
+        }
+
+    def search(
+        self,
+        index: RepoIndex,
+        query: str,
+        limit: int = 20,
+        kinds: Optional[Set[str]] = None,
+    ) -> List[Dict[str, object]]:
+        needle = query.strip().lower()
+        if not needle:
+            return []
+        qualified = bool(SEPARATOR_RE.search(needle))
+        tail = SEPARATOR_RE.split(needle)[-1]
+        needle_grams = _trigrams(needle)
+        texts = [text for text in dict.fromkeys([needle, tail]) if text]
+        candidates: Set[int] = set()
+        scored: List[Tuple[float, str, SymbolNode]] = []
+        for partial in (False, True):
+            if partial and sum(1 for item in scored if item[0] > PARTIAL_MATCH_CEILING) >= limit:
+                break
+            for term_position in self._candidate_terms(texts, partial):
+                for position in self.posting_nodes[self.posting_offsets[term_position]:self.posting_offsets[term_position + 1]]:
+                    if position in candidates:
+                        continue
+                    candidates.add(position)
+                    node = index.nodes.get(self.node_ids[position])
+                    if node is None or (kinds and node.kind not in kinds):
+                        continue
+                    score, field = _score_node(node, needle, needle_grams, qualified)
+                    if score > 0.0:
+                        scored.append((score + CENTRALITY_WEIGHT * self.weights[position], field, node))
+                if len(candidates) >= CANDIDATE_NODES_LIMIT:
+                    break
+        scored.sort(key=lambda item: (-item[0], len(item[2].id), item[2].id))
+        return [_result(node, score, field) for score, field, node in scored[:limit]]
+
+    def _candidate_terms(self, texts: List[str], partial: bool) -> Iterator[int]:
+        # Close matches first: terms starting with the query or its last segment,
+        # then terms containing every trigram of either. With partial set, terms
+        # sharing only some trigrams, most first. Repeats are harmless.
+        if partial:
+            # Names and paths rarely share much with a whole dotted query, so a
+            # last segment long enough to have trigrams stands in for it.
+            yield from self._fuzzy_terms(texts[-1] if len(texts[-1]) >= 3 else texts[0], partial=True)
+            return
+        for text in texts:
+            yield from self._prefix_terms(text)
+        for text in texts:
+            yield from self._fuzzy_terms(text, partial=False)
+
+    def _prefix_terms(self, text: str) -> Iterator[int]:
+        start = bisect.bisect_left(self.terms, text)
+        for term_position in range(start, min(len(self.terms), start + PREFIX_TERMS_LIMIT)):
+            if not self.terms[term_position].startswith(text):
+                break
+            yield term_position
+
+    def _fuzzy_terms(self, text: str, partial: bool) -> Iterator[int]:
+        # Terms sharing all of the text's trigrams, or with partial set those
+        # sharing at least half but not all. A term sharing at least k of the n
+        # trigrams contains one of the n - k + 1 rarest. Scanning postings from
+        # the rarest trigram up, every term sharing n - i trigrams has been seen
+        # once i + 1 lists are read, so terms come out by overlap without
+        # touching the common trigrams' lists until the closer matches run out.
+        grams = sorted(_trigrams(text), key=lambda gram: (len(self.trigrams.get(gram, ())), gram))
+        if not grams:
+            return
+        minimum = max(1, math.ceil(len(grams) * MIN_TRIGRAM_SIMILARITY))
+        by_overlap: Dict[int, List[int]] = {}
+        seen: Set[int] = set()
+        produced = 0
+        for scanned, gram in enumerate(grams):
+            overlap = len(grams) - scanned
+            if overlap < minimum or (scanned and not partial):
+                return
+            exhausted = False
+            for term_position in self.trigrams.get(gram, ()):
+                if term_position in seen:
+                    continue
+                if partial and len(seen) >= PARTIAL_SCAN_LIMIT:
+                    exhausted = True
+                    break
+                seen.add(term_position)
+                term = self.terms[term_position]
+                shared = sum(1 for other in grams if other in term)
+                if shared >= minimum:
+                    by_overlap.setdefault(shared, []).append(term_position)
+            if exhausted:
+                # Out of budget: what was found so far goes out closest first.
+                ready = [position for shared in sorted(by_overlap, reverse=True) for position in by_overlap[shared]]
+            else:
+                ready = by_overlap.pop(overlap, [])
+            if exhausted or partial == (overlap < len(grams)):
+                for term_position in ready:
+                    yield term_position
+                    produced += 1
+                    if produced >= FUZZY_TERMS_LIMIT:
+                        return
+            if exhausted:
+                return
+
+
+def build_search_index(index: RepoIndex, ranks: Optional[Dict[str, Dict[str, float]]] = None) -> SearchIndex:
+    node_ids = sorted(node_id for node_id, node in index.nodes.items() if node.kind != 'external')
+    pagerank = (ranks or {}).get('pagerank', {})
+    peak = max(pagerank.values(), default=0.0)
+    weights = array('f', (pagerank.get(node_id, 0.0) / peak if peak > 0 else 0.0 for node_id in node_ids))
+    # A path leads to its file node; the symbols inside are found by name, and
+    # their path still counts when they are scored.
+    file_paths = {
+        node.location.path for node in index.nodes.values()
+        if node.kind == 'file' and node.location and node.location.path
+    }
+    nodes_by_term: Dict[str, List[int]] = {}
+    for position, node_id in enumerate(node_ids):
+        node = index.nodes[node_id]
+        texts = {node.name.lower()}
+        if node.location and node.location.path and (node.kind == 'file' or node.location.path not in file_paths):
+            texts.add(node.location.path.replace('\\', '/').lower())
+        for text in texts:
+            nodes_by_term.setdefault(text, []).append(position)
+    terms = sorted(nodes_by_term)
+    posting_offsets = array('I', [0])
+    posting_nodes = array('I')
+    trigrams: Dict[str, array] = {}
+    for term_position, term in enumerate(terms):
+        posting_nodes.extend(nodes_by_term[term])
+        posting_offsets.append(len(posting_nodes))
+        for gram in _trigrams(term):
+            trigrams.setdefault(gram, array('I')).append(term_position)
+    return SearchIndex(
+        node_ids=node_ids,
+        weights=weights,
+        terms=terms,
+        posting_offsets=posting_offsets,
+        posting_nodes=posting_nodes,
+        trigrams=trigrams,
+    )
+
+
+def _pack(values: array) -> str:
+    return base64.b64encode(values.tobytes()).decode('ascii')
+
+
+def _unpack(typecode: str, packed: object) -> array:
+    values = array(typecode)
+    if isinstance(packed, str) and packed:
+        values.frombytes(base64.b64decode(packed))
+    return values
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[offset:offset + 3] for offset in range(len(text) - 2)}
+
+
+def _score_node(node: SymbolNode, needle: str, needle_grams: Set[str], qualified: bool) -> Tuple[float, str]:
+    fields = [
+        ('qualified', node.id.split(':', 1)[-1].lower()),
+        ('path', node.location.path.replace('\\', '/').lower() if node.location and node.location.path else ''),
+    ]
+    if not qualified or SEPARATOR_RE.search(node.name):
+        # A dotted query names a symbol through its module; the bare name would
+        # match any symbol that happens to share the last segment.
+        fields.insert(0, ('name', node.name.lower()))
+    best, best_field = 0.0, ''
+    for field, text in fields:
+        if not text:
+            continue
+        score = _match_score(text, needle, needle_grams) * FIELD_WEIGHTS[field]
+        if score > best:
+            best, best_field = score, field
+    return best, best_field
+
+
+def _match_score(text: str, needle: str, needle_grams: Set[str]) -> float:
+    # 1.0 for an exact match, then prefix, then a match starting at a segment or
+    # word boundary, then any substring, then trigram overlap. Within a tier the
+    # shorter text wins.
+    if text == needle:
+        return 1.0
+    coverage = len(needle) / len(text)
+    if text.startswith(needle):
+        return 0.8 + 0.1 * coverage
+    offset = text.find(needle)
+    while offset > 0:
+        if text[offset - 1] in BOUNDARY_CHARS:
+            return 0.65 + 0.1 * coverage
+        offset = text.find(needle, offset + 1)
+    if needle in text:
+        return 0.5 + 0.1 * coverage
+    if not needle_grams:
+        return 0.0
+    similarity = sum(1 for gram in needle_grams if gram in text) / len(needle_grams)
+    if similarity < MIN_TRIGRAM_SIMILARITY:
+        return 0.0
+    return 0.4 * similarity + 0.05 * min(1.0, coverage)
+
+
+def _result(node: SymbolNode, score: float, field: str) -> Dict[str, object]:
+    payload: Dict[str, object] = {
+        'id': node.id,
+        'name': node.name,
+        'kind': node.kind,
+        'score': round(score, 4),
+        'matched': field,
+    }
+    if node.location:
+        payload['location'] = node.location.to_dict()
+    if node.summary:
+        payload['summary'] = node.summary
+    return payload
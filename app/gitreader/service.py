@@ -1,18 +1,21 @@
 import hashlib
+import io
 import logging
 import os
+import threading
 import time
-from typing import Optional
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterator, Optional
 
-from . import ingest, scan, storage
-from .graph import build_graph, build_toc
-from .graph_js import build_graph_js
-from .graph_swift import build_graph_swift
-from .models import ParseWarning, RepoIndex, RepoSpec
-from .parse_js import parse_js_files
-from .parse_python import parse_files
-from .parse_swift import parse_swift_files
-from .story import build_story_arcs
+from . import fallbacks, gitobjects, ingest, languages, ranking, scan, storage
+from .extract_cache import ExtractCache, blob_sha, cache_key, open_extract_cache
+from .graph import build_toc
+from .models import EdgeList, ParseWarning, RepoIndex, RepoSpec
+from .search import SEARCH_VERSION, SearchIndex, build_search_index
+from .signals import extract_signals
+from .source import SourceBuffer, SourceReader, source_from_bytes
+from .story import StoryPlanner
+from .traversal import EdgeFilter, GraphTraversal, Subgraph
 
 
 DEFAULT_MAX_FILE_SIZE = 512 * 1024
@@ -20,9 +23,57 @@ DEFAULT_MAX_FILES = 5000
 DEFAULT_SNIPPET_LINES = 200
 DEFAULT_FALLBACK_CONTEXT = 40
 STORY_CACHE_VERSION = 'v2'
+# Failures that depend on the environment rather than the file are never cached.
+UNCACHED_WARNINGS = {'read_failed', 'parse_failed', 'parser_unavailable'}
 LOGGER = logging.getLogger(__name__)
 
 
+class _ArtifactMemo:
+    # Loaded artifacts kept per process so a request does not re-read and re-decode
+    # the JSON on disk. Entries are served only while their signature still
+    # matches; callers treat the values as read-only since they are shared.
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[Hashable, object]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str, signature: Hashable) -> Optional[object]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != signature:
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, signature: Hashable, value: object) -> None:
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (signature, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+_INDEX_MEMO = _ArtifactMemo(_env_int('GITREADER_MEMO_REPOS', 16))
+_STORY_MEMO = _ArtifactMemo(_env_int('GITREADER_MEMO_REPOS', 16))
+_FALLBACKS_MEMO = _ArtifactMemo(_env_int('GITREADER_MEMO_REPOS', 16))
+_PLANNER_MEMO = _ArtifactMemo(_env_int('GITREADER_MEMO_REPOS', 16))
+_RANKS_MEMO = _ArtifactMemo(_env_int('GITREADER_MEMO_REPOS', 16))
+_TRAVERSAL_MEMO = _ArtifactMemo(_env_int('GITREADER_MEMO_REPOS', 16))
+_SEARCH_MEMO = _ArtifactMemo(_env_int('GITREADER_MEMO_REPOS', 16))
+
+
 def get_repo_index(
     spec: RepoSpec,
     cache_root: str,
@@ -38,67 +89,129 @@ def get_repo_index(
     handle = ingest.ensure_repo(spec, repo_cache_root)
     repo_elapsed = time.perf_counter() - repo_start
     scan_root = handle.root_path
-    if spec.subdir:
+    tree_path = ingest.normalize_subdir(spec.subdir)
+    tree = None
+    if handle.git_dir and handle.commit_sha:
+        tree = gitobjects.git_tree(handle.git_dir, handle.commit_sha, tree_path)
+    elif spec.subdir:
         scan_root = os.path.join(handle.root_path, spec.subdir)
         if not os.path.isdir(scan_root):
             raise ValueError(f'Subdir not found: {spec.subdir}')
 
     scan_start = time.perf_counter()
-    scan_result = scan.scan_repo(scan_root, max_file_size=max_file_size, max_files=max_files)
+    scan_result = _scan_sources(scan_root, tree, max_file_size=max_file_size, max_files=max_files)
+    if tree is not None and tree_path and not tree.entries():
+        raise ValueError(f'Subdir not found: {spec.subdir}')
     scan_elapsed = time.perf_counter() - scan_start
-    content_signature = _compute_signature(handle.commit_sha, scan_result)
+    content_signature = _compute_signature(handle.commit_sha, scan_result, from_objects=tree is not None)
+
+    memo_key = os.path.join(index_cache_root, handle.repo_id)
+    memoised = _INDEX_MEMO.get(memo_key, content_signature)
+    if memoised is not None:
+        return memoised
 
     cached = storage.load_index(index_cache_root, handle.repo_id)
-    if cached and cached.content_signature == content_signature:
-        total_elapsed = time.perf_counter() - start_time
-        LOGGER.info(
-            'gitreader index cache hit repo=%s commit=%s files=%s python=%s js=%s jsx=%s ts=%s tsx=%s swift=%s nodes=%s '
-            'edges=%s warnings=%s skipped=%s '
-            'timing repo=%.3fs scan=%.3fs total=%.3fs',
-            handle.repo_id,
-            handle.commit_sha or 'unknown',
-            scan_result.total_files,
-            len(scan_result.python_files),
-            len(scan_result.js_files),
-            len(scan_result.jsx_files),
-            len(scan_result.ts_files),
-            len(scan_result.tsx_files),
-            len(scan_result.swift_files),
-            cached.stats.get('nodes', len(cached.nodes)),
-            cached.stats.get('edges', len(cached.edges)),
-            cached.stats.get('warnings', len(cached.warnings)),
-            len(scan_result.skipped_files),
-            repo_elapsed,
-            scan_elapsed,
-            total_elapsed,
-        )
-        return cached
+    if not _index_is_current(cached, content_signature):
+        # Single flight: one builder per repo across processes; the others wait and
+        # then read the index it published instead of building it again.
+        with storage.build_lock(index_cache_root, handle.repo_id):
+            cached = storage.load_index(index_cache_root, handle.repo_id)
+            if not _index_is_current(cached, content_signature):
+                index = _build_index(
+                    handle,
+                    scan_root,
+                    tree,
+                    tree_path,
+                    scan_result,
+                    content_signature,
+                    cache_root,
+                    generation=(cached.generation if cached else 0) + 1,
+                    start_time=start_time,
+                    repo_elapsed=repo_elapsed,
+                    scan_elapsed=scan_elapsed,
+                )
+                _INDEX_MEMO.put(memo_key, content_signature, index)
+                return index
+
+    _INDEX_MEMO.put(memo_key, content_signature, cached)
+    total_elapsed = time.perf_counter() - start_time
+    LOGGER.info(
+        'gitreader index cache hit repo=%s commit=%s files=%s python=%s js=%s jsx=%s ts=%s tsx=%s swift=%s nodes=%s '
+        'edges=%s warnings=%s skipped=%s '
+        'timing repo=%.3fs scan=%.3fs total=%.3fs',
+        handle.repo_id,
+        handle.commit_sha or 'unknown',
+        scan_result.total_files,
+        len(scan_result.python_files),
+        len(scan_result.js_files),
+        len(scan_result.jsx_files),
+        len(scan_result.ts_files),
+        len(scan_result.tsx_files),
+        len(scan_result.swift_files),
+        cached.stats.get('nodes', len(cached.nodes)),
+        cached.stats.get('edges', len(cached.edges)),
+        cached.stats.get('warnings', len(cached.warnings)),
+        len(scan_result.skipped_files),
+        repo_elapsed,
+        scan_elapsed,
+        total_elapsed,
+    )
+    return cached
+
+
+def _index_is_current(cached: Optional[RepoIndex], content_signature: str) -> bool:
+    return cached is not None and cached.content_signature == content_signature
+
 
+def _build_index(
+    handle: ingest.RepoHandle,
+    scan_root: str,
+    tree: Optional[gitobjects.GitTree],
+    tree_path: str,
+    scan_result: scan.ScanResult,
+    content_signature: str,
+    cache_root: str,
+    generation: int,
+    start_time: float,
+    repo_elapsed: float,
+    scan_elapsed: float,
+) -> RepoIndex:
+    index_cache_root = os.path.join(cache_root, 'index')
+    # Each file is parsed, reduced to a compact extract and its tree and source
+    # dropped before the next one is read, so peak memory tracks the largest file.
+    # Files whose blob was extracted before, in any repository, are not parsed.
     parse_start = time.perf_counter()
-    parsed = parse_files(scan_root, scan_result.python_files)
-    script_files = (
-        scan_result.js_files
-        + scan_result.jsx_files
-        + scan_result.ts_files
-        + scan_result.tsx_files
-    )
-    parsed_js = parse_js_files(scan_root, script_files)
-    parsed_swift = parse_swift_files(scan_root, scan_result.swift_files)
+    language_extracts = []
+    parse_warnings: list[ParseWarning] = []
+    reused_extracts = 0
+    with open_extract_cache(cache_root) as extract_cache:
+        for plugin in languages.registered_languages():
+            rel_paths = plugin.files(scan_result)
+            if not rel_paths:
+                continue
+            # A language's parser and graph modules are imported on its first file.
+            language = languages.load_language(plugin.name)
+            extracts = _extract_files(
+                rel_paths, language.extract_kind, language.iter_parsed, language.extract,
+                scan_root, tree, extract_cache, parse_warnings,
+            )
+            language_extracts.append((language, extracts))
+        if extract_cache is not None:
+            reused_extracts = extract_cache.hits
     parse_elapsed = time.perf_counter() - parse_start
     graph_start = time.perf_counter()
-    graph = build_graph(parsed.files)
-    graph_js = build_graph_js(parsed_js.files)
-    graph_swift = build_graph_swift(parsed_swift.files)
+    graphs = [language.build_graph(extracts) for language, extracts in language_extracts]
     graph_elapsed = time.perf_counter() - graph_start
 
-    nodes = dict(graph.nodes)
-    _merge_nodes(nodes, graph_js.nodes)
-    _merge_nodes(nodes, graph_swift.nodes)
-    edges = list(graph.edges)
-    edges.extend(graph_js.edges)
-    edges.extend(graph_swift.edges)
+    nodes: dict = {}
+    edges = EdgeList()
+    for language_graph in graphs:
+        _merge_nodes(nodes, language_graph.nodes)
+        edges.extend(language_graph.edges)
 
-    warnings = scan_result.warnings + parsed.warnings + parsed_js.warnings + parsed_swift.warnings
+    warnings = scan_result.warnings + parse_warnings
+    # Binary source files are only detected once the parsers read them.
+    scan_result.skipped_files.extend(warning.path for warning in parse_warnings if warning.code == 'binary_file')
     stats = {
         'total_files': scan_result.total_files,
         'total_bytes': scan_result.total_bytes,
@@ -133,16 +246,30 @@ def get_repo_index(
         stats=stats,
         content_signature=content_signature,
         generated_at=time.time(),
+        git_dir=handle.git_dir if tree is not None else None,
+        tree_path=tree_path if tree is not None else '',
+        generation=generation,
     )
 
     storage_start = time.perf_counter()
     storage.save_index(index_cache_root, index)
     storage_elapsed = time.perf_counter() - storage_start
+    fallbacks_start = time.perf_counter()
+    _publish_fallbacks(index, cache_root, _build_fallbacks(index))
+    fallbacks_elapsed = time.perf_counter() - fallbacks_start
+    ranks_start = time.perf_counter()
+    ranks = ranking.compute_ranks(index)
+    if ranks is not None:
+        _publish_ranks(index, cache_root, ranks)
+    ranks_elapsed = time.perf_counter() - ranks_start
+    search_start = time.perf_counter()
+    _publish_search(index, cache_root, build_search_index(index, ranks))
+    search_elapsed = time.perf_counter() - search_start
     total_elapsed = time.perf_counter() - start_time
     LOGGER.info(
         'gitreader index built repo=%s commit=%s files=%s python=%s js=%s jsx=%s ts=%s tsx=%s swift=%s nodes=%s '
-        'edges=%s warnings=%s skipped=%s '
-        'timing repo=%.3fs scan=%.3fs parse=%.3fs graph=%.3fs store=%.3fs total=%.3fs',
+        'edges=%s warnings=%s skipped=%s reused=%s '
+        'timing repo=%.3fs scan=%.3fs parse=%.3fs graph=%.3fs store=%.3fs fallbacks=%.3fs ranks=%.3fs search=%.3fs total=%.3fs',
         handle.repo_id,
         handle.commit_sha or 'unknown',
         scan_result.total_files,
@@ -156,11 +283,15 @@ def get_repo_index(
         len(edges),
         len(warnings),
         len(scan_result.skipped_files),
+        reused_extracts,
         repo_elapsed,
         scan_elapsed,
         parse_elapsed,
         graph_elapsed,
         storage_elapsed,
+        fallbacks_elapsed,
+        ranks_elapsed,
+        search_elapsed,
         total_elapsed,
     )
     return index
@@ -191,28 +322,342 @@ def get_story_arcs(
 ) -> tuple[RepoIndex, list[dict[str, object]], list[ParseWarning]]:
     index = get_repo_index(spec, cache_root=cache_root, max_file_size=max_file_size, max_files=max_files)
     story_cache_root = os.path.join(cache_root, 'story')
+    story_signature = (index.content_signature, _story_version())
+    memo_key = os.path.join(story_cache_root, index.repo_id)
+    memoised = _STORY_MEMO.get(memo_key, story_signature)
+    if memoised is not None:
+        arcs, warnings = memoised
+        return index, arcs, warnings
+
     cached = storage.load_story(story_cache_root, index.repo_id)
-    if (
+    if not _story_is_current(cached, index):
+        with storage.build_lock(story_cache_root, index.repo_id):
+            cached = storage.load_story(story_cache_root, index.repo_id)
+            if not _story_is_current(cached, index):
+                generation = int(cached.get('generation', 0) or 0) + 1 if cached else 1
+                arcs, warnings = _build_story(index, cache_root, max_file_size, max_files, generation)
+                _STORY_MEMO.put(memo_key, story_signature, (arcs, warnings))
+                return index, arcs, warnings
+    cached_arcs = cached.get('arcs') if isinstance(cached.get('arcs'), list) else []
+    cached_warnings = _parse_warning_payload(cached.get('warnings', []))
+    _STORY_MEMO.put(memo_key, story_signature, (cached_arcs, cached_warnings))
+    return index, cached_arcs, cached_warnings
+
+
+def get_story_catalogue(
+    spec: RepoSpec,
+    cache_root: str,
+    max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+    max_files: Optional[int] = DEFAULT_MAX_FILES,
+) -> tuple[RepoIndex, list[dict[str, object]], list[ParseWarning]]:
+    # One entry per route without walking any threads; arcs are built when opened.
+    index = get_repo_index(spec, cache_root=cache_root, max_file_size=max_file_size, max_files=max_files)
+    planner, warnings = _story_planner(index, cache_root, max_file_size, max_files)
+    return index, planner.catalogue(), warnings
+
+
+def get_story_arc(
+    spec: RepoSpec,
+    cache_root: str,
+    arc_id: str,
+    max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+    max_files: Optional[int] = DEFAULT_MAX_FILES,
+) -> tuple[RepoIndex, Optional[dict[str, object]], list[dict[str, object]], list[ParseWarning]]:
+    # One arc and the other threads of its route. A full story already in memory
+    # answers directly; otherwise only this route's threads are built.
+    index = get_repo_index(spec, cache_root=cache_root, max_file_size=max_file_size, max_files=max_files)
+    memoised = _STORY_MEMO.get(
+        os.path.join(cache_root, 'story', index.repo_id),
+        (index.content_signature, _story_version()),
+    )
+    if memoised is not None:
+        arcs, warnings = memoised
+        arc = next((item for item in arcs if item.get('id') == arc_id), None)
+        related_ids = set(arc.get('related_ids') or []) if arc else set()
+        return index, arc, [item for item in arcs if item.get('id') in related_ids], warnings
+    planner, warnings = _story_planner(index, cache_root, max_file_size, max_files)
+    arc = planner.arc(arc_id)
+    return index, arc, planner.related_arcs(arc) if arc else [], warnings
+
+
+def _story_planner(
+    index: RepoIndex,
+    cache_root: str,
+    max_file_size: int,
+    max_files: Optional[int],
+) -> tuple[StoryPlanner, list[ParseWarning]]:
+    # Shared by the full build and per-arc requests so a route's threads are walked
+    # once per process, whichever asks first.
+    signature = (index.content_signature, _story_version())
+    memo_key = os.path.join(cache_root, 'story', index.repo_id)
+    memoised = _PLANNER_MEMO.get(memo_key, signature)
+    if memoised is not None:
+        return memoised
+    tree = _index_tree(index)
+    scan_result = _scan_sources(index.root_path, tree, max_file_size=max_file_size, max_files=max_files)
+    parse_warnings: list[ParseWarning] = []
+    python = languages.load_language('python')
+    with open_extract_cache(cache_root) as extract_cache:
+        extracts = _extract_files(
+            python.plugin.files(scan_result), python.extract_kind, python.iter_parsed, python.extract,
+            index.root_path, tree, extract_cache, parse_warnings,
+        )
+    routes = [route for extract in extracts for route in extract.routes]
+    planner = StoryPlanner(index, routes, ranks=get_graph_ranks(index, cache_root))
+    warnings = scan_result.warnings + parse_warnings
+    _PLANNER_MEMO.put(memo_key, signature, (planner, warnings))
+    return planner, warnings
+
+
+def get_neighbourhood(
+    spec: RepoSpec,
+    cache_root: str,
+    node_id: str,
+    hops: int,
+    edge_filter: EdgeFilter,
+    max_nodes: int,
+) -> tuple[RepoIndex, Subgraph]:
+    index = get_repo_index(spec, cache_root=cache_root)
+    return index, _graph_traversal(index, cache_root).neighbourhood(node_id, hops, edge_filter, max_nodes)
+
+
+def get_paths(
+    spec: RepoSpec,
+    cache_root: str,
+    source_id: str,
+    target_id: str,
+    max_depth: int,
+    edge_filter: EdgeFilter,
+    max_paths: int,
+) -> tuple[RepoIndex, list[list[str]], Subgraph]:
+    index = get_repo_index(spec, cache_root=cache_root)
+    traversal = _graph_traversal(index, cache_root)
+    paths = traversal.shortest_paths(source_id, target_id, max_depth, edge_filter, max_paths)
+    return index, paths, traversal.path_subgraph(paths, edge_filter)
+
+
+def _graph_traversal(index: RepoIndex, cache_root: str) -> GraphTraversal:
+    # Adjacency and recent BFS frontiers live as long as the index does.
+    signature = index.content_signature
+    memo_key = os.path.join(cache_root, 'index', index.repo_id)
+    traversal = _TRAVERSAL_MEMO.get(memo_key, signature)
+    if traversal is None:
+        traversal = GraphTraversal(index)
+        _TRAVERSAL_MEMO.put(memo_key, signature, traversal)
+    return traversal
+
+
+def search_symbols(
+    spec: RepoSpec,
+    cache_root: str,
+    query: str,
+    limit: int = 20,
+    kinds: Optional[set[str]] = None,
+) -> tuple[RepoIndex, list[dict[str, object]]]:
+    index = get_repo_index(spec, cache_root=cache_root)
+    return index, get_search_index(index, cache_root).search(index, query, limit=limit, kinds=kinds)
+
+
+def get_search_index(index: RepoIndex, cache_root: str) -> SearchIndex:
+    # Name and path lookup tables for /api/search. Built with the index; indexes
+    # published before search existed get theirs on first use.
+    search_cache_root = os.path.join(cache_root, 'search')
+    signature = (index.content_signature, SEARCH_VERSION)
+    memo_key = os.path.join(search_cache_root, index.repo_id)
+    memoised = _SEARCH_MEMO.get(memo_key, signature)
+    if memoised is not None:
+        return memoised
+
+    cached = storage.load_search(search_cache_root, index.repo_id)
+    if not _search_is_current(cached, index):
+        with storage.build_lock(search_cache_root, index.repo_id):
+            cached = storage.load_search(search_cache_root, index.repo_id)
+            if not _search_is_current(cached, index):
+                search_index = build_search_index(index, get_graph_ranks(index, cache_root))
+                _publish_search(index, cache_root, search_index)
+                return search_index
+    search_index = SearchIndex.from_dict(cached['search'])
+    _SEARCH_MEMO.put(memo_key, signature, search_index)
+    return search_index
+
+
+def _search_is_current(cached: Optional[dict], index: RepoIndex) -> bool:
+    return bool(
+        cached
+        and cached.get('content_signature') == index.content_signature
+        and cached.get('version') == SEARCH_VERSION
+    )
+
+
+def _publish_search(index: RepoIndex, cache_root: str, search_index: SearchIndex) -> None:
+    search_cache_root = os.path.join(cache_root, 'search')
+    storage.save_search(search_cache_root, index.repo_id, {
+        'repo_id': index.repo_id,
+        'content_signature': index.content_signature,
+        'version': SEARCH_VERSION,
+        'search': search_index.to_dict(),
+    })
+    _SEARCH_MEMO.put(
+        os.path.join(search_cache_root, index.repo_id),
+        (index.content_signature, SEARCH_VERSION),
+        search_index,
+    )
+
+
+def _story_version() -> str:
+    # Arcs follow centrality ranks when NumPy is installed and call-graph degree
+    # otherwise; stories built one way are not served the other.
+    return f'{STORY_CACHE_VERSION}-{"centrality" if ranking.ranks_available() else "degree"}'
+
+
+def get_graph_ranks(index: RepoIndex, cache_root: str) -> Optional[dict[str, dict]]:
+    # PageRank, betweenness and core number per symbol over the call graph:
+    # {'pagerank': {node_id: score}, 'betweenness': {...}, 'core': {...}}. Built
+    # with the index; None without NumPy, in which case nothing is stored.
+    if not ranking.ranks_available():
+        return None
+    ranks_cache_root = os.path.join(cache_root, 'ranks')
+    signature = (index.content_signature, ranking.RANKS_VERSION)
+    memo_key = os.path.join(ranks_cache_root, index.repo_id)
+    memoised = _RANKS_MEMO.get(memo_key, signature)
+    if memoised is not None:
+        return memoised
+
+    cached = storage.load_ranks(ranks_cache_root, index.repo_id)
+    if not _ranks_are_current(cached, index):
+        with storage.build_lock(ranks_cache_root, index.repo_id):
+            cached = storage.load_ranks(ranks_cache_root, index.repo_id)
+            if not _ranks_are_current(cached, index):
+                ranks = ranking.compute_ranks(index)
+                _publish_ranks(index, cache_root, ranks)
+                return ranks
+    ranks = cached['ranks']
+    _RANKS_MEMO.put(memo_key, signature, ranks)
+    return ranks
+
+
+def _ranks_are_current(cached: Optional[dict], index: RepoIndex) -> bool:
+    return bool(
         cached
         and cached.get('content_signature') == index.content_signature
-        and cached.get('story_version') == STORY_CACHE_VERSION
-    ):
-        cached_arcs = cached.get('arcs') if isinstance(cached.get('arcs'), list) else []
-        cached_warnings = _parse_warning_payload(cached.get('warnings', []))
-        return index, cached_arcs, cached_warnings
-
-    scan_result = scan.scan_repo(index.root_path, max_file_size=max_file_size, max_files=max_files)
-    parsed = parse_files(index.root_path, scan_result.python_files)
-    arcs = build_story_arcs(index, parsed.files)
-    warnings = scan_result.warnings + parsed.warnings
-    storage.save_story(story_cache_root, index.repo_id, {
+        and cached.get('version') == ranking.RANKS_VERSION
+    )
+
+
+def _publish_ranks(index: RepoIndex, cache_root: str, ranks: dict[str, dict]) -> None:
+    ranks_cache_root = os.path.join(cache_root, 'ranks')
+    storage.save_ranks(ranks_cache_root, index.repo_id, {
+        'repo_id': index.repo_id,
         'content_signature': index.content_signature,
-        'story_version': STORY_CACHE_VERSION,
+        'version': ranking.RANKS_VERSION,
+        'ranks': ranks,
+    })
+    _RANKS_MEMO.put(
+        os.path.join(ranks_cache_root, index.repo_id),
+        (index.content_signature, ranking.RANKS_VERSION),
+        ranks,
+    )
+
+
+def get_narration_fallbacks(index: RepoIndex, cache_root: str) -> dict[str, dict]:
+    # Deterministic narration, snippet signals and snippet hash per symbol, derived
+    # only from the index: node id -> {'signals', 'snippet_hash', 'fallback'}. Built
+    # with the index; indexes published before the table existed get theirs on
+    # first use.
+    fallbacks_cache_root = os.path.join(cache_root, 'fallbacks')
+    signature = (index.content_signature, fallbacks.FALLBACKS_VERSION)
+    memo_key = os.path.join(fallbacks_cache_root, index.repo_id)
+    memoised = _FALLBACKS_MEMO.get(memo_key, signature)
+    if memoised is not None:
+        return memoised
+
+    cached = storage.load_fallbacks(fallbacks_cache_root, index.repo_id)
+    if not _fallbacks_are_current(cached, index):
+        with storage.build_lock(fallbacks_cache_root, index.repo_id):
+            cached = storage.load_fallbacks(fallbacks_cache_root, index.repo_id)
+            if not _fallbacks_are_current(cached, index):
+                entries = _build_fallbacks(index)
+                _publish_fallbacks(index, cache_root, entries)
+                return entries
+    entries = cached.get('entries') if isinstance(cached.get('entries'), dict) else {}
+    _FALLBACKS_MEMO.put(memo_key, signature, entries)
+    return entries
+
+
+def _fallbacks_are_current(cached: Optional[dict], index: RepoIndex) -> bool:
+    return bool(
+        cached
+        and cached.get('content_signature') == index.content_signature
+        and cached.get('version') == fallbacks.FALLBACKS_VERSION
+    )
+
+
+def _publish_fallbacks(index: RepoIndex, cache_root: str, entries: dict[str, dict]) -> None:
+    fallbacks_cache_root = os.path.join(cache_root, 'fallbacks')
+    storage.save_fallbacks(fallbacks_cache_root, index.repo_id, {
+        'repo_id': index.repo_id,
+        'content_signature': index.content_signature,
+        'version': fallbacks.FALLBACKS_VERSION,
+        'entries': entries,
+    })
+    _FALLBACKS_MEMO.put(
+        os.path.join(fallbacks_cache_root, index.repo_id),
+        (index.content_signature, fallbacks.FALLBACKS_VERSION),
+        entries,
+    )
+
+
+def _build_fallbacks(index: RepoIndex) -> dict[str, dict]:
+    # One read per file and one pass over the edges for the whole repository.
+    contexts = fallbacks.edge_contexts(index)
+    empty_context: dict[str, list[str]] = {'incoming': [], 'outgoing': []}
+    nodes_by_path: dict[str, list] = {}
+    for node in index.nodes.values():
+        if node.kind != 'external' and node.location and node.location.path:
+            nodes_by_path.setdefault(node.location.path, []).append(node)
+    entries: dict[str, dict] = {}
+    for rel_path, nodes in nodes_by_path.items():
+        lines = _read_index_lines(index, rel_path)
+        if not lines:
+            continue
+        for node in nodes:
+            snippet = _snippet_from_lines(node, lines, DEFAULT_SNIPPET_LINES, fallbacks.default_section(node))
+            signals = extract_signals(snippet['snippet'])
+            entries[node.id] = {
+                # Only the kinds of signal that were found, to keep the table small.
+                'signals': {kind: values for kind, values in signals.items() if values},
+                'snippet_hash': fallbacks.snippet_hash(snippet['snippet']),
+                'fallback': fallbacks.fallback_narration(node, snippet, contexts.get(node.id, empty_context), signals),
+            }
+    return entries
+
+
+def _story_is_current(cached: Optional[dict], index: RepoIndex) -> bool:
+    return bool(
+        cached
+        and cached.get('content_signature') == index.content_signature
+        and cached.get('story_version') == _story_version()
+    )
+
+
+def _build_story(
+    index: RepoIndex,
+    cache_root: str,
+    max_file_size: int,
+    max_files: Optional[int],
+    generation: int,
+) -> tuple[list[dict[str, object]], list[ParseWarning]]:
+    planner, warnings = _story_planner(index, cache_root, max_file_size, max_files)
+    arcs = planner.all_arcs()
+    storage.save_story(os.path.join(cache_root, 'story'), index.repo_id, {
+        'content_signature': index.content_signature,
+        'story_version': _story_version(),
+        'generation': generation,
         'generated_at': time.time(),
         'arcs': arcs,
         'warnings': [warning.to_dict() for warning in warnings],
     })
-    return index, arcs, warnings
+    return arcs, warnings
 
 
 def _parse_warning_payload(payload: object) -> list[ParseWarning]:
@@ -240,11 +685,13 @@ def build_symbol_snippet(
     if not node.location or not node.location.path:
         raise ValueError('Symbol has no location')
 
-    source_path = os.path.join(index.root_path, node.location.path)
-    lines = _read_source_lines(source_path)
+    lines = _read_index_lines(index, node.location.path)
     if not lines:
         raise ValueError('Source file is empty or unreadable')
+    return _snippet_from_lines(node, lines, max_lines, section)
+
 
+def _snippet_from_lines(node, lines: list[str], max_lines: int, section: str) -> dict:
     start_line, end_line, highlights = _resolve_snippet_range(
         node,
         lines=lines,
@@ -278,7 +725,100 @@ def build_symbol_snippet(
     }
 
 
-def _compute_signature(commit_sha: Optional[str], scan_result: scan.ScanResult) -> str:
+def _extract_files(
+    rel_paths: list[str],
+    kind: str,
+    iter_parsed: Callable[..., Iterator[object]],
+    extract: Callable[[object], object],
+    root_path: str,
+    tree: Optional[gitobjects.GitTree],
+    extract_cache: Optional[ExtractCache],
+    warnings: list[ParseWarning],
+) -> list:
+    if extract_cache is None:
+        read = tree.read if tree is not None else None
+        return [extract(parsed) for parsed in iter_parsed(root_path, rel_paths, warnings, read=read)]
+    extracts = []
+    for rel_path in rel_paths:
+        file_read: Optional[SourceReader] = tree.read if tree is not None else None
+        object_sha = tree.blob_sha(rel_path) if tree is not None else None
+        if object_sha is None:
+            # Working-copy files are read once: hashed for the key, parsed on a miss.
+            data = _read_file_bytes(root_path, tree, rel_path, warnings)
+            if data is None:
+                continue
+            object_sha = blob_sha(data)
+            file_read = _bytes_reader(data)
+        key = cache_key(kind, object_sha, rel_path)
+        cached = extract_cache.get(key)
+        if cached is not None:
+            file_extract, file_warnings = cached
+        else:
+            file_warnings = []
+            parsed = next(iter_parsed(root_path, [rel_path], file_warnings, read=file_read), None)
+            file_extract = extract(parsed) if parsed is not None else None
+            if not any(warning.code in UNCACHED_WARNINGS for warning in file_warnings):
+                extract_cache.put(key, (file_extract, file_warnings))
+        warnings.extend(file_warnings)
+        if file_extract is not None:
+            extracts.append(file_extract)
+    return extracts
+
+
+def _bytes_reader(data: bytes) -> SourceReader:
+    def read(rel_path: str, warnings: list[ParseWarning]) -> Optional[SourceBuffer]:
+        return source_from_bytes(data, rel_path, warnings)
+    return read
+
+
+def _read_file_bytes(
+    root_path: str,
+    tree: Optional[gitobjects.GitTree],
+    rel_path: str,
+    warnings: list[ParseWarning],
+) -> Optional[bytes]:
+    try:
+        if tree is not None:
+            data = tree.read_bytes(rel_path)
+            if data is not None:
+                return data
+            raise OSError('Object not found in repository')
+        with open(os.path.join(root_path, rel_path), 'rb') as handle:
+            return handle.read()
+    except OSError as exc:
+        warnings.append(ParseWarning(
+            code='read_failed',
+            message=str(exc),
+            path=rel_path,
+        ))
+        return None
+
+
+def _index_tree(index: RepoIndex) -> Optional[gitobjects.GitTree]:
+    if not index.git_dir or not index.commit_sha:
+        return None
+    return gitobjects.git_tree(index.git_dir, index.commit_sha, index.tree_path)
+
+
+def _scan_sources(
+    root_path: str,
+    tree: Optional[gitobjects.GitTree],
+    max_file_size: int,
+    max_files: Optional[int],
+) -> scan.ScanResult:
+    if tree is None:
+        return scan.scan_repo(root_path, max_file_size=max_file_size, max_files=max_files)
+    # No sniffing here: that would read every non-source blob in full. Sources are
+    # sniffed from the bytes read for parsing, and oversize files are skipped on
+    # the size ls-tree reports.
+    return scan.scan_tree(
+        ((entry.path, entry.size) for entry in tree.entries()),
+        max_file_size=max_file_size,
+        max_files=max_files,
+    )
+
+
+def _compute_signature(commit_sha: Optional[str], scan_result: scan.ScanResult, from_objects: bool = False) -> str:
     extensions = sorted(scan_result.extension_counts.items())
     payload = (
         f'{commit_sha or ""}|{scan_result.total_files}|{scan_result.total_bytes}|'
@@ -286,6 +826,8 @@ def _compute_signature(commit_sha: Optional[str], scan_result: scan.ScanResult)
         f'{len(scan_result.ts_files)}|{len(scan_result.tsx_files)}|{len(scan_result.swift_files)}|'
         f'{extensions}'
     )
+    if from_objects:
+        payload = f'{payload}|objects'
     return hashlib.sha1(payload.encode('utf-8', errors='replace')).hexdigest()
 
 
@@ -296,6 +838,19 @@ def _merge_nodes(target: dict, incoming: dict) -> None:
         target[node_id] = node
 
 
+def _read_index_lines(index: RepoIndex, rel_path: str) -> list[str]:
+    tree = _index_tree(index)
+    if tree is None:
+        return _read_source_lines(os.path.join(index.root_path, rel_path))
+    try:
+        data = tree.read_bytes(rel_path)
+    except OSError:
+        return []
+    if data is None:
+        return []
+    return io.StringIO(SourceBuffer(data).text).readlines()
+
+
 def _read_source_lines(path: str) -> list[str]:
     try:
         with open(path, 'r', encoding='utf-8') as handle:
@@ -1,5 +1,5 @@
 import re
-from typing import Dict, List
+from typing import Dict, List, Set
 
 
 ROUTE_DECORATOR_RE = re.compile(
@@ -9,16 +9,27 @@ ROUTE_DECORATOR_RE = re.compile(
 METHODS_RE = re.compile(r'methods\s*=\s*\[([^\]]+)\]')
 TEMPLATE_RE = re.compile(r'render_template\(\s*[\'"]([^\'"]+)')
 URL_FOR_RE = re.compile(r'url_for\(\s*[\'"]([^\'"]+)')
-REQUEST_RE = re.compile(r'\brequest\.(args|form|json|values)\b')
-DB_WRITE_RE = re.compile(r'\bdb\.session\.(add|commit|delete)\b')
 DB_QUERY_RE = re.compile(r'\b\w+\.query\b')
-LOGIN_RE = re.compile(r'\blogin_user\(')
-LOGOUT_RE = re.compile(r'\blogout_user\(')
-CURRENT_USER_RE = re.compile(r'\bcurrent_user\b')
-JSONIFY_RE = re.compile(r'\bjsonify\(')
-REDIRECT_RE = re.compile(r'\bredirect\(')
-ABORT_RE = re.compile(r'\babort\(')
-FLASH_RE = re.compile(r'\bflash\(')
+# One scan for every signal keyword. No alternative can match inside another's
+# match, so it sees each occurrence the separate patterns would; request and db
+# write matches are final, other kinds re-run their capturing pattern only when
+# present. Each branch opens with a literal character outside any group (word
+# boundaries become lookbehinds) so the scan can skip ahead by first character.
+SIGNAL_SCAN_RE = re.compile(
+    r'\.(?:(?P<route>route)\(|(?P<query>query)\b)'
+    r'|r(?:(?P<render_template>ender_template)\('
+    r'|(?<!\wr)equest\.(?P<request>args|form|json|values)\b'
+    r'|(?<!\wr)(?P<redirect>edirect)\()'
+    r'|u(?P<url_for>rl_for)\('
+    r'|d(?<!\wd)b\.session\.(?P<db_write>add|commit|delete)\b'
+    r'|l(?<!\wl)(?:(?P<login_user>ogin_user)|(?P<logout_user>ogout_user))\('
+    r'|c(?<!\wc)(?P<current_user>urrent_user)\b'
+    r'|j(?<!\wj)(?P<jsonify>sonify)\('
+    r'|a(?<!\wa)(?P<abort>bort)\('
+    r'|f(?<!\wf)(?P<flash>lash)\('
+)
+AUTH_SIGNALS = ('login_user', 'logout_user', 'current_user')
+RESPONSE_SIGNALS = ('jsonify', 'redirect', 'abort')
 
 
 def extract_signals(snippet_text: str) -> Dict[str, List[str]]:
@@ -35,43 +46,44 @@ def extract_signals(snippet_text: str) -> Dict[str, List[str]]:
     if not snippet_text:
         return signals
 
-    for match in ROUTE_DECORATOR_RE.finditer(snippet_text):
-        path = match.group('path').strip()
-        rest = match.group('rest') or ''
-        methods = _parse_methods(rest)
-        label = f'{"|".join(methods) if methods else "ANY"} {path}'
-        _append_unique(signals['routes'], label)
-
-    for match in TEMPLATE_RE.finditer(snippet_text):
-        _append_unique(signals['templates'], match.group(1).strip())
+    found: Set[str] = set()
+    for match in SIGNAL_SCAN_RE.finditer(snippet_text):
+        kind = match.lastgroup
+        if kind == 'request':
+            _append_unique(signals['request'], f'request.{match.group(kind)}')
+        elif kind == 'db_write':
+            _append_unique(signals['db'], match.group(kind))
+        else:
+            found.add(kind)
+    if not found:
+        return signals
 
-    for match in URL_FOR_RE.finditer(snippet_text):
-        _append_unique(signals['redirects'], match.group(1).strip())
+    if 'route' in found:
+        for match in ROUTE_DECORATOR_RE.finditer(snippet_text):
+            path = match.group('path').strip()
+            rest = match.group('rest') or ''
+            methods = _parse_methods(rest)
+            label = f'{"|".join(methods) if methods else "ANY"} {path}'
+            _append_unique(signals['routes'], label)
 
-    for match in REQUEST_RE.finditer(snippet_text):
-        _append_unique(signals['request'], f'request.{match.group(1)}')
+    if 'render_template' in found:
+        for match in TEMPLATE_RE.finditer(snippet_text):
+            _append_unique(signals['templates'], match.group(1).strip())
 
-    for match in DB_WRITE_RE.finditer(snippet_text):
-        _append_unique(signals['db'], match.group(1))
+    if 'url_for' in found:
+        for match in URL_FOR_RE.finditer(snippet_text):
+            _append_unique(signals['redirects'], match.group(1).strip())
 
-    if DB_QUERY_RE.search(snippet_text):
+    if 'query' in found and DB_QUERY_RE.search(snippet_text):
         _append_unique(signals['db'], 'query')
 
-    if LOGIN_RE.search(snippet_text):
-        _append_unique(signals['auth'], 'login_user')
-    if LOGOUT_RE.search(snippet_text):
-        _append_unique(signals['auth'], 'logout_user')
-    if CURRENT_USER_RE.search(snippet_text):
-        _append_unique(signals['auth'], 'current_user')
-
-    if JSONIFY_RE.search(snippet_text):
-        _append_unique(signals['responses'], 'jsonify')
-    if REDIRECT_RE.search(snippet_text):
-        _append_unique(signals['responses'], 'redirect')
-    if ABORT_RE.search(snippet_text):
-        _append_unique(signals['responses'], 'abort')
-
-    if FLASH_RE.search(snippet_text):
+    for name in AUTH_SIGNALS:
+        if name in found:
+            _append_unique(signals['auth'], name)
+    for name in RESPONSE_SIGNALS:
+        if name in found:
+            _append_unique(signals['responses'], name)
+    if 'flash' in found:
         _append_unique(signals['flash'], 'flash')
 
     return signals
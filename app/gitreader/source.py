@@ -0,0 +1,106 @@
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .models import ParseWarning
+
+
+BINARY_SNIFF_BYTES = 1024
+
+
+class SourceBuffer:
+    # A source file read once as UTF-8 bytes and shared by every stage after the
+    # scan: parsers consume `data` directly, extractors decode only the spans they
+    # ask for. Newlines are normalised the way text-mode reads did, and files that
+    # are not valid UTF-8 are re-encoded from their lossy decode, so byte offsets
+    # always agree with the text.
+    __slots__ = ('data', 'lossy', '_view', '_text', '_spans')
+
+    def __init__(self, data: bytes) -> None:
+        if b'\r' in data:
+            data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        self.lossy = False
+        self._text: Optional[str] = None
+        if not data.isascii():
+            try:
+                self._text = data.decode('utf-8')
+            except UnicodeDecodeError:
+                self._text = data.decode('utf-8', errors='replace')
+                data = self._text.encode('utf-8')
+                self.lossy = True
+        self.data = data
+        self._view = memoryview(data)
+        self._spans: Dict[Tuple[int, int], str] = {}
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.data.decode('utf-8')
+        return self._text
+
+    def text_at(self, start: int, end: int) -> str:
+        key = (start, end)
+        cached = self._spans.get(key)
+        if cached is None:
+            cached = str(self._view[start:end], 'utf-8', 'replace')
+            self._spans[key] = cached
+        return cached
+
+    def first_line_at(self, start: int, end: int) -> str:
+        newline = self.data.find(b'\n', start, end)
+        if newline == -1:
+            newline = end
+        return str(self._view[start:newline], 'utf-8', 'replace')
+
+    def line_offsets(self) -> List[int]:
+        offsets = [0]
+        data = self.data
+        position = 0
+        while True:
+            newline = data.find(b'\n', position)
+            if newline == -1:
+                break
+            position = newline + 1
+            offsets.append(position)
+        return offsets
+
+
+# Parsers pull file contents through a reader: (rel_path, warnings) -> buffer.
+SourceReader = Callable[[str, List[ParseWarning]], Optional[SourceBuffer]]
+
+
+def directory_reader(root_path: str) -> SourceReader:
+    def read(rel_path: str, warnings: List[ParseWarning]) -> Optional[SourceBuffer]:
+        return read_source(os.path.join(root_path, rel_path), rel_path, warnings)
+    return read
+
+
+def read_source(full_path: str, rel_path: str, warnings: List[ParseWarning]) -> Optional[SourceBuffer]:
+    try:
+        with open(full_path, 'rb') as handle:
+            data = handle.read()
+    except OSError as exc:
+        warnings.append(ParseWarning(
+            code='read_failed',
+            message=str(exc),
+            path=rel_path,
+        ))
+        return None
+    return source_from_bytes(data, rel_path, warnings)
+
+
+def source_from_bytes(data: bytes, rel_path: str, warnings: List[ParseWarning]) -> Optional[SourceBuffer]:
+    if data.find(b'\0', 0, BINARY_SNIFF_BYTES) != -1:
+        warnings.append(ParseWarning(
+            code='binary_file',
+            message='Skipped binary file',
+            path=rel_path,
+        ))
+        return None
+    buffer = SourceBuffer(data)
+    if buffer.lossy:
+        warnings.append(ParseWarning(
+            code='decode_lossy',
+            message='Decoded with replacement characters',
+            path=rel_path,
+        ))
+    return buffer
@@ -1,15 +1,70 @@
 import json
 import os
+import tempfile
+import threading
 import time
-from typing import Optional
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 from .models import RepoIndex
 
 
+LOCKS_DIR = '.locks'
+
+_THREAD_LOCKS: Dict[str, threading.Lock] = {}
+_THREAD_LOCKS_LOCK = threading.Lock()
+
+
 def ensure_cache_dir(cache_root: str) -> None:
     os.makedirs(cache_root, exist_ok=True)
 
 
+@contextmanager
+def build_lock(cache_root: str, name: str) -> Iterator[None]:
+    # Exclusive per artifact across threads (in-process lock) and processes (flock
+    # on a lock file next to the artifacts; where flock is unavailable only threads
+    # are serialised). Callers re-check the cache once they hold it.
+    lock_dir = os.path.join(cache_root, LOCKS_DIR)
+    ensure_cache_dir(lock_dir)
+    lock_path = os.path.join(lock_dir, f'{name}.lock')
+    with _THREAD_LOCKS_LOCK:
+        thread_lock = _THREAD_LOCKS.setdefault(lock_path, threading.Lock())
+    with thread_lock:
+        with open(lock_path, 'a', encoding='utf-8') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def _write_json(path: str, payload: object, compact: bool = False) -> None:
+    # Written to a temp file in the same directory and renamed into place, so a
+    # reader sees either the previous artifact or the complete new one.
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+            if compact:
+                json.dump(payload, handle, separators=(',', ':'), sort_keys=True)
+            else:
+                json.dump(payload, handle, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
 def index_path(cache_root: str, repo_id: str) -> str:
     return os.path.join(cache_root, f'{repo_id}.json')
 
@@ -31,8 +86,7 @@ def load_index(cache_root: str, repo_id: str) -> Optional[RepoIndex]:
 def save_index(cache_root: str, index: RepoIndex) -> str:
     ensure_cache_dir(cache_root)
     path = index_path(cache_root, index.repo_id)
-    with open(path, 'w', encoding='utf-8') as handle:
-        json.dump(index.to_dict(), handle, indent=2, sort_keys=True)
+    _write_json(path, index.to_dict())
     return path
 
 
@@ -64,8 +118,7 @@ def save_narration(cache_root: str, repo_id: str, cache_key: str, response: dict
         'response': response,
         'created_at': time.time(),
     }
-    with open(path, 'w', encoding='utf-8') as handle:
-        json.dump(payload, handle, indent=2, sort_keys=True)
+    _write_json(path, payload)
     return path
 
 
@@ -92,8 +145,7 @@ def load_story(cache_root: str, repo_id: str) -> Optional[dict]:
 def save_story(cache_root: str, repo_id: str, payload: dict) -> str:
     ensure_cache_dir(cache_root)
     path = story_path(cache_root, repo_id)
-    with open(path, 'w', encoding='utf-8') as handle:
-        json.dump(payload, handle, indent=2, sort_keys=True)
+    _write_json(path, payload)
     return path
 
 
@@ -125,6 +177,87 @@ def save_tour(cache_root: str, repo_id: str, cache_key: str, response: dict) ->
         'response': response,
         'created_at': time.time(),
     }
-    with open(path, 'w', encoding='utf-8') as handle:
-        json.dump(payload, handle, indent=2, sort_keys=True)
+    _write_json(path, payload)
+    return path
+
+
+def fallbacks_path(cache_root: str, repo_id: str) -> str:
+    return os.path.join(cache_root, f'{repo_id}.json')
+
+
+def load_fallbacks(cache_root: str, repo_id: str) -> Optional[dict]:
+    path = fallbacks_path(cache_root, repo_id)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as handle:
+            payload = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if not isinstance(payload.get('entries'), dict):
+        return None
+    return payload
+
+
+def save_fallbacks(cache_root: str, repo_id: str, payload: dict) -> str:
+    # Read whole on every cold start and never by hand: written without indentation.
+    ensure_cache_dir(cache_root)
+    path = fallbacks_path(cache_root, repo_id)
+    _write_json(path, payload, compact=True)
+    return path
+
+
+def ranks_path(cache_root: str, repo_id: str) -> str:
+    return os.path.join(cache_root, f'{repo_id}.json')
+
+
+def load_ranks(cache_root: str, repo_id: str) -> Optional[dict]:
+    path = ranks_path(cache_root, repo_id)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as handle:
+            payload = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if not isinstance(payload.get('ranks'), dict):
+        return None
+    return payload
+
+
+def save_ranks(cache_root: str, repo_id: str, payload: dict) -> str:
+    ensure_cache_dir(cache_root)
+    path = ranks_path(cache_root, repo_id)
+    _write_json(path, payload, compact=True)
+    return path
+
+
+def search_path(cache_root: str, repo_id: str) -> str:
+    return os.path.join(cache_root, f'{repo_id}.json')
+
+
+def load_search(cache_root: str, repo_id: str) -> Optional[dict]:
+    path = search_path(cache_root, repo_id)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as handle:
+            payload = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+    if not isinstance(payload.get('search'), dict):
+        return None
+    return payload
+
+
+def save_search(cache_root: str, repo_id: str, payload: dict) -> str:
+    ensure_cache_dir(cache_root)
+    path = search_path(cache_root, repo_id)
+    _write_json(path, payload, compact=True)
     return path
@@ -1,15 +1,12 @@
-import ast
 import hashlib
 import os
-from dataclasses import dataclass
+import threading
 from typing import Dict, List, Optional
 
-from .models import RepoIndex, SymbolNode, symbol_id
-from .parse_python import ParsedFile
+from .graph import RouteInfo
+from .models import RepoIndex, SymbolNode
 
 
-ROUTE_DECORATORS = {'route', 'get', 'post', 'put', 'patch', 'delete'}
-METHOD_DECORATORS = {'get', 'post', 'put', 'patch', 'delete'}
 LOW_SIGNAL_BASENAMES = {'utils.py', 'helpers.py'}
 LOW_SIGNAL_SEGMENTS = {'/tests/', '/test/', '/utils/', '/helpers/'}
 EDGE_CONFIDENCE_WEIGHT = {
@@ -17,49 +14,115 @@ EDGE_CONFIDENCE_WEIGHT = {
     'medium': 0.7,
     'low': 0.4,
 }
+# Centrality terms stand in for raw fan-in when graph ranks are available; each
+# metric is scaled to [0, 1] by its largest value before weighting.
+RANK_WEIGHTS = {
+    'pagerank': 4.0,
+    'betweenness': 3.0,
+    'core': 1.5,
+}
 
 
-@dataclass
-class RouteInfo:
-    handler_id: str
-    handler_name: str
-    module: str
-    file_path: str
-    line: int
-    path: str
-    methods: List[str]
+MAX_BRANCHES = 2
 
 
 def build_story_arcs(
     index: RepoIndex,
-    parsed_files: List[ParsedFile],
+    routes: List[RouteInfo],
     max_depth: int = 3,
     max_scenes: int = 12,
+    ranks: Optional[Dict[str, Dict[str, float]]] = None,
 ) -> List[Dict[str, object]]:
-    routes = _find_flask_routes(parsed_files)
     if not routes:
         return []
-    adjacency, incoming = _build_call_graph(index)
-    scores = _score_nodes(index, adjacency, incoming)
-    arcs: List[Dict[str, object]] = []
-    for route in routes:
-        if route.handler_id not in index.nodes:
-            continue
-        entry_node = index.nodes.get(route.handler_id)
-        entry_path = entry_node.location.path if entry_node and entry_node.location else ''
-        ranked_targets = _rank_targets(index, adjacency, scores, route.handler_id, entry_path)
+    return StoryPlanner(index, routes, max_depth=max_depth, max_scenes=max_scenes, ranks=ranks).all_arcs()
+
+
+class StoryPlanner:
+    # Arcs for one index, built a route at a time. The catalogue only needs the
+    # call graph; a route's main and branch threads are walked the first time one
+    # of its arcs is asked for and kept for the planner's lifetime.
+    def __init__(
+        self,
+        index: RepoIndex,
+        routes: List[RouteInfo],
+        max_depth: int = 3,
+        max_scenes: int = 12,
+        ranks: Optional[Dict[str, Dict[str, float]]] = None,
+    ) -> None:
+        self.index = index
+        self.routes = [route for route in routes if route.handler_id in index.nodes]
+        self.max_depth = max_depth
+        self.max_scenes = max_scenes
+        self.adjacency, incoming = _build_call_graph(index)
+        self.scores = _score_nodes(index, self.adjacency, incoming, ranks)
+        self.lock = threading.Lock()
+        self._route_arcs: Dict[int, List[Dict[str, object]]] = {}
+        self._catalogue: Optional[List[Dict[str, object]]] = None
+        self._route_by_arc_id: Dict[str, int] = {}
+        for position, route in enumerate(self.routes):
+            for thread_label in ['main'] + [f'branch-{number}' for number in range(1, MAX_BRANCHES + 1)]:
+                self._route_by_arc_id.setdefault(_route_arc_id(route, thread_label), position)
+
+    def catalogue(self) -> List[Dict[str, object]]:
+        if self._catalogue is None:
+            entries = [self._catalogue_entry(route) for route in self.routes]
+            entries.sort(key=lambda entry: (
+                str(entry['route']['path']),
+                str(entry['route']['handler_name']),
+            ))
+            self._catalogue = entries
+        return self._catalogue
+
+    def arc(self, arc_id: str) -> Optional[Dict[str, object]]:
+        position = self._route_by_arc_id.get(arc_id)
+        if position is None:
+            return None
+        return next((arc for arc in self.route_arcs(position) if arc['id'] == arc_id), None)
+
+    def related_arcs(self, arc: Dict[str, object]) -> List[Dict[str, object]]:
+        position = self._route_by_arc_id.get(str(arc.get('id')))
+        if position is None:
+            return []
+        return [item for item in self.route_arcs(position) if item['id'] != arc.get('id')]
+
+    def all_arcs(self) -> List[Dict[str, object]]:
+        arcs: List[Dict[str, object]] = []
+        for position in range(len(self.routes)):
+            arcs.extend(self.route_arcs(position))
+        arcs.sort(key=lambda arc: (
+            str(arc.get('route', {}).get('path', '')),
+            str(arc.get('route', {}).get('handler_name', '')),
+            int(arc.get('thread_index', 0)),
+        ))
+        return arcs
+
+    def route_arcs(self, position: int) -> List[Dict[str, object]]:
+        arcs = self._route_arcs.get(position)
+        if arcs is None:
+            with self.lock:
+                arcs = self._route_arcs.get(position)
+                if arcs is None:
+                    arcs = self._build_route_arcs(self.routes[position])
+                    self._route_arcs[position] = arcs
+        return arcs
+
+    def _build_route_arcs(self, route: RouteInfo) -> List[Dict[str, object]]:
+        index = self.index
+        entry_path = _entry_path(index, route)
+        ranked_targets = _rank_targets(index, self.adjacency, self.scores, route.handler_id, entry_path)
         internal_calls, external_calls = _collect_call_targets(index, route.handler_id)
 
         thread_arcs: List[Dict[str, object]] = []
         primary = ranked_targets[0] if ranked_targets else None
         main_scenes = _build_thread_path(
             index,
-            adjacency,
-            scores,
+            self.adjacency,
+            self.scores,
             route.handler_id,
             entry_path,
-            max_depth,
-            max_scenes,
+            self.max_depth,
+            self.max_scenes,
             forced_first=primary,
         )
         main_id = _route_arc_id(route, 'main')
@@ -75,15 +138,15 @@ def build_story_arcs(
         ))
 
         branch_index = 1
-        for candidate in ranked_targets[1:3]:
+        for candidate in ranked_targets[1:MAX_BRANCHES + 1]:
             branch_scenes = _build_thread_path(
                 index,
-                adjacency,
-                scores,
+                self.adjacency,
+                self.scores,
                 route.handler_id,
                 entry_path,
-                max_depth,
-                max_scenes,
+                self.max_depth,
+                self.max_scenes,
                 forced_first=candidate,
             )
             if len(branch_scenes) <= 1:
@@ -104,117 +167,104 @@ def build_story_arcs(
         related_ids = [arc['id'] for arc in thread_arcs]
         for arc in thread_arcs:
             arc['related_ids'] = [item for item in related_ids if item != arc['id']]
-        arcs.extend(thread_arcs)
-    arcs.sort(key=lambda arc: (
-        str(arc.get('route', {}).get('path', '')),
-        str(arc.get('route', {}).get('handler_name', '')),
-        int(arc.get('thread_index', 0)),
-    ))
-    return arcs
-
-
-def _find_flask_routes(parsed_files: List[ParsedFile]) -> List[RouteInfo]:
-    routes: List[RouteInfo] = []
-    for parsed in parsed_files:
-        module = parsed.module
-        for node in parsed.tree.body:
-            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                continue
-            handler_id = symbol_id(f'{module}.{node.name}')
-            for decorator in node.decorator_list:
-                route_spec = _route_from_decorator(decorator)
-                if not route_spec:
-                    continue
-                path, methods = route_spec
-                routes.append(RouteInfo(
-                    handler_id=handler_id,
-                    handler_name=node.name,
-                    module=module,
-                    file_path=parsed.path,
-                    line=getattr(node, 'lineno', 0) or 0,
-                    path=path,
-                    methods=methods,
-                ))
-    return routes
-
-
-def _route_from_decorator(decorator: ast.AST) -> Optional[tuple[str, List[str]]]:
-    if not isinstance(decorator, ast.Call):
-        return None
-    if not isinstance(decorator.func, ast.Attribute):
-        return None
-    attr = decorator.func.attr
-    if attr not in ROUTE_DECORATORS:
-        return None
-    path = _extract_route_path(decorator)
-    methods = _extract_route_methods(decorator, attr)
-    return path, methods
-
-
-def _extract_route_path(call: ast.Call) -> str:
-    if call.args:
-        value = _string_value(call.args[0])
-        if value:
-            return value
-    for keyword in call.keywords:
-        if keyword.arg in {'rule', 'path'}:
-            value = _string_value(keyword.value)
-            if value:
-                return value
-    return ''
-
-
-def _extract_route_methods(call: ast.Call, attr: str) -> List[str]:
-    methods: List[str] = []
-    if attr in METHOD_DECORATORS:
-        methods.append(attr.upper())
-    for keyword in call.keywords:
-        if keyword.arg != 'methods':
-            continue
-        methods.extend(_extract_string_list(keyword.value))
+        return thread_arcs
+
+    def _catalogue_entry(self, route: RouteInfo) -> Dict[str, object]:
+        entry_path = _entry_path(self.index, route)
+        ranked_targets = _rank_targets(self.index, self.adjacency, self.scores, route.handler_id, entry_path)
+        callees = [
+            self.index.nodes[target_id].name
+            for target_id, _confidence, _score in ranked_targets
+            if not _should_skip(self.index.nodes[target_id])
+        ]
+        label = _route_label(route)
+        if callees:
+            summary = _compact_summary(f'{label} calls {", ".join(callees[:3])}{"..." if len(callees) > 3 else ""}.')
+        else:
+            summary = _compact_summary(f'{label} starts here.')
+        arc = _arc_from_route(
+            route,
+            [],
+            [],
+            [],
+            arc_id=_route_arc_id(route, 'main'),
+            thread='main',
+            thread_index=0,
+            parent_id=None,
+        )
+        return {
+            'id': arc['id'],
+            'title': arc['title'],
+            'summary': summary,
+            'entry_id': route.handler_id,
+            'thread': 'main',
+            'thread_index': 0,
+            'route': arc['route'],
+            'estimated_depth': self._estimate_depth(route.handler_id),
+            'branch_candidates': max(0, min(MAX_BRANCHES, len(ranked_targets) - 1)),
+        }
+
+    def _estimate_depth(self, entry_id: str) -> int:
+        # Call levels below the handler that a thread could reach; threads follow
+        # one callee per level, so this bounds the scene count without walking.
+        frontier = {entry_id}
+        seen = {entry_id}
+        depth = 0
+        while frontier and depth < self.max_depth:
+            next_frontier = set()
+            for node_id in frontier:
+                for target_id, _confidence in self.adjacency.get(node_id, []):
+                    if target_id in seen or _should_skip(self.index.nodes[target_id]):
+                        continue
+                    seen.add(target_id)
+                    next_frontier.add(target_id)
+            if not next_frontier:
+                break
+            depth += 1
+            frontier = next_frontier
+        return depth
+
+
+def rank_symbols(
+    index: RepoIndex,
+    arcs: List[Dict[str, object]],
+    ranks: Optional[Dict[str, Dict[str, float]]] = None,
+) -> List[str]:
+    # Reading order for work done ahead of requests: scenes of the story arcs
+    # (main threads before branches), then every other symbol by the call-graph
+    # score arcs are built from.
+    ranked: List[str] = []
     seen = set()
-    ordered: List[str] = []
-    for method in methods:
-        method = method.upper()
-        if method and method not in seen:
-            seen.add(method)
-            ordered.append(method)
-    return ordered
-
-
-def _extract_string_list(node: ast.AST) -> List[str]:
-    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
-        values: List[str] = []
-        for item in node.elts:
-            value = _string_value(item)
-            if value:
-                values.append(value)
-        return values
-    value = _string_value(node)
-    return [value] if value else []
-
-
-def _string_value(node: ast.AST) -> Optional[str]:
-    if isinstance(node, ast.Constant) and isinstance(node.value, str):
-        return node.value
-    if isinstance(node, ast.Str):
-        return node.s
-    return None
+    ordered_arcs = sorted(arcs, key=lambda arc: int(arc.get('thread_index', 0)))
+    for arc in ordered_arcs:
+        scenes = arc.get('scenes') if isinstance(arc.get('scenes'), list) else []
+        for scene in scenes:
+            node_id = scene.get('id')
+            if node_id in index.nodes and node_id not in seen:
+                seen.add(node_id)
+                ranked.append(node_id)
+    adjacency, incoming = _build_call_graph(index)
+    scores = _score_nodes(index, adjacency, incoming, ranks)
+    for node_id in sorted(scores, key=lambda item: (-scores[item], item)):
+        if node_id not in seen:
+            seen.add(node_id)
+            ranked.append(node_id)
+    return ranked
 
 
 def _build_call_graph(index: RepoIndex) -> tuple[Dict[str, List[tuple[str, str]]], Dict[str, List[tuple[str, str]]]]:
     adjacency: Dict[str, List[tuple[str, str]]] = {}
     incoming: Dict[str, List[tuple[str, str]]] = {}
-    for edge in index.edges:
-        if edge.kind != 'calls':
+    for source_id, target_id, kind, confidence in index.edges.rows():
+        if kind != 'calls':
             continue
-        if edge.source not in index.nodes or edge.target not in index.nodes:
+        if source_id not in index.nodes or target_id not in index.nodes:
             continue
-        target = index.nodes[edge.target]
+        target = index.nodes[target_id]
         if target.kind == 'external':
             continue
-        adjacency.setdefault(edge.source, []).append((edge.target, edge.confidence))
-        incoming.setdefault(edge.target, []).append((edge.source, edge.confidence))
+        adjacency.setdefault(source_id, []).append((target_id, confidence))
+        incoming.setdefault(target_id, []).append((source_id, confidence))
     for source in adjacency:
         adjacency[source] = sorted(
             adjacency[source],
@@ -227,15 +277,24 @@ def _score_nodes(
     index: RepoIndex,
     adjacency: Dict[str, List[tuple[str, str]]],
     incoming: Dict[str, List[tuple[str, str]]],
+    ranks: Optional[Dict[str, Dict[str, float]]] = None,
 ) -> Dict[str, float]:
     scores: Dict[str, float] = {}
+    peaks = {metric: max(ranks.get(metric, {}).values(), default=0.0) for metric in RANK_WEIGHTS} if ranks else {}
     for node_id, node in index.nodes.items():
         if node.kind == 'external':
             continue
         fan_out = len(adjacency.get(node_id, []))
-        fan_in = len(incoming.get(node_id, []))
         doc_bonus = 1.5 if node.summary else 0.0
-        score = fan_out * 2.0 + fan_in * 1.0 + doc_bonus
+        if ranks:
+            centrality = sum(
+                weight * ranks[metric].get(node_id, 0.0) / peaks[metric]
+                for metric, weight in RANK_WEIGHTS.items()
+                if peaks[metric] > 0
+            )
+        else:
+            centrality = len(incoming.get(node_id, [])) * 1.0
+        score = fan_out * 2.0 + centrality + doc_bonus
         if node.kind == 'class':
             score += 0.5
         if _should_skip(node):
@@ -267,6 +326,11 @@ def _rank_targets(
     return ranked
 
 
+def _entry_path(index: RepoIndex, route: RouteInfo) -> str:
+    entry_node = index.nodes.get(route.handler_id)
+    return entry_node.location.path if entry_node and entry_node.location else ''
+
+
 def _node_sort_key(node: Optional[SymbolNode]) -> tuple[str, str]:
     if not node:
         return ('', '')
@@ -400,8 +464,8 @@ def _collect_call_targets(index: RepoIndex, entry_id: str, limit: int = 6) -> tu
     external: List[str] = []
     seen_internal = set()
     seen_external = set()
-    for edge in index.edges:
-        if edge.kind != 'calls' or edge.source != entry_id:
+    for edge in index.edges.outgoing(entry_id):
+        if edge.kind != 'calls':
             continue
         target = index.nodes.get(edge.target)
         if not target:
@@ -2,13 +2,14 @@ import hashlib
 import json
 import logging
 import os
-import urllib.request
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
 
-from . import storage
+from . import llm, storage
 from .models import RepoIndex, RepoSpec, SymbolNode
 from .service import build_symbol_snippet, get_story_arcs
 from .signals import extract_signals, format_signals, signal_summary
+from .tour_sessions import session_store
 
 
 LOGGER = logging.getLogger(__name__)
@@ -30,7 +31,69 @@ def start_tour(
     normalized_mode = _normalize_mode(mode)
     state = _init_state(index, arc, normalized_mode)
     step = _build_tour_step(index, arc, normalized_mode, state, cache_root, [])
-    return state, step, [warning.to_dict() for warning in warnings]
+    _prefetch_next_step(index, arc, normalized_mode, cache_root, state)
+    session = session_store(cache_root).create(spec, cache_root, state)
+    session.attach(index, arcs)
+    return {**state, 'session_id': session.token}, step, [warning.to_dict() for warning in warnings]
+
+
+def step_tour_session(
+    session_id: str,
+    cache_root: str,
+    action: str,
+    target_node_id: Optional[str] = None,
+    target_arc_id: Optional[str] = None,
+) -> Optional[Tuple[Dict[str, object], Dict[str, object], List[dict]]]:
+    # Returns None when the session is unknown or expired; the caller decides
+    # whether to fall back to client-held state.
+    store = session_store(cache_root)
+    session = store.get(session_id)
+    if session is None:
+        return None
+    with session.lock:
+        warnings: List[dict] = []
+        if not session.loaded:
+            # Picked up from the session database: reload the (memoised) story once.
+            index, arcs, parse_warnings = get_story_arcs(session.spec, cache_root=session.cache_root)
+            session.attach(index, arcs)
+            warnings = [warning.to_dict() for warning in parse_warnings]
+        arc_id = str(session.state.get('arc_id') or '')
+        if action == 'branch' and target_arc_id:
+            arc_id = target_arc_id
+        arc = session.arc(arc_id)
+        if not arc:
+            raise ValueError('Story arc not found.')
+        state, step = _advance_tour(
+            session.index,
+            arc,
+            session.state,
+            session.cache_root,
+            action,
+            target_node_id,
+            lambda node_id: session.scene_position(arc, node_id),
+        )
+        session.state = state
+        store.save(session)
+    return {**state, 'session_id': session.token}, step, warnings
+
+
+def resume_tour_session(
+    spec: RepoSpec,
+    cache_root: str,
+    state: Dict[str, object],
+    action: str,
+    target_node_id: Optional[str] = None,
+    target_arc_id: Optional[str] = None,
+) -> Tuple[Dict[str, object], Dict[str, object], List[dict]]:
+    # For a session this worker has never seen, or one that was evicted or
+    # expired: steps from the state the client sent back and opens a new session
+    # for it, so the tour carries on instead of failing.
+    state = {key: value for key, value in state.items() if key != 'session_id'}
+    index, arcs, warnings = get_story_arcs(spec, cache_root=cache_root)
+    state, step = _step_from_state(index, arcs, cache_root, state, action, target_node_id, target_arc_id)
+    session = session_store(cache_root).create(spec, cache_root, state)
+    session.attach(index, arcs)
+    return {**state, 'session_id': session.token}, step, [warning.to_dict() for warning in warnings]
 
 
 def step_tour(
@@ -42,22 +105,55 @@ def step_tour(
     target_arc_id: Optional[str] = None,
 ) -> Tuple[Dict[str, object], Dict[str, object], List[dict]]:
     index, arcs, warnings = get_story_arcs(spec, cache_root=cache_root)
-    normalized_mode = _normalize_mode(str(state.get('mode') or 'story'))
+    state, step = _step_from_state(index, arcs, cache_root, state, action, target_node_id, target_arc_id)
+    return state, step, [warning.to_dict() for warning in warnings]
 
+
+def _step_from_state(
+    index: RepoIndex,
+    arcs: List[dict],
+    cache_root: str,
+    state: Dict[str, object],
+    action: str,
+    target_node_id: Optional[str],
+    target_arc_id: Optional[str],
+) -> Tuple[Dict[str, object], Dict[str, object]]:
     arc_id = str(state.get('arc_id') or '')
     if action == 'branch' and target_arc_id:
         arc_id = target_arc_id
     arc = _select_arc(arcs, arc_id)
     if not arc:
         raise ValueError('Story arc not found.')
+    return _advance_tour(
+        index,
+        arc,
+        state,
+        cache_root,
+        action,
+        target_node_id,
+        lambda node_id: _find_scene_index(arc, node_id),
+    )
 
+
+def _advance_tour(
+    index: RepoIndex,
+    arc: dict,
+    state: Dict[str, object],
+    cache_root: str,
+    action: str,
+    target_node_id: Optional[str],
+    find_scene: Callable[[str], Optional[int]],
+) -> Tuple[Dict[str, object], Dict[str, object]]:
+    normalized_mode = _normalize_mode(str(state.get('mode') or 'story'))
     step_index = int(state.get('step_index') or 0)
     if action == 'next':
         step_index += 1
     elif action == 'prev':
         step_index -= 1
     elif action == 'jump' and target_node_id:
-        step_index = _find_scene_index(arc, target_node_id, fallback=step_index)
+        position = find_scene(target_node_id)
+        if position is not None:
+            step_index = position
     elif action == 'branch':
         step_index = 0
 
@@ -68,7 +164,12 @@ def step_tour(
     context_window = state.get('context_window') if isinstance(state.get('context_window'), list) else []
     step = _build_tour_step(index, arc, normalized_mode, state, cache_root, context_window, step_index=step_index)
     state = _update_state(state, arc, step_index, step, normalized_mode, action)
-    return state, step, [warning.to_dict() for warning in warnings]
+    _prefetch_next_step(index, arc, normalized_mode, cache_root, state)
+    return state, step
+
+
+def _api_key() -> Optional[str]:
+    return os.getenv('GITREADER_LLM_API_KEY') or os.getenv('OPENAI_API_KEY')
 
 
 def _normalize_mode(mode: str) -> str:
@@ -89,12 +190,12 @@ def _select_arc(arcs: List[dict], arc_id: Optional[str]) -> Optional[dict]:
     return arcs[0] if arcs else None
 
 
-def _find_scene_index(arc: dict, node_id: str, fallback: int) -> int:
+def _find_scene_index(arc: dict, node_id: str) -> Optional[int]:
     scenes = arc.get('scenes') if isinstance(arc.get('scenes'), list) else []
     for idx, scene in enumerate(scenes):
         if scene.get('id') == node_id:
             return idx
-    return fallback
+    return None
 
 
 def _init_state(index: RepoIndex, arc: dict, mode: str) -> Dict[str, object]:
@@ -148,11 +249,27 @@ def _extend_context_window(previous: object, step: Dict[str, object]) -> List[di
                 context_window.append(item)
     summary = step.get('hook') or step.get('title') or ''
     node_id = step.get('node_id') or ''
+    if context_window and context_window[-1].get('node_id') == node_id:
+        # Re-fetching the same step (e.g. once its pending narration is ready) replaces it.
+        context_window.pop()
     if summary and node_id:
         context_window.append({'node_id': node_id, 'summary': str(summary)[:160]})
     return context_window[-MAX_CONTEXT_WINDOW:]
 
 
+def warm_tour_step(
+    index: RepoIndex,
+    arc: dict,
+    step_index: int,
+    mode: str,
+    cache_root: str,
+    priority: str = llm.BULK,
+) -> Optional[Future]:
+    # Queues generation of a step ahead of any tour; None if already cached.
+    cached, _, job = _tour_step_job(index, arc, _normalize_mode(mode), cache_root, [], step_index, priority)
+    return None if cached else job
+
+
 def _build_tour_step(
     index: RepoIndex,
     arc: dict,
@@ -162,9 +279,42 @@ def _build_tour_step(
     context_window: List[dict],
     step_index: Optional[int] = None,
 ) -> Dict[str, object]:
-    scenes = arc.get('scenes') if isinstance(arc.get('scenes'), list) else []
     if step_index is None:
         step_index = int(state.get('step_index') or 0)
+    cached, fallback, job = _tour_step_job(index, arc, mode, cache_root, context_window, step_index, llm.INTERACTIVE)
+    if cached:
+        cached['cached'] = True
+        return cached
+    step = llm.wait(job, llm.request_deadline())
+    if step is None:
+        # Past the deadline: serve the deterministic step; the job caches the real one.
+        return {**fallback, 'cached': False, 'pending': True}
+    return dict(step)
+
+
+def _prefetch_next_step(index: RepoIndex, arc: dict, mode: str, cache_root: str, state: Dict[str, object]) -> None:
+    # Queues the step the reader most likely asks for next, with the context it
+    # will be asked with. Prefetch jobs expire, so leaving the tour drops it.
+    if not _api_key():
+        return
+    scenes = arc.get('scenes') if isinstance(arc.get('scenes'), list) else []
+    next_index = int(state.get('step_index') or 0) + 1
+    if next_index >= len(scenes):
+        return
+    context_window = list(state.get('context_window') or [])
+    _tour_step_job(index, arc, mode, cache_root, context_window, next_index, llm.PREFETCH)
+
+
+def _tour_step_job(
+    index: RepoIndex,
+    arc: dict,
+    mode: str,
+    cache_root: str,
+    context_window: List[dict],
+    step_index: int,
+    priority: str,
+) -> Tuple[Optional[Dict[str, object]], Dict[str, object], Optional[Future]]:
+    scenes = arc.get('scenes') if isinstance(arc.get('scenes'), list) else []
     step_index = max(0, min(step_index, max(len(scenes) - 1, 0)))
     scene = scenes[step_index] if scenes else {}
     node_id = scene.get('id') or arc.get('entry_id') or ''
@@ -174,16 +324,28 @@ def _build_tour_step(
     tour_cache_root = os.path.join(cache_root, 'tour')
     cached = storage.load_tour(tour_cache_root, index.repo_id, cache_key)
     if cached:
-        cached['cached'] = True
-        return cached
-
-    step = _generate_tour_step(index, arc, node, scene, step_index, mode, context_window)
-    step['cached'] = False
-    storage.save_tour(tour_cache_root, index.repo_id, cache_key, step)
-    return step
+        return cached, {}, None
+
+    fallback, payload = _prepare_tour_step(index, arc, node, scene, step_index, mode, context_window)
+
+    def generate() -> Dict[str, object]:
+        step = {**_generate_tour_step(fallback, payload), 'cached': False}
+        # As for narrations: a fallback after a failed call is not cached.
+        if step.get('source') != 'fallback' or not _api_key():
+            storage.save_tour(tour_cache_root, index.repo_id, cache_key, step)
+        return step
+
+    job = llm.submit(
+        ('tour', tour_cache_root, index.repo_id, cache_key),
+        generate,
+        priority=priority,
+        group=index.repo_id,
+        ttl=llm.job_ttl(priority),
+    )
+    return None, fallback, job
 
 
-def _generate_tour_step(
+def _prepare_tour_step(
     index: RepoIndex,
     arc: dict,
     node: Optional[SymbolNode],
@@ -191,7 +353,7 @@ def _generate_tour_step(
     step_index: int,
     mode: str,
     context_window: List[dict],
-) -> Dict[str, object]:
+) -> Tuple[Dict[str, object], Dict[str, object]]:
     arc_context = _build_arc_context(arc)
     snippet = _snippet_for_node(index, node) if node else {}
     snippet_text = str(snippet.get('snippet') or '')
@@ -207,7 +369,11 @@ def _generate_tour_step(
     }
 
     fallback = _fallback_tour_step(arc, node, scene, step_index, signals, snippet, context_window)
-    api_key = os.getenv('GITREADER_LLM_API_KEY') or os.getenv('OPENAI_API_KEY')
+    return fallback, payload
+
+
+def _generate_tour_step(fallback: Dict[str, object], payload: Dict[str, object]) -> Dict[str, object]:
+    api_key = _api_key()
     model = os.getenv('GITREADER_LLM_MODEL', 'gpt-4o-mini')
     base_url = os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1').rstrip('/')
     if not api_key:
@@ -312,18 +478,19 @@ def _format_snippet(snippet: dict) -> str:
 def _graph_context(index: RepoIndex, node_id: str, limit: int = 6) -> Dict[str, List[str]]:
     incoming: List[str] = []
     outgoing: List[str] = []
-    for edge in index.edges:
+    for edge in index.edges.outgoing(node_id):
+        target = index.nodes.get(edge.target)
+        name = target.name if target else edge.target
+        kind = target.kind if target else 'unknown'
+        outgoing.append(f'{edge.kind} -> {name} ({kind})')
+    for edge in index.edges.incoming(node_id):
         if edge.source == node_id:
-            target = index.nodes.get(edge.target)
-            name = target.name if target else edge.target
-            kind = target.kind if target else 'unknown'
-            outgoing.append(f'{edge.kind} -> {name} ({kind})')
-        elif edge.target == node_id:
-            source = index.nodes.get(edge.source)
-            name = source.name if source else edge.source
-            kind = source.kind if source else 'unknown'
-            incoming.append(f'{edge.kind} <- {name} ({kind})')
-        if len(incoming) >= limit and len(outgoing) >= limit:
+            continue
+        source = index.nodes.get(edge.source)
+        name = source.name if source else edge.source
+        kind = source.kind if source else 'unknown'
+        incoming.append(f'{edge.kind} <- {name} ({kind})')
+        if len(incoming) >= limit:
             break
     return {
         'incoming': incoming[:limit],
@@ -607,28 +774,7 @@ def _call_openai(
         'temperature': _env_float('GITREADER_LLM_TEMPERATURE', 0.4),
         'max_tokens': _env_int('GITREADER_LLM_MAX_TOKENS', 700),
     }
-    body = json.dumps(payload).encode('utf-8')
-    request = urllib.request.Request(
-        f'{base_url}/chat/completions',
-        data=body,
-        headers={
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {api_key}',
-        },
-        method='POST',
-    )
-    timeout = _env_int('GITREADER_LLM_TIMEOUT', 30)
-    with urllib.request.urlopen(request, timeout=timeout) as response:
-        raw = response.read().decode('utf-8', errors='replace')
-    payload = json.loads(raw)
-    choices = payload.get('choices') if isinstance(payload, dict) else None
-    if not choices:
-        raise ValueError('No choices in LLM response')
-    message = choices[0].get('message') if isinstance(choices[0], dict) else None
-    content = message.get('content') if isinstance(message, dict) else None
-    if not content:
-        raise ValueError('Empty LLM response')
-    return str(content)
+    return llm.chat_completion(api_key, base_url, payload)
 
 
 def _parse_step(content: str) -> Dict[str, object]:
@@ -0,0 +1,202 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from .models import RepoIndex, RepoSpec
+
+
+SESSIONS_FILE = 'tour_sessions.sqlite3'
+STORE_ENV = 'GITREADER_TOUR_SESSION_STORE'
+MAX_SESSIONS_ENV = 'GITREADER_TOUR_SESSIONS'
+TTL_ENV = 'GITREADER_TOUR_SESSION_TTL'
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+@dataclass
+class TourSession:
+    # Everything a step needs: the tour state plus the index and arcs it was started
+    # against, so advancing never re-resolves the repository or rescans the arcs.
+    token: str
+    spec: RepoSpec
+    cache_root: str
+    state: Dict[str, object]
+    index: Optional[RepoIndex] = None
+    arcs: Dict[str, dict] = field(default_factory=dict)
+    default_arc_id: Optional[str] = None
+    version: int = 0
+    updated_at: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    _scene_positions: Dict[str, Dict[str, int]] = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def loaded(self) -> bool:
+        return self.index is not None
+
+    def attach(self, index: RepoIndex, arcs: List[dict]) -> None:
+        self.index = index
+        self.arcs = {}
+        for arc in arcs:
+            arc_id = arc.get('id')
+            if arc_id and arc_id not in self.arcs:
+                self.arcs[arc_id] = arc
+        main_arc = next((arc for arc in arcs if arc.get('thread') == 'main'), None)
+        default_arc = main_arc or (arcs[0] if arcs else None)
+        self.default_arc_id = default_arc.get('id') if default_arc else None
+        self._scene_positions = {}
+
+    def arc(self, arc_id: Optional[str]) -> Optional[dict]:
+        if arc_id and arc_id in self.arcs:
+            return self.arcs[arc_id]
+        return self.arcs.get(self.default_arc_id) if self.default_arc_id else None
+
+    def scene_position(self, arc: dict, node_id: str) -> Optional[int]:
+        arc_id = str(arc.get('id') or '')
+        positions = self._scene_positions.get(arc_id)
+        if positions is None:
+            positions = {}
+            scenes = arc.get('scenes') if isinstance(arc.get('scenes'), list) else []
+            for idx, scene in enumerate(scenes):
+                scene_id = scene.get('id')
+                if scene_id and scene_id not in positions:
+                    positions[scene_id] = idx
+            self._scene_positions[arc_id] = positions
+        return positions.get(node_id)
+
+
+class TourSessionStore:
+    # Sessions live in a per-process LRU. With a database path they are also written
+    # through to SQLite, so any worker can pick up a tour another one started and a
+    # restart does not end it; only the state is stored, the index is reloaded.
+    def __init__(self, max_entries: int, ttl_seconds: int, db_path: Optional[str] = None) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[str, TourSession] = OrderedDict()
+        self.lock = threading.Lock()
+        self.connection: Optional[sqlite3.Connection] = None
+        if db_path:
+            self.connection = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS tour_sessions ('
+                'token TEXT PRIMARY KEY, payload TEXT NOT NULL, version INTEGER NOT NULL, '
+                'updated_at REAL NOT NULL)'
+            )
+
+    def create(self, spec: RepoSpec, cache_root: str, state: Dict[str, object]) -> TourSession:
+        session = TourSession(
+            token=secrets.token_urlsafe(16),
+            spec=spec,
+            cache_root=cache_root,
+            state=state,
+        )
+        self._purge_expired()
+        self.save(session)
+        return session
+
+    def get(self, token: str) -> Optional[TourSession]:
+        if not token:
+            return None
+        now = time.time()
+        with self.lock:
+            session = self.entries.get(token)
+            if session is not None:
+                self.entries.move_to_end(token)
+            if self.connection is None:
+                if session is None or now - session.updated_at > self.ttl_seconds:
+                    self.entries.pop(token, None)
+                    return None
+                return session
+            row = self.connection.execute(
+                'SELECT payload, version, updated_at FROM tour_sessions WHERE token = ?', (token,)
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl_seconds:
+                self.entries.pop(token, None)
+                return None
+            if session is not None and session.version == row[1]:
+                return session
+            payload = json.loads(row[0])
+            if session is None:
+                session = TourSession(
+                    token=token,
+                    spec=RepoSpec(**payload['spec']),
+                    cache_root=payload['cache_root'],
+                    state=payload['state'],
+                )
+                self._remember(session)
+            else:
+                # Another worker advanced this tour since we last served it.
+                session.state = payload['state']
+            session.version = row[1]
+            session.updated_at = row[2]
+            return session
+
+    def save(self, session: TourSession) -> None:
+        session.version += 1
+        session.updated_at = time.time()
+        with self.lock:
+            self._remember(session)
+            if self.connection is None:
+                return
+            payload = json.dumps({
+                'spec': asdict(session.spec),
+                'cache_root': session.cache_root,
+                'state': session.state,
+            })
+            with self.connection:
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO tour_sessions (token, payload, version, updated_at) VALUES (?, ?, ?, ?)',
+                    (session.token, payload, session.version, session.updated_at),
+                )
+
+    def _remember(self, session: TourSession) -> None:
+        self.entries[session.token] = session
+        self.entries.move_to_end(session.token)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        with self.lock:
+            for token in [token for token, session in self.entries.items() if session.updated_at < cutoff]:
+                del self.entries[token]
+            if self.connection is not None:
+                with self.connection:
+                    self.connection.execute('DELETE FROM tour_sessions WHERE updated_at < ?', (cutoff,))
+
+
+_STORES: Dict[str, TourSessionStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def session_store(cache_root: str) -> TourSessionStore:
+    # Created on first use rather than at import so forked workers open their own
+    # SQLite connection. GITREADER_TOUR_SESSION_STORE=sqlite enables persistence.
+    with _STORES_LOCK:
+        store = _STORES.get(cache_root)
+        if store is None:
+            db_path = None
+            if os.getenv(STORE_ENV, 'memory').lower() == 'sqlite':
+                os.makedirs(cache_root, exist_ok=True)
+                db_path = os.path.join(cache_root, SESSIONS_FILE)
+            store = TourSessionStore(
+                max_entries=_env_int(MAX_SESSIONS_ENV, 512),
+                ttl_seconds=_env_int(TTL_ENV, 6 * 60 * 60),
+                db_path=db_path,
+            )
+            _STORES[cache_root] = store
+        return store
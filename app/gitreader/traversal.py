@@ -0,0 +1,257 @@
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+from .models import EdgeAdjacency, GraphEdge, RepoIndex, SymbolNode
+
+
+CONFIDENCE_RANK = {
+    'low': 0,
+    'medium': 1,
+    'high': 2,
+}
+DIRECTIONS = ('out', 'in', 'both')
+REVERSED_DIRECTION = {'out': 'in', 'in': 'out', 'both': 'both'}
+FRONTIER_MEMO_ENTRIES = 256
+# Total nodes held across all memoised frontiers; one deep walk over a large graph
+# can reach most of it, so the entry count alone does not bound the memo.
+FRONTIER_MEMO_NODES = 200_000
+
+
+@dataclass
+class EdgeFilter:
+    direction: str = 'both'
+    kinds: Optional[FrozenSet[str]] = None
+    min_confidence: str = 'low'
+
+    def __post_init__(self) -> None:
+        if self.direction not in DIRECTIONS:
+            raise ValueError(f'Unsupported direction: {self.direction}')
+        if self.min_confidence not in CONFIDENCE_RANK:
+            raise ValueError(f'Unsupported confidence: {self.min_confidence}')
+
+    def key(self) -> Tuple[str, Optional[FrozenSet[str]], str]:
+        return (self.direction, self.kinds, self.min_confidence)
+
+    def allows(self, edge: GraphEdge) -> bool:
+        if self.kinds is not None and edge.kind not in self.kinds:
+            return False
+        return CONFIDENCE_RANK.get(edge.confidence, 0) >= CONFIDENCE_RANK[self.min_confidence]
+
+
+@dataclass
+class Subgraph:
+    nodes: List[SymbolNode]
+    edges: List[GraphEdge]
+    depths: Dict[str, int]
+    truncated: bool = False
+
+
+@dataclass
+class _Frontiers:
+    # BFS levels from one node under one filter; levels[d] holds the nodes first
+    # reached after d hops, in discovery order. Extended only as far as asked.
+    levels: List[List[str]]
+    depths: Dict[str, int]
+    exhausted: bool = False
+    # Nodes charged against the memo's budget when the levels were last extended.
+    charged: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class GraphTraversal:
+    # Adjacency over an index's edge arrays, plus the BFS frontiers of recent
+    # queries. A deeper neighbourhood or path query from the same node and filter
+    # continues from the levels already walked.
+    def __init__(
+        self,
+        index: RepoIndex,
+        memo_entries: int = FRONTIER_MEMO_ENTRIES,
+        memo_nodes: int = FRONTIER_MEMO_NODES,
+    ) -> None:
+        self.index = index
+        edges = index.edges
+        known = [node_id in index.nodes for node_id in edges.ids]
+        linked = [
+            position for position, (source, target) in enumerate(zip(edges.sources, edges.targets))
+            if known[source] and known[target]
+        ]
+        self.outgoing = EdgeAdjacency(edges.sources, linked, len(edges.ids))
+        self.incoming = EdgeAdjacency(edges.targets, linked, len(edges.ids))
+        self.memo_entries = memo_entries
+        self.memo_nodes = memo_nodes
+        self.lock = threading.Lock()
+        self._frontiers: OrderedDict[tuple, _Frontiers] = OrderedDict()
+        self._memo_size = 0
+
+    def neighbourhood(self, node_id: str, hops: int, edge_filter: EdgeFilter, max_nodes: int) -> Subgraph:
+        if node_id not in self.index.nodes:
+            raise ValueError('Symbol not found')
+        # One node past the cap is enough to tell whether the answer was truncated.
+        frontiers = self._frontiers_to(node_id, edge_filter, hops, limit=max_nodes + 1)
+        depths: Dict[str, int] = {}
+        truncated = False
+        for depth, level in enumerate(frontiers.levels[:hops + 1]):
+            if len(depths) + len(level) > max_nodes:
+                # Nearer levels win: fill up from this one in discovery order.
+                for level_node_id in level[:max_nodes - len(depths)]:
+                    depths[level_node_id] = depth
+                truncated = True
+                break
+            for level_node_id in level:
+                depths[level_node_id] = depth
+        nodes = [self.index.nodes[included_id] for included_id in depths]
+        return Subgraph(nodes=nodes, edges=self._edges_between(depths, edge_filter), depths=depths, truncated=truncated)
+
+    def shortest_paths(
+        self,
+        source_id: str,
+        target_id: str,
+        max_depth: int,
+        edge_filter: EdgeFilter,
+        max_paths: int,
+    ) -> List[List[str]]:
+        # Every path of the shortest length found within max_depth hops, up to
+        # max_paths of them, each as a list of node ids from source to target.
+        for node_id in (source_id, target_id):
+            if node_id not in self.index.nodes:
+                raise ValueError(f'Symbol not found: {node_id}')
+        frontiers = self._frontiers_to(source_id, edge_filter, max_depth, stop_at=target_id)
+        length = frontiers.depths.get(target_id)
+        if length is None or length > max_depth:
+            return []
+        backwards = EdgeFilter(REVERSED_DIRECTION[edge_filter.direction], edge_filter.kinds, edge_filter.min_confidence)
+        paths: List[List[str]] = []
+
+        def walk(node_id: str, suffix: List[str]) -> None:
+            if len(paths) >= max_paths:
+                return
+            depth = frontiers.depths[node_id]
+            if depth == 0:
+                paths.append([node_id] + suffix)
+                return
+            seen: Set[str] = set()
+            for previous_id, _edge in self._neighbours(node_id, backwards):
+                if previous_id in seen or frontiers.depths.get(previous_id) != depth - 1:
+                    continue
+                seen.add(previous_id)
+                walk(previous_id, [node_id] + suffix)
+
+        walk(target_id, [])
+        return paths
+
+    def path_subgraph(self, paths: List[List[str]], edge_filter: EdgeFilter) -> Subgraph:
+        depths: Dict[str, int] = {}
+        steps: Set[Tuple[str, str]] = set()
+        for path in paths:
+            for depth, node_id in enumerate(path):
+                depths.setdefault(node_id, depth)
+            # A step from a to b follows an edge a -> b, b -> a, or either.
+            if edge_filter.direction in ('out', 'both'):
+                steps.update(zip(path, path[1:]))
+            if edge_filter.direction in ('in', 'both'):
+                steps.update(zip(path[1:], path))
+        edges = [edge for edge in self._edges_between(depths, edge_filter) if (edge.source, edge.target) in steps]
+        nodes = [self.index.nodes[node_id] for node_id in depths]
+        return Subgraph(nodes=nodes, edges=edges, depths=depths)
+
+    def _frontiers_to(
+        self,
+        node_id: str,
+        edge_filter: EdgeFilter,
+        depth: int,
+        stop_at: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> _Frontiers:
+        # With a limit the walk stops once that many nodes are reached, mid-level if
+        # need be; levels are filled in discovery order either way, so the nodes kept
+        # are those an unbounded walk would list first. Capped walks are memoised
+        # under their limit.
+        key = (node_id,) + edge_filter.key() + (limit,)
+        with self.lock:
+            frontiers = self._frontiers.get(key)
+            if frontiers is None:
+                frontiers = _Frontiers(levels=[[node_id]], depths={node_id: 0})
+                self._frontiers[key] = frontiers
+                while len(self._frontiers) > self.memo_entries:
+                    self._evict_oldest()
+            else:
+                self._frontiers.move_to_end(key)
+        with frontiers.lock:
+            while len(frontiers.levels) <= depth and not frontiers.exhausted:
+                if stop_at is not None and stop_at in frontiers.depths:
+                    break
+                next_level: List[str] = []
+                next_depth = len(frontiers.levels)
+                full = False
+                for level_node_id in frontiers.levels[-1]:
+                    for neighbour_id, _edge in self._neighbours(level_node_id, edge_filter):
+                        if neighbour_id in frontiers.depths:
+                            continue
+                        frontiers.depths[neighbour_id] = next_depth
+                        next_level.append(neighbour_id)
+                        if limit is not None and len(frontiers.depths) >= limit:
+                            full = True
+                            break
+                    if full:
+                        break
+                if not next_level:
+                    frontiers.exhausted = True
+                    break
+                frontiers.levels.append(next_level)
+                if full:
+                    frontiers.exhausted = True
+                    break
+            # Charged under the frontier's lock so a concurrent extension cannot be
+            # undercounted; the memo lock is never held while taking a frontier's.
+            with self.lock:
+                if self._frontiers.get(key) is frontiers:
+                    self._memo_size += len(frontiers.depths) - frontiers.charged
+                    frontiers.charged = len(frontiers.depths)
+                    while self._memo_size > self.memo_nodes:
+                        self._evict_oldest()
+        return frontiers
+
+    def _evict_oldest(self) -> None:
+        _, evicted = self._frontiers.popitem(last=False)
+        self._memo_size -= evicted.charged
+
+    def _neighbours(self, node_id: str, edge_filter: EdgeFilter) -> Iterator[Tuple[str, GraphEdge]]:
+        edges = self.index.edges
+        row = edges.positions.get(node_id)
+        if edge_filter.direction in ('out', 'both'):
+            for position in self.outgoing.get(row):
+                edge = edges[position]
+                if edge_filter.allows(edge):
+                    yield edge.target, edge
+        if edge_filter.direction in ('in', 'both'):
+            for position in self.incoming.get(row):
+                edge = edges[position]
+                if edge_filter.allows(edge):
+                    yield edge.source, edge
+
+    def _edges_between(self, node_ids: Dict[str, int], edge_filter: EdgeFilter) -> List[GraphEdge]:
+        # Edges passing the filter with both ends included, in either direction;
+        # repeats of the same edge are sent once.
+        index_edges = self.index.edges
+        targets = index_edges.targets
+        rows = {index_edges.positions.get(node_id) for node_id in node_ids}
+        edges: List[GraphEdge] = []
+        seen: Set[Tuple[str, str, str, str]] = set()
+        for node_id in node_ids:
+            for position in self.outgoing.get(index_edges.positions.get(node_id)):
+                # Compared as row numbers first, so a hub's edges leaving the
+                # subgraph are skipped without being decoded.
+                if targets[position] not in rows:
+                    continue
+                edge = index_edges[position]
+                if not edge_filter.allows(edge):
+                    continue
+                key = (edge.source, edge.target, edge.kind, edge.confidence)
+                if key in seen:
+                    continue
+                seen.add(key)
+                edges.append(edge)
+        return edges
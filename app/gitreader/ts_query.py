@@ -0,0 +1,79 @@
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from tree_sitter import Query
+except Exception:
+    Query = None
+
+try:
+    from tree_sitter import QueryCursor
+except Exception:
+    QueryCursor = None
+
+try:
+    from tree_sitter_languages import get_language as get_ts_language
+except Exception:
+    get_ts_language = None
+
+
+_QUERY_CACHE: Dict[Tuple[str, Tuple[str, ...]], Optional[object]] = {}
+
+
+def compile_query(language_name: str, tree: object, patterns: Tuple[str, ...]) -> Optional[object]:
+    # Compiled once per grammar. Grammars name their nodes differently, so each
+    # pattern is checked on its own and the ones a grammar cannot express are dropped.
+    key = (language_name, patterns)
+    if key in _QUERY_CACHE:
+        return _QUERY_CACHE[key]
+    query = None
+    language = _tree_language(language_name, tree)
+    if language is not None:
+        supported = [pattern for pattern in patterns if _build_query(language, pattern) is not None]
+        if supported:
+            query = _build_query(language, '\n'.join(supported))
+    _QUERY_CACHE[key] = query
+    return query
+
+
+def query_matches(query: Optional[object], node: Optional[object]) -> List[Dict[str, object]]:
+    if query is None or node is None:
+        return []
+    try:
+        if QueryCursor is not None:
+            raw_matches = QueryCursor(query).matches(node)
+        else:
+            raw_matches = query.matches(node)
+    except Exception:
+        return []
+    matches: List[Dict[str, object]] = []
+    for _, captures in raw_matches:
+        match: Dict[str, object] = {}
+        for name, captured in captures.items():
+            if isinstance(captured, list):
+                if not captured:
+                    continue
+                captured = captured[0]
+            match[name] = captured
+        matches.append(match)
+    return matches
+
+
+def _tree_language(language_name: str, tree: object) -> Optional[object]:
+    language = getattr(tree, 'language', None)
+    if language is not None:
+        return language
+    if get_ts_language:
+        try:
+            return get_ts_language(language_name)
+        except Exception:
+            return None
+    return None
+
+
+def _build_query(language: object, source: str) -> Optional[object]:
+    try:
+        if Query is not None and QueryCursor is not None:
+            return Query(language, source)
+        return language.query(source)
+    except Exception:
+        return None
@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .models import RepoSpec
+from .service import get_story_arcs
+
+
+WARMUP_ENV = 'GITREADER_WARMUP'
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupState:
+    configured: bool = False
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    repos: List[Dict[str, object]] = field(default_factory=list)
+
+    @property
+    def ready(self) -> bool:
+        return not self.configured or self.finished_at is not None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'ready': self.ready,
+            'configured': self.configured,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'repos': [dict(repo) for repo in self.repos],
+        }
+
+
+STATE = WarmupState()
+
+
+def load_warmup_specs(value: Optional[str] = None) -> List[RepoSpec]:
+    # GITREADER_WARMUP is a JSON list, inline or in a file, of request-style entries:
+    # {"repo": url, "ref": ..., "subdir": ..., "local": path}, or bare url/path strings.
+    raw = os.getenv(WARMUP_ENV, '') if value is None else value
+    text = raw.strip()
+    if not text:
+        return []
+    if not text.startswith('['):
+        with open(text, 'r', encoding='utf-8') as handle:
+            text = handle.read()
+    entries = json.loads(text)
+    if not isinstance(entries, list):
+        raise ValueError(f'{WARMUP_ENV} must be a JSON list')
+    specs: List[RepoSpec] = []
+    for entry in entries:
+        if isinstance(entry, str):
+            if os.path.isdir(entry):
+                specs.append(RepoSpec(local_path=entry))
+            else:
+                specs.append(RepoSpec(repo_url=entry))
+        elif isinstance(entry, dict):
+            specs.append(RepoSpec(
+                repo_url=entry.get('repo'),
+                ref=entry.get('ref'),
+                subdir=entry.get('subdir'),
+                local_path=entry.get('local'),
+            ))
+    return specs
+
+
+def warm_up(specs: List[RepoSpec], cache_root: str, state: WarmupState = STATE) -> WarmupState:
+    # Builds or loads each repo's index and story so they sit in this process's
+    # memo; a failing repo is reported and skipped, it does not block readiness.
+    state.configured = True
+    state.started_at = time.time()
+    state.finished_at = None
+    state.repos = []
+    for spec in specs:
+        start = time.perf_counter()
+        entry: Dict[str, object] = {'repo': spec.repo_url or spec.local_path, 'ref': spec.ref, 'subdir': spec.subdir}
+        try:
+            index, arcs, _ = get_story_arcs(spec, cache_root=cache_root)
+        except Exception as exc:
+            LOGGER.exception('gitreader warm-up failed repo=%s', entry['repo'])
+            entry.update({'status': 'failed', 'error': str(exc)})
+        else:
+            entry.update({
+                'status': 'ready',
+                'repo_id': index.repo_id,
+                'commit_sha': index.commit_sha,
+                'nodes': len(index.nodes),
+                'arcs': len(arcs),
+            })
+        entry['elapsed'] = round(time.perf_counter() - start, 3)
+        state.repos.append(entry)
+    state.finished_at = time.time()
+    LOGGER.info(
+        'gitreader warm-up finished repos=%s failed=%s elapsed=%.3fs',
+        len(state.repos),
+        sum(1 for repo in state.repos if repo.get('status') == 'failed'),
+        state.finished_at - state.started_at,
+    )
+    return state
+
+
+def init_app(app, background: bool = True) -> Optional[threading.Thread]:
+    specs = load_warmup_specs()
+    if not specs:
+        return None
+    cache_root = os.path.join(app.instance_path, 'gitreader')
+    STATE.configured = True
+    if not background:
+        warm_up(specs, cache_root)
+        return None
+    thread = threading.Thread(target=warm_up, args=(specs, cache_root), name='gitreader-warmup', daemon=True)
+    thread.start()
+    return thread
@@ -7690,6 +7690,7 @@ ${secondPart}`;
       __publicField(this, "chapters", []);
       __publicField(this, "storyArcs", []);
       __publicField(this, "storyArcsById", /* @__PURE__ */ new Map());
+      __publicField(this, "storyArcDetails", /* @__PURE__ */ new Map());
       __publicField(this, "activeStoryArc", null);
       __publicField(this, "tourActive", false);
       __publicField(this, "tourState", null);
@@ -7707,6 +7708,8 @@ ${secondPart}`;
       __publicField(this, "graphLoadPromises", /* @__PURE__ */ new Map());
       __publicField(this, "narratorCache", /* @__PURE__ */ new Map());
       __publicField(this, "narratorRequestToken", 0);
+      __publicField(this, "pendingPollDelay", 1500);
+      __publicField(this, "pendingPollLimit", 8);
       __publicField(this, "chapterRequestToken", 0);
       __publicField(this, "graphRequestToken", 0);
       __publicField(this, "narratorVisible", true);
@@ -8361,13 +8364,24 @@ ${secondPart}`;
       }
       if (mode === "routes") {
         const arcId = targetChapterId || this.currentChapterId || this.routeSelect.value || "";
-        const arc = arcId ? this.storyArcsById.get(arcId) : void 0;
+        const arc = arcId ? this.storyArcDetails.get(arcId) : void 0;
         if (arc) {
           this.activeStoryArc = arc;
           this.renderStoryArc(arc);
           return;
         }
         this.activeStoryArc = null;
+        if (arcId && this.storyArcsById.has(arcId)) {
+          void this.fetchStoryArc(arcId).then((loaded) => {
+            if (!loaded) {
+              this.renderStoryArcMissing();
+              return;
+            }
+            this.activeStoryArc = loaded;
+            this.renderStoryArc(loaded);
+          });
+          return;
+        }
         if (arcId) {
           this.renderStoryArcMissing();
           return;
@@ -8401,9 +8415,10 @@ ${secondPart}`;
       this.renderToc();
     }
     async loadRouteToc() {
-      const storyData = await this.api.fetchJson("/gitreader/api/story");
-      this.storyArcs = Array.isArray(storyData.arcs) ? storyData.arcs : [];
+      const catalogue = await this.api.fetchJson("/gitreader/api/story/arcs");
+      this.storyArcs = Array.isArray(catalogue.arcs) ? catalogue.arcs : [];
       this.storyArcsById = new Map(this.storyArcs.map((arc) => [arc.id, arc]));
+      this.storyArcDetails = /* @__PURE__ */ new Map();
       this.chapters = this.storyArcs.map((arc) => this.buildArcChapter(arc));
       this.tocMode = "routes";
       this.activeStoryArc = null;
@@ -8533,13 +8548,9 @@ ${secondPart}`;
       if (this.tourActive) {
         return;
       }
-      let arc = this.storyArcsById.get(arcId);
+      let arc = this.storyArcDetails.get(arcId);
       if (!arc) {
-        const response = await this.api.fetchJson(
-          "/gitreader/api/story",
-          { id: arcId }
-        );
-        arc = Array.isArray(response.arcs) ? response.arcs[0] : void 0;
+        arc = await this.fetchStoryArc(arcId);
       }
       if (requestToken !== this.chapterRequestToken) {
         return;
@@ -8582,6 +8593,21 @@ ${secondPart}`;
       }
       this.renderStoryArc(arc);
     }
+    // Builds one arc on the server; the route's other threads come back with it.
+    async fetchStoryArc(arcId) {
+      const response = await this.api.fetchJson(
+        "/gitreader/api/story",
+        { id: arcId }
+      );
+      const arc = Array.isArray(response.arcs) ? response.arcs[0] : void 0;
+      const related = Array.isArray(response.related_arcs) ? response.related_arcs : [];
+      [arc, ...related].forEach((item) => {
+        if (item) {
+          this.storyArcDetails.set(item.id, item);
+        }
+      });
+      return arc;
+    }
     getScopeForChapter(chapterId) {
       if (chapterId && (chapterId.startsWith("group:") || chapterId.startsWith("story:"))) {
         return chapterId;
@@ -10461,7 +10487,7 @@ ${secondPart}`;
       this.graphInstance.$("node:selected").unselect();
       parent.select();
     }
-    async updateNarrator(symbol) {
+    async updateNarrator(symbol, pollAttempt = 0) {
       if (symbol.kind === "folder") {
         this.renderFileTreeNarrator();
         return;
@@ -10475,7 +10501,9 @@ ${secondPart}`;
         return;
       }
       const requestToken = ++this.narratorRequestToken;
-      this.renderNarratorLoading(symbol);
+      if (pollAttempt === 0) {
+        this.renderNarratorLoading(symbol);
+      }
       try {
         const response = await this.api.fetchJson("/gitreader/api/narrate", void 0, {
           method: "POST",
@@ -10494,6 +10522,17 @@ ${secondPart}`;
         if (!response || response.error) {
           throw new Error("Narrator unavailable.");
         }
+        if (response.pending) {
+          this.renderNarration(symbol, response);
+          if (pollAttempt < this.pendingPollLimit) {
+            window.setTimeout(() => {
+              if (requestToken === this.narratorRequestToken) {
+                void this.updateNarrator(symbol, pollAttempt + 1);
+              }
+            }, this.pendingPollDelay);
+          }
+          return;
+        }
         this.narratorCache.set(cacheKey, response);
         this.renderNarration(symbol, response);
       } catch (error) {
@@ -10520,7 +10559,8 @@ ${secondPart}`;
         mode: this.currentMode,
         entryNode: entryNode != null ? entryNode : void 0,
         resolveArcLabel: (arcId) => {
-          const target = this.storyArcsById.get(arcId);
+          var _a;
+          const target = (_a = this.storyArcDetails.get(arcId)) != null ? _a : this.storyArcsById.get(arcId);
           return target ? this.formatArcTitle(target) : null;
         },
         kindLabelFor: (kind) => this.getKindLabel(kind)
@@ -10661,38 +10701,72 @@ ${secondPart}`;
         this.renderTourStep(response.step);
         this.updateTourControls();
         await this.syncTourFocus(response.step);
+        this.schedulePendingTourRefresh(response.step, 0);
       } catch (error) {
         const message = error instanceof Error ? error.message : "Unable to start tour.";
         this.renderTourError(message);
       }
     }
-    async advanceTour(action, nodeId, arcId) {
+    async advanceTour(action, nodeId, arcId, pollAttempt = 0) {
       if (!this.tourState) {
         return;
       }
+      const state = this.tourState;
+      const request = {
+        session_id: state.session_id,
+        action,
+        target_node_id: nodeId,
+        target_arc_id: arcId
+      };
       try {
-        const response = await this.api.fetchJson("/gitreader/api/tour/step", void 0, {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json"
-          },
-          body: JSON.stringify({
-            state: this.tourState,
-            action,
-            target_node_id: nodeId,
-            target_arc_id: arcId
-          })
-        });
+        let response;
+        try {
+          response = await this.postTourStep(state.session_id ? request : { ...request, state });
+        } catch (error) {
+          if (!state.session_id || !this.isNotFound(error)) {
+            throw error;
+          }
+          response = await this.postTourStep({ ...request, state });
+        }
         this.tourState = response.state;
         this.tourStep = response.step;
         this.renderTourStep(response.step);
         this.updateTourControls();
-        await this.syncTourFocus(response.step);
+        if (action !== "refresh") {
+          await this.syncTourFocus(response.step);
+        }
+        this.schedulePendingTourRefresh(response.step, pollAttempt);
       } catch (error) {
+        if (this.isNotFound(error)) {
+          await this.startTour();
+          return;
+        }
         const message = error instanceof Error ? error.message : "Unable to advance tour.";
         this.renderTourError(message);
       }
     }
+    postTourStep(body) {
+      return this.api.fetchJson("/gitreader/api/tour/step", void 0, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json"
+        },
+        body: JSON.stringify(body)
+      });
+    }
+    isNotFound(error) {
+      return error instanceof Error && error.message === "Request failed: 404";
+    }
+    schedulePendingTourRefresh(step, pollAttempt) {
+      if (!step.pending || pollAttempt >= this.pendingPollLimit) {
+        return;
+      }
+      window.setTimeout(() => {
+        if (this.tourActive && this.tourStep === step) {
+          void this.advanceTour("refresh", void 0, void 0, pollAttempt + 1);
+        }
+      }, this.pendingPollDelay);
+    }
     endTour() {
       this.tourActive = false;
       this.tourState = null;
@@ -34,6 +34,7 @@ import { escapeHtml, normalizePath } from './modules/utils/strings';
 import { buildRepoParams as buildRepoParamsUtil } from './modules/utils/url';
 import type {
     ApiGraphResponse,
+    ApiStoryCatalogueResponse,
     ApiStoryResponse,
     ApiTocResponse,
     ChapterSummary,
@@ -47,6 +48,7 @@ import type {
     NarrationResponse,
     SnippetMode,
     StoryArc,
+    StoryArcSummary,
     SymbolKind,
     SymbolNode,
     SymbolSnippetResponse,
@@ -123,8 +125,9 @@ class GitReaderApp {
     private readerController: ReaderController;
     private graphLayoutMode: GraphLayoutMode = 'cluster';
     private chapters: ChapterSummary[] = [];
-    private storyArcs: StoryArc[] = [];
-    private storyArcsById: Map<string, StoryArc> = new Map();
+    private storyArcs: StoryArcSummary[] = [];
+    private storyArcsById: Map<string, StoryArcSummary> = new Map();
+    private storyArcDetails: Map<string, StoryArc> = new Map();
     private activeStoryArc: StoryArc | null = null;
     private tourActive = false;
     private tourState: TourState | null = null;
@@ -142,6 +145,8 @@ class GitReaderApp {
     private graphLoadPromises: Map<string, Promise<ApiGraphResponse>> = new Map();
     private narratorCache: Map<string, NarrationResponse> = new Map();
     private narratorRequestToken = 0;
+    private pendingPollDelay = 1500;
+    private pendingPollLimit = 8;
     private chapterRequestToken = 0;
     private graphRequestToken = 0;
     private narratorVisible = true;
@@ -847,13 +852,24 @@ class GitReaderApp {
         }
         if (mode === 'routes') {
             const arcId = targetChapterId || this.currentChapterId || this.routeSelect.value || '';
-            const arc = arcId ? this.storyArcsById.get(arcId) : undefined;
+            const arc = arcId ? this.storyArcDetails.get(arcId) : undefined;
             if (arc) {
                 this.activeStoryArc = arc;
                 this.renderStoryArc(arc);
                 return;
             }
             this.activeStoryArc = null;
+            if (arcId && this.storyArcsById.has(arcId)) {
+                void this.fetchStoryArc(arcId).then((loaded) => {
+                    if (!loaded) {
+                        this.renderStoryArcMissing();
+                        return;
+                    }
+                    this.activeStoryArc = loaded;
+                    this.renderStoryArc(loaded);
+                });
+                return;
+            }
             if (arcId) {
                 this.renderStoryArcMissing();
                 return;
@@ -888,9 +904,10 @@ class GitReaderApp {
     }
 
     private async loadRouteToc(): Promise<void> {
-        const storyData = await this.api.fetchJson<ApiStoryResponse>('/gitreader/api/story');
-        this.storyArcs = Array.isArray(storyData.arcs) ? storyData.arcs : [];
+        const catalogue = await this.api.fetchJson<ApiStoryCatalogueResponse>('/gitreader/api/story/arcs');
+        this.storyArcs = Array.isArray(catalogue.arcs) ? catalogue.arcs : [];
         this.storyArcsById = new Map(this.storyArcs.map((arc) => [arc.id, arc]));
+        this.storyArcDetails = new Map();
         this.chapters = this.storyArcs.map((arc) => this.buildArcChapter(arc));
         this.tocMode = 'routes';
         this.activeStoryArc = null;
@@ -917,7 +934,7 @@ class GitReaderApp {
         this.routePicker.classList.toggle('is-hidden', !isRoutes);
     }
 
-    private buildArcChapter(arc: StoryArc): ChapterSummary {
+    private buildArcChapter(arc: StoryArcSummary): ChapterSummary {
         const handler = arc.route?.handler_name ? `Handler ${arc.route.handler_name}` : '';
         const summary = [handler, arc.summary].filter(Boolean).join(' - ') || 'Route arc';
         return {
@@ -927,7 +944,7 @@ class GitReaderApp {
         };
     }
 
-    private populateRoutePicker(arcs: StoryArc[]): void {
+    private populateRoutePicker(arcs: StoryArcSummary[]): void {
         this.routeSelect.innerHTML = '';
         const placeholder = document.createElement('option');
         placeholder.value = '';
@@ -949,11 +966,11 @@ class GitReaderApp {
         }
     }
 
-    private formatArcOptionLabel(arc: StoryArc): string {
+    private formatArcOptionLabel(arc: StoryArcSummary): string {
         return formatArcOptionLabelUtil(arc);
     }
 
-    private formatRouteLabel(arc: StoryArc): string {
+    private formatRouteLabel(arc: StoryArcSummary): string {
         return formatRouteLabelUtil(arc);
     }
 
@@ -1027,13 +1044,9 @@ class GitReaderApp {
         if (this.tourActive) {
             return;
         }
-        let arc = this.storyArcsById.get(arcId);
+        let arc = this.storyArcDetails.get(arcId);
         if (!arc) {
-            const response = await this.api.fetchJson<ApiStoryResponse>(
-                '/gitreader/api/story',
-                { id: arcId },
-            );
-            arc = Array.isArray(response.arcs) ? response.arcs[0] : undefined;
+            arc = await this.fetchStoryArc(arcId);
         }
         if (requestToken !== this.chapterRequestToken) {
             return;
@@ -1077,6 +1090,22 @@ class GitReaderApp {
         this.renderStoryArc(arc);
     }
 
+    // Builds one arc on the server; the route's other threads come back with it.
+    private async fetchStoryArc(arcId: string): Promise<StoryArc | undefined> {
+        const response = await this.api.fetchJson<ApiStoryResponse>(
+            '/gitreader/api/story',
+            { id: arcId },
+        );
+        const arc = Array.isArray(response.arcs) ? response.arcs[0] : undefined;
+        const related = Array.isArray(response.related_arcs) ? response.related_arcs : [];
+        [arc, ...related].forEach((item) => {
+            if (item) {
+                this.storyArcDetails.set(item.id, item);
+            }
+        });
+        return arc;
+    }
+
     private getScopeForChapter(chapterId: string): string {
         if (chapterId && (chapterId.startsWith('group:') || chapterId.startsWith('story:'))) {
             return chapterId;
@@ -3053,7 +3082,7 @@ class GitReaderApp {
         parent.select();
     }
 
-    private async updateNarrator(symbol: SymbolNode): Promise<void> {
+    private async updateNarrator(symbol: SymbolNode, pollAttempt = 0): Promise<void> {
         if (symbol.kind === 'folder') {
             this.renderFileTreeNarrator();
             return;
@@ -3067,7 +3096,9 @@ class GitReaderApp {
             return;
         }
         const requestToken = ++this.narratorRequestToken;
-        this.renderNarratorLoading(symbol);
+        if (pollAttempt === 0) {
+            this.renderNarratorLoading(symbol);
+        }
         try {
             const response = await this.api.fetchJson<NarrationResponse>('/gitreader/api/narrate', undefined, {
                 method: 'POST',
@@ -3086,6 +3117,18 @@ class GitReaderApp {
             if (!response || (response as unknown as { error?: object }).error) {
                 throw new Error('Narrator unavailable.');
             }
+            if (response.pending) {
+                // The backend answered with its fallback while generation finishes; ask again shortly.
+                this.renderNarration(symbol, response);
+                if (pollAttempt < this.pendingPollLimit) {
+                    window.setTimeout(() => {
+                        if (requestToken === this.narratorRequestToken) {
+                            void this.updateNarrator(symbol, pollAttempt + 1);
+                        }
+                    }, this.pendingPollDelay);
+                }
+                return;
+            }
             this.narratorCache.set(cacheKey, response);
             this.renderNarration(symbol, response);
         } catch (error) {
@@ -3116,7 +3159,7 @@ class GitReaderApp {
             mode: this.currentMode,
             entryNode: entryNode ?? undefined,
             resolveArcLabel: (arcId) => {
-                const target = this.storyArcsById.get(arcId);
+                const target = this.storyArcDetails.get(arcId) ?? this.storyArcsById.get(arcId);
                 return target ? this.formatArcTitle(target) : null;
             },
             kindLabelFor: (kind) => this.getKindLabel(kind),
@@ -3135,11 +3178,11 @@ class GitReaderApp {
         this.narratorOutput.innerHTML = buildFileTreeNarratorHtml(this.fileNodesByPath.size);
     }
 
-    private getArcThreadLabel(arc: StoryArc): string {
+    private getArcThreadLabel(arc: StoryArcSummary): string {
         return getArcThreadLabelUtil(arc);
     }
 
-    private formatArcTitle(arc: StoryArc): string {
+    private formatArcTitle(arc: StoryArcSummary): string {
         return formatArcTitleUtil(arc);
     }
 
@@ -3271,40 +3314,86 @@ class GitReaderApp {
             this.renderTourStep(response.step);
             this.updateTourControls();
             await this.syncTourFocus(response.step);
+            this.schedulePendingTourRefresh(response.step, 0);
         } catch (error) {
             const message = error instanceof Error ? error.message : 'Unable to start tour.';
             this.renderTourError(message);
         }
     }
 
-    private async advanceTour(action: 'next' | 'prev' | 'jump' | 'branch', nodeId?: string, arcId?: string): Promise<void> {
+    private async advanceTour(
+        action: 'next' | 'prev' | 'jump' | 'branch' | 'refresh',
+        nodeId?: string,
+        arcId?: string,
+        pollAttempt = 0,
+    ): Promise<void> {
         if (!this.tourState) {
             return;
         }
+        const state = this.tourState;
+        const request: Record<string, unknown> = {
+            session_id: state.session_id,
+            action,
+            target_node_id: nodeId,
+            target_arc_id: arcId,
+        };
         try {
-            const response = await this.api.fetchJson<TourResponse>('/gitreader/api/tour/step', undefined, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    state: this.tourState,
-                    action,
-                    target_node_id: nodeId,
-                    target_arc_id: arcId,
-                }),
-            });
+            let response: TourResponse;
+            try {
+                response = await this.postTourStep(state.session_id ? request : { ...request, state });
+            } catch (error) {
+                // The step endpoint only 404s as tour_session_not_found: the session
+                // expired or was evicted, so send the state once for the server to resume.
+                if (!state.session_id || !this.isNotFound(error)) {
+                    throw error;
+                }
+                response = await this.postTourStep({ ...request, state });
+            }
             this.tourState = response.state;
             this.tourStep = response.step;
             this.renderTourStep(response.step);
             this.updateTourControls();
-            await this.syncTourFocus(response.step);
+            if (action !== 'refresh') {
+                await this.syncTourFocus(response.step);
+            }
+            this.schedulePendingTourRefresh(response.step, pollAttempt);
         } catch (error) {
+            if (this.isNotFound(error)) {
+                // The session could not be resumed; start the tour over rather than stall.
+                await this.startTour();
+                return;
+            }
             const message = error instanceof Error ? error.message : 'Unable to advance tour.';
             this.renderTourError(message);
         }
     }
 
+    private postTourStep(body: Record<string, unknown>): Promise<TourResponse> {
+        return this.api.fetchJson<TourResponse>('/gitreader/api/tour/step', undefined, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(body),
+        });
+    }
+
+    private isNotFound(error: unknown): boolean {
+        return error instanceof Error && error.message === 'Request failed: 404';
+    }
+
+    private schedulePendingTourRefresh(step: TourStep, pollAttempt: number): void {
+        if (!step.pending || pollAttempt >= this.pendingPollLimit) {
+            return;
+        }
+        window.setTimeout(() => {
+            // Only refresh if the user is still looking at this step.
+            if (this.tourActive && this.tourStep === step) {
+                void this.advanceTour('refresh', undefined, undefined, pollAttempt + 1);
+            }
+        }, this.pendingPollDelay);
+    }
+
     private endTour(): void {
         this.tourActive = false;
         this.tourState = null;
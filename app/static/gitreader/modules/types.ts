@@ -84,17 +84,23 @@ export interface StoryScene {
     confidence?: EdgeConfidence;
 }
 
-// Full story arc payload used by routes mode and narrator rendering.
-export interface StoryArc {
+// Route arc catalogue entry listed in routes mode; the arc itself loads when opened.
+export interface StoryArcSummary {
     id: string;
     title: string;
     summary: string;
     entry_id: string;
     thread?: string;
     thread_index?: number;
+    route: StoryRouteInfo;
+    estimated_depth?: number;
+    branch_candidates?: number;
+}
+
+// Full story arc payload used by routes mode and narrator rendering.
+export interface StoryArc extends StoryArcSummary {
     parent_id?: string | null;
     related_ids?: string[];
-    route: StoryRouteInfo;
     scenes: StoryScene[];
     scene_count: number;
     calls?: {
@@ -128,9 +134,17 @@ export interface ApiGraphResponse {
     warnings?: ApiWarning[];
 }
 
-// Story arcs API response used for routes mode and arc lookup.
+// Story arcs API response used for arc lookup; by id it also carries the route's other threads.
 export interface ApiStoryResponse {
     arcs: StoryArc[];
+    related_arcs?: StoryArc[];
+    stats?: Record<string, number>;
+    warnings?: ApiWarning[];
+}
+
+// Arc catalogue API response used to list routes before any arc is built.
+export interface ApiStoryCatalogueResponse {
+    arcs: StoryArcSummary[];
     stats?: Record<string, number>;
     warnings?: ApiWarning[];
 }
@@ -179,13 +193,17 @@ export interface NarrationResponse {
     connections?: string[];
     next_thread?: string;
     cached?: boolean;
+    // Fallback served while generation finishes; re-request to pick up the result.
+    pending?: boolean;
     source?: string;
     model?: string;
     prompt_version?: string;
 }
 
-// Persisted tour state passed back to the backend on each step.
+// Tour state returned by the backend; steps only send back session_id when present,
+// and the full state once more if the server no longer knows the session.
 export interface TourState {
+    session_id?: string;
     repo_id: string;
     ref: string | null;
     subdir: string | null;
@@ -250,6 +268,8 @@ export interface TourStep {
     focus?: TourFocus;
     allowed_node_ids?: string[];
     cached?: boolean;
+    // Fallback served while generation finishes; re-request to pick up the result.
+    pending?: boolean;
     source?: string;
     model?: string;
     prompt_version?: string;
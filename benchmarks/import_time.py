@@ -0,0 +1,80 @@
+"""Cold-start benchmark: time `import app.gitreader` in fresh interpreters.
+
+Usage: python -m benchmarks.import_time [--repeat N] [--budget-ms MS] [--top N]
+
+Each run is a new `python -X importtime` process, so nothing is shared between
+runs. Reports the median cumulative import time of the package and its slowest
+imports, and fails (exit status 1) if a language plugin's modules were imported
+eagerly or, with --budget-ms, if the median exceeds the budget.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PACKAGE = 'app.gitreader'
+# Language plugins must only load once a scan finds their files.
+LAZY_MODULES = (
+    'tree_sitter',
+    'tree_sitter_languages',
+    'app.gitreader.parse_js',
+    'app.gitreader.parse_swift',
+    'app.gitreader.graph_js',
+    'app.gitreader.graph_swift',
+    'app.gitreader.ts_query',
+)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile() -> Dict[str, Tuple[int, int]]:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {PACKAGE}'],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line.split(':', 1)[1].split('|'))
+        profile[name] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--budget-ms', type=float, default=None)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    totals: List[float] = []
+    profiles = []
+    for _ in range(args.repeat):
+        profile = import_profile()
+        profiles.append(profile)
+        totals.append(profile[PACKAGE][1] / 1000)
+    median = statistics.median(totals)
+    print(f'import {PACKAGE}: median {median:.1f} ms, min {min(totals):.1f} ms over {args.repeat} runs')
+
+    last = profiles[-1]
+    print('slowest imports (self time, last run):')
+    for name, (self_us, cumulative_us) in sorted(last.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f'  {self_us / 1000:8.1f} ms  {cumulative_us / 1000:8.1f} ms cumulative  {name}')
+
+    eager = [name for name in LAZY_MODULES if name in last]
+    failures = []
+    if eager:
+        failures.append(f'language plugin modules imported eagerly: {", ".join(eager)}')
+    if args.budget_ms is not None and median > args.budget_ms:
+        failures.append(f'median {median:.1f} ms exceeds budget {args.budget_ms:.1f} ms')
+    if failures:
+        raise SystemExit('\n'.join(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Micro-benchmark: resident size of a loaded index.
+
+Usage: python -m benchmarks.index_memory [--files N] [--symbols N] [--calls N]
+
+Builds the JSON payload of a synthetic index (default 5000 files, 6 symbols
+per file, 4 calls per symbol), loads it with RepoIndex.from_dict and reports
+the memory tracemalloc sees the loaded index hold, split into nodes and edges.
+The edges are also measured as one GraphEdge per edge, the layout the edge
+arrays replaced, along with the time a full pass over them takes either way,
+and the lookup tables outgoing()/incoming() build on first use.
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from app.gitreader.models import GraphEdge, RepoIndex
+
+
+def _payload(files: int, symbols: int, calls: int) -> Dict[str, object]:
+    nodes: List[Dict[str, object]] = []
+    edges: List[Dict[str, str]] = []
+    for number in range(files):
+        path = f'pkg/sub{number % 50}/mod{number}.py'
+        module = path[:-3].replace('/', '.')
+        file_node_id = f'file:{path}'
+        nodes.append({'id': file_node_id, 'name': path, 'kind': 'file', 'summary': '', 'module': module, 'location': {'path': path}})
+        for position in range(symbols):
+            name = f'method_{position}'
+            node_id = f'symbol:{module}.Handler{position}.{name}'
+            nodes.append({
+                'id': node_id,
+                'name': name,
+                'kind': 'method',
+                'summary': '',
+                'signature': f'def {name}(self, request)',
+                'module': module,
+                'location': {'path': path, 'start_line': position * 10 + 1, 'end_line': position * 10 + 8},
+            })
+            edges.append({'source': file_node_id, 'target': node_id, 'kind': 'contains', 'confidence': 'high'})
+            for offset in range(calls):
+                callee = (number + offset + 1) % files
+                target = f'symbol:pkg.sub{callee % 50}.mod{callee}.Handler{offset % symbols}.method_{offset % symbols}'
+                edges.append({'source': node_id, 'target': target, 'kind': 'calls', 'confidence': 'medium'})
+    return {'repo_id': 'synthetic', 'root_path': '', 'commit_sha': None, 'nodes': nodes, 'edges': edges}
+
+
+def _traced(build: Callable[[], object]) -> Tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+
+def _elapsed(work: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    work()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=5000)
+    parser.add_argument('--symbols', type=int, default=6)
+    parser.add_argument('--calls', type=int, default=4)
+    args = parser.parse_args()
+
+    # Strings come from a JSON round trip, as they do when an index is loaded.
+    payload = json.loads(json.dumps(_payload(args.files, args.symbols, args.calls)))
+    index, total = _traced(lambda: RepoIndex.from_dict(payload))
+    _, edges_only = _traced(lambda: RepoIndex.from_dict({'edges': payload['edges']}))
+    edge_objects, objects = _traced(lambda: list(index.edges))
+    _, lookups = _traced(lambda: (index.edges.outgoing(''), index.edges.incoming('')))
+    node_ids = list(index.nodes)
+    print(f'{len(index.nodes)} nodes, {len(index.edges)} edges')
+    print(f'  index         : {total / 1024 / 1024:8.1f} MiB')
+    print(f'  nodes         : {(total - edges_only) / 1024 / 1024:8.1f} MiB')
+    print(f'  edge arrays   : {edges_only / 1024 / 1024:8.1f} MiB')
+    print(f'  edge objects  : {objects / 1024 / 1024:8.1f} MiB  (one GraphEdge each)')
+    print(f'  edge lookups  : {lookups / 1024 / 1024:8.1f} MiB  (outgoing/incoming rows)')
+    print(f'  pass, rows()  : {_elapsed(lambda: sum(1 for row in index.edges.rows())) * 1000:8.1f} ms')
+    print(f'  pass, objects : {_elapsed(lambda: sum(1 for edge in edge_objects if isinstance(edge, GraphEdge))) * 1000:8.1f} ms')
+    lookup_time = _elapsed(lambda: [index.edges.outgoing(node_id) + index.edges.incoming(node_id) for node_id in node_ids])
+    print(f'  node lookups  : {lookup_time / len(node_ids) * 1_000_000:8.1f} us  (outgoing + incoming)')
+
+
+if __name__ == '__main__':
+    main()
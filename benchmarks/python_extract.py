@@ -0,0 +1,190 @@
+"""Micro-benchmark: single-pass Python extraction vs. the previous multi-pass builder.
+
+Usage: python -m benchmarks.python_extract [ROOT] [--repeat N]
+
+Files under ROOT (default: this repository) are parsed once up front; only the
+extraction step is timed. The legacy path below is a frozen copy of the per-file
+passes graph.py used before the visitor (blueprints, symbols, imports, calls via
+ast.walk, then story's separate route pass), kept here purely as the baseline.
+Most of the gap is the signature lookup (ast.get_source_segment rescans the file
+for every symbol), so the legacy passes are also timed with the current
+signature_from_node to show what the single traversal saves on its own.
+"""
+import argparse
+import ast
+import os
+import time
+from functools import partial
+from typing import Callable, List, Optional
+
+from app.gitreader import scan
+from app.gitreader.graph import (
+    FileExtract,
+    RouteInfo,
+    _call_ref,
+    _location_from_node,
+    _resolve_import_module,
+    _route_from_decorator,
+    extract_file,
+)
+from app.gitreader.models import SymbolNode, blueprint_id, symbol_id
+from app.gitreader.parse_python import ParsedFile, doc_summary, parse_files, signature_from_node
+from app.gitreader.service import DEFAULT_MAX_FILE_SIZE
+
+
+Signature = Callable[[ast.AST], Optional[str]]
+
+
+def legacy_extract(parsed: ParsedFile, signatures: Optional[Callable[[ParsedFile], Signature]] = None) -> FileExtract:
+    signature = (signatures or _legacy_signatures)(parsed)
+    extract = FileExtract(path=parsed.path, module=parsed.module)
+    for node in parsed.tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+            if isinstance(node.value.func, ast.Name) and node.value.func.id == 'Blueprint':
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        extract.blueprints.append((target.id, SymbolNode(
+                            id=blueprint_id(target.id),
+                            name=target.id,
+                            kind='blueprint',
+                            summary='',
+                            location=_location_from_node(parsed.path, node),
+                            module=parsed.module,
+                        )))
+    for node in parsed.tree.body:
+        if isinstance(node, ast.ClassDef):
+            methods = [
+                _legacy_symbol(parsed, item, f'{node.name}.{item.name}', 'method', signature)
+                for item in node.body
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+            extract.definitions.append((_legacy_symbol(parsed, node, node.name, 'class', signature), methods))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            extract.definitions.append((_legacy_symbol(parsed, node, node.name, 'function', signature), []))
+    for node in parsed.tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                alias_name = alias.asname or alias.name.split('.')[-1]
+                extract.import_aliases.append((alias_name, alias.name))
+                extract.import_modules.append(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            module_name = _resolve_import_module(parsed.module, node.module, node.level)
+            if module_name:
+                extract.import_modules.append(module_name)
+            for alias in node.names:
+                if alias.name == '*':
+                    continue
+                alias_name = alias.asname or alias.name
+                qualname = f'{module_name}.{alias.name}' if module_name else alias.name
+                extract.import_aliases.append((alias_name, qualname))
+    for node in parsed.tree.body:
+        if isinstance(node, ast.ClassDef):
+            bases = [base.id if isinstance(base, ast.Name) else base.attr
+                     for base in node.bases if isinstance(base, (ast.Name, ast.Attribute))]
+            extract.bases.append((node.name, bases, len(extract.calls)))
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    extract.calls.append((node.name, item.name, _legacy_calls(item)))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            extract.calls.append((None, node.name, _legacy_calls(node)))
+    for node in parsed.tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            route_spec = _route_from_decorator(decorator)
+            if not route_spec:
+                continue
+            path, methods = route_spec
+            extract.routes.append(RouteInfo(
+                handler_id=symbol_id(f'{parsed.module}.{node.name}'),
+                handler_name=node.name,
+                module=parsed.module,
+                file_path=parsed.path,
+                line=getattr(node, 'lineno', 0) or 0,
+                path=path,
+                methods=methods,
+            ))
+    return extract
+
+
+def _legacy_symbol(
+    parsed: ParsedFile,
+    node: ast.AST,
+    qualname: str,
+    kind: str,
+    signature: Signature,
+) -> SymbolNode:
+    return SymbolNode(
+        id=symbol_id(f'{parsed.module}.{qualname}'),
+        name=node.name,
+        kind=kind,
+        summary=doc_summary(ast.get_docstring(node)),
+        signature=signature(node),
+        docstring=ast.get_docstring(node),
+        location=_location_from_node(parsed.path, node),
+        module=parsed.module,
+    )
+
+
+def _legacy_signatures(parsed: ParsedFile) -> Signature:
+    return partial(_legacy_signature, source=parsed.source.text)
+
+
+def _legacy_signature(node: ast.AST, source: str) -> Optional[str]:
+    segment = ast.get_source_segment(source, node)
+    if not segment:
+        return None
+    line = segment.strip().splitlines()[0].strip()
+    if line.endswith(':'):
+        return line[:-1]
+    return line
+
+
+def _current_signatures(parsed: ParsedFile) -> Signature:
+    return partial(signature_from_node, source=parsed.source, line_offsets=parsed.source.line_offsets())
+
+
+def _legacy_calls(func_node: ast.AST) -> list:
+    refs = []
+    for node in ast.walk(func_node):
+        if isinstance(node, ast.Call):
+            ref = _call_ref(node)
+            if ref:
+                refs.append(ref)
+    return refs
+
+
+def _time(extractor, files: List[ParsedFile], repeat: int) -> tuple[float, List[FileExtract]]:
+    best = float('inf')
+    extracts: List[FileExtract] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extracts = [extractor(parsed) for parsed in files]
+        best = min(best, time.perf_counter() - start)
+    return best, extracts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root', nargs='?', default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    scan_result = scan.scan_repo(args.root, max_file_size=DEFAULT_MAX_FILE_SIZE)
+    parsed = parse_files(args.root, scan_result.python_files)
+    print(f'{len(parsed.files)} files, best of {args.repeat}')
+
+    legacy_time, legacy = _time(legacy_extract, parsed.files, args.repeat)
+    passes_time, passes = _time(partial(legacy_extract, signatures=_current_signatures), parsed.files, args.repeat)
+    visitor_time, current = _time(extract_file, parsed.files, args.repeat)
+    if legacy != current or passes != current:
+        raise SystemExit('extract mismatch between legacy and single-pass extraction')
+    print(f'legacy multi-pass : {legacy_time * 1000:9.1f} ms')
+    print(f'  same signatures : {passes_time * 1000:9.1f} ms')
+    print(f'single-pass       : {visitor_time * 1000:9.1f} ms')
+    print(f'speedup           : {legacy_time / visitor_time:9.2f}x')
+    print(f'  same signatures : {passes_time / visitor_time:9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Micro-benchmark: call-graph ranks on a synthetic graph.
+
+Usage: python -m benchmarks.ranking [--nodes N] [--edges N] [--samples N] [--repeat N]
+
+Builds a random call graph of --nodes symbols and --edges calls (defaults: 30k
+and 100k) and times the CSR build and each rank the index stores. --samples
+sets the betweenness sources (0 for exact, which is quadratic). The graph is
+seeded, so runs are comparable.
+"""
+import argparse
+import time
+from typing import Callable
+
+from app.gitreader.ranking import _betweenness, _core_numbers, _csr, _numpy, _pagerank
+
+
+def _best(work: Callable[[], object], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        work()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=30_000)
+    parser.add_argument('--edges', type=int, default=100_000)
+    parser.add_argument('--samples', type=int, default=64)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    np = _numpy()
+    if np is None:
+        raise SystemExit('the ranking benchmark needs NumPy')
+    rng = np.random.default_rng(0)
+    sources = rng.integers(0, args.nodes, args.edges)
+    targets = rng.integers(0, args.nodes, args.edges)
+    node_ids = [f'symbol:{position}' for position in range(args.nodes)]
+    graph = _csr(np, node_ids, sources, targets)
+
+    print(f'{args.nodes} nodes, {int(graph.indptr[-1])} distinct edges, best of {args.repeat}')
+    timings = [
+        ('csr build', _best(lambda: _csr(np, node_ids, sources, targets), args.repeat)),
+        ('pagerank', _best(lambda: _pagerank(np, graph), args.repeat)),
+        (f'betweenness ({args.samples or "all"} sources)', _best(lambda: _betweenness(np, graph, args.samples), args.repeat)),
+        ('core numbers', _best(lambda: _core_numbers(np, graph), args.repeat)),
+    ]
+    for label, elapsed in timings:
+        print(f'  {label:<28}: {elapsed * 1000:9.1f} ms')
+    print(f'  {"total":<28}: {sum(elapsed for _, elapsed in timings) * 1000:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Micro-benchmark: symbol search on a synthetic index.
+
+Usage: python -m benchmarks.search [--symbols N] [--files N] [--repeat N]
+
+Generates --symbols functions, classes and methods (default 300k) spread over
+--files modules, with names composed from a fixed vocabulary, then reports how
+long the search tables take to build, how large they are stored, how long they
+take to load, and the latency of exact, prefix, substring, dotted and misspelt
+queries. The generator is seeded, so runs are comparable.
+"""
+import argparse
+import json
+import random
+import time
+from typing import Callable, List
+
+from app.gitreader.models import RepoIndex, SourceLocation, SymbolNode
+from app.gitreader.search import SearchIndex, build_search_index
+
+WORDS = [
+    'get', 'set', 'load', 'save', 'build', 'parse', 'render', 'fetch', 'update', 'delete',
+    'user', 'repo', 'index', 'story', 'graph', 'node', 'edge', 'cache', 'token', 'session',
+    'config', 'route', 'handler', 'request', 'response', 'file', 'path', 'tree', 'commit', 'blob',
+    'narration', 'tour', 'search', 'rank', 'score', 'snippet', 'signal', 'worker', 'queue', 'lock',
+]
+
+
+def _synthetic_index(symbols: int, files: int) -> RepoIndex:
+    rng = random.Random(0)
+    nodes = {}
+    paths = []
+    for number in range(files):
+        package = '/'.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+        path = f'src/{package}/{rng.choice(WORDS)}_{number}.py'
+        module = path[:-3].replace('/', '.')
+        paths.append((path, module))
+        nodes[f'file:{path}'] = SymbolNode(id=f'file:{path}', name=path, kind='file', location=SourceLocation(path=path), module=module)
+    while len(nodes) < symbols + files:
+        path, module = rng.choice(paths)
+        words = [rng.choice(WORDS) for _ in range(rng.randint(1, 4))]
+        if rng.random() < 0.15:
+            name, kind = ''.join(word.title() for word in words), 'class'
+        else:
+            name, kind = '_'.join(words), rng.choice(['function', 'method'])
+        node_id = f'symbol:{module}.{name}'
+        if node_id in nodes:
+            continue
+        nodes[node_id] = SymbolNode(id=node_id, name=name, kind=kind, location=SourceLocation(path=path), module=module)
+    return RepoIndex(repo_id='synthetic', root_path='', commit_sha=None, nodes=nodes)
+
+
+def _best(work: Callable[[], object], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        work()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=300_000)
+    parser.add_argument('--files', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    index = _synthetic_index(args.symbols, args.files)
+    start = time.perf_counter()
+    search_index = build_search_index(index)
+    build_elapsed = time.perf_counter() - start
+    payload = json.dumps(search_index.to_dict(), separators=(',', ':'))
+    load_elapsed = _best(lambda: SearchIndex.from_dict(json.loads(payload)), 1)
+    print(f'{len(index.nodes)} nodes, {len(search_index.terms)} terms, {len(search_index.trigrams)} trigrams')
+    print(f'  build : {build_elapsed * 1000:9.1f} ms')
+    print(f'  stored: {len(payload) / 1024 / 1024:9.1f} MiB')
+    print(f'  load  : {load_elapsed * 1000:9.1f} ms')
+
+    queries: List[str] = ['get_user', 'repo', 'g', 'narration_tour', 'StoryGraph', 'cache.load_user', 'sesion_tokn', 'src/graph']
+    print(f'queries (best of {args.repeat}):')
+    for query in queries:
+        elapsed = _best(lambda: search_index.search(index, query), args.repeat)
+        top = search_index.search(index, query, limit=1)
+        print(f'  {query!r:20}: {elapsed * 1000:7.2f} ms  {top[0]["id"] if top else "-"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Micro-benchmark: single-scan signal extraction vs. the previous per-pattern scans.
+
+Usage: python -m benchmarks.signals [ROOT] [--repeat N] [--snippet-lines N] [--scale N]
+
+Source files under ROOT (default: this repository) are read once up front and
+cut into snippets of --snippet-lines lines, the size the narrator indexes. Both
+extractors run over every snippet and over every whole file (repeated --scale
+times to mimic large modules); outputs must match. The legacy path below is a
+frozen copy of extract_signals before the combined scan, kept as the baseline.
+"""
+import argparse
+import os
+import re
+import time
+from typing import Callable, Dict, List
+
+from app.gitreader import scan
+from app.gitreader.languages import registered_languages
+from app.gitreader.service import DEFAULT_MAX_FILE_SIZE, DEFAULT_SNIPPET_LINES
+from app.gitreader.signals import (
+    ROUTE_DECORATOR_RE,
+    TEMPLATE_RE,
+    URL_FOR_RE,
+    _append_unique,
+    _parse_methods,
+    extract_signals,
+)
+
+REQUEST_RE = re.compile(r'\brequest\.(args|form|json|values)\b')
+DB_WRITE_RE = re.compile(r'\bdb\.session\.(add|commit|delete)\b')
+DB_QUERY_RE = re.compile(r'\b\w+\.query\b')
+LOGIN_RE = re.compile(r'\blogin_user\(')
+LOGOUT_RE = re.compile(r'\blogout_user\(')
+CURRENT_USER_RE = re.compile(r'\bcurrent_user\b')
+JSONIFY_RE = re.compile(r'\bjsonify\(')
+REDIRECT_RE = re.compile(r'\bredirect\(')
+ABORT_RE = re.compile(r'\babort\(')
+FLASH_RE = re.compile(r'\bflash\(')
+
+
+def legacy_extract_signals(snippet_text: str) -> Dict[str, List[str]]:
+    signals: Dict[str, List[str]] = {
+        'routes': [],
+        'templates': [],
+        'redirects': [],
+        'responses': [],
+        'auth': [],
+        'db': [],
+        'request': [],
+        'flash': [],
+    }
+    if not snippet_text:
+        return signals
+    for match in ROUTE_DECORATOR_RE.finditer(snippet_text):
+        methods = _parse_methods(match.group('rest') or '')
+        _append_unique(signals['routes'], f'{"|".join(methods) if methods else "ANY"} {match.group("path").strip()}')
+    for match in TEMPLATE_RE.finditer(snippet_text):
+        _append_unique(signals['templates'], match.group(1).strip())
+    for match in URL_FOR_RE.finditer(snippet_text):
+        _append_unique(signals['redirects'], match.group(1).strip())
+    for match in REQUEST_RE.finditer(snippet_text):
+        _append_unique(signals['request'], f'request.{match.group(1)}')
+    for match in DB_WRITE_RE.finditer(snippet_text):
+        _append_unique(signals['db'], match.group(1))
+    if DB_QUERY_RE.search(snippet_text):
+        _append_unique(signals['db'], 'query')
+    for pattern, kind, label in (
+        (LOGIN_RE, 'auth', 'login_user'),
+        (LOGOUT_RE, 'auth', 'logout_user'),
+        (CURRENT_USER_RE, 'auth', 'current_user'),
+        (JSONIFY_RE, 'responses', 'jsonify'),
+        (REDIRECT_RE, 'responses', 'redirect'),
+        (ABORT_RE, 'responses', 'abort'),
+        (FLASH_RE, 'flash', 'flash'),
+    ):
+        if pattern.search(snippet_text):
+            _append_unique(signals[kind], label)
+    return signals
+
+
+def _read_sources(root: str) -> List[str]:
+    scan_result = scan.scan_repo(root, max_file_size=DEFAULT_MAX_FILE_SIZE)
+    texts: List[str] = []
+    for rel_path in [path for plugin in registered_languages() for path in plugin.files(scan_result)]:
+        try:
+            with open(os.path.join(root, rel_path), 'r', encoding='utf-8', errors='replace') as handle:
+                texts.append(handle.read())
+        except OSError:
+            continue
+    return texts
+
+
+def _snippets(texts: List[str], snippet_lines: int) -> List[str]:
+    snippets: List[str] = []
+    for text in texts:
+        lines = text.splitlines()
+        for start in range(0, len(lines), snippet_lines):
+            snippets.append('\n'.join(lines[start:start + snippet_lines]))
+    return snippets
+
+
+def _time(extractor: Callable, texts: List[str], repeat: int) -> tuple[float, list]:
+    best = float('inf')
+    results: list = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [extractor(text) for text in texts]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root', nargs='?', default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--snippet-lines', type=int, default=DEFAULT_SNIPPET_LINES)
+    parser.add_argument('--scale', type=int, default=10)
+    args = parser.parse_args()
+
+    texts = _read_sources(args.root)
+    workloads = [
+        (f'snippets ({args.snippet_lines} lines)', _snippets(texts, args.snippet_lines)),
+        (f'whole files x{args.scale}', [text * args.scale for text in texts]),
+    ]
+    print(f'{len(texts)} files, {sum(len(text) for text in texts) / 1024:.0f} KiB, best of {args.repeat}')
+    for label, workload in workloads:
+        legacy_time, legacy = _time(legacy_extract_signals, workload, args.repeat)
+        current_time, current = _time(extract_signals, workload, args.repeat)
+        if legacy != current:
+            raise SystemExit(f'signal mismatch between legacy and single-scan extraction ({label})')
+        print(f'{label}: {len(workload)} texts')
+        print(f'  legacy per-pattern : {legacy_time * 1000:9.1f} ms')
+        print(f'  single scan        : {current_time * 1000:9.1f} ms')
+        print(f'  speedup            : {legacy_time / current_time:9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
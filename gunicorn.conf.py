@@ -0,0 +1,15 @@
+import multiprocessing
+import os
+
+
+wsgi_app = 'wsgi:app'
+bind = f"0.0.0.0:{os.environ.get('PORT', '5009')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Narration and tour requests wait on the LLM; threads keep a worker responsive.
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+if workers > 1:
+    # Tour sessions must be visible to every worker, not just the one that started them.
+    os.environ.setdefault('GITREADER_TOUR_SESSION_STORE', 'sqlite')
+preload_app = True
+accesslog = '-'
@@ -2,7 +2,7 @@ import os
 
 from flask import Flask
 
-from app.gitreader import gitreader
+from app.gitreader import gitreader, warmup
 
 
 def create_app() -> Flask:
@@ -14,5 +14,8 @@ def create_app() -> Flask:
 app = create_app()
 
 if __name__ == '__main__':
+    # Only the reloader's serving child warms up; /gitreader/api/ready reports progress.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warmup.init_app(app, background=True)
     port = int(os.environ.get('PORT', '5009'))
     app.run(debug=True, port=port)
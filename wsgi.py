@@ -0,0 +1,14 @@
+import gc
+
+from app.gitreader import gitobjects, warmup
+from server import app
+
+
+# Production entry point (see gunicorn.conf.py). With preload_app the master imports
+# this once: repos listed in GITREADER_WARMUP are loaded before any worker forks, so
+# every worker starts warm and reads the same index pages copy-on-write. Freezing
+# the heap keeps the collector from touching, and so copying, those objects. The
+# cat-file readers warm-up started are closed first: their pipes cannot be shared.
+warmup.init_app(app, background=False)
+gitobjects.close_pools()
+gc.freeze()